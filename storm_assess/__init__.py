@@ -1,13 +1,11 @@
 import numpy as np
 import os.path
-import collections
-import datetime
+import collections.abc
 
-from haversine import haversine
-import cartopy.crs as ccrs
-import shapely.geometry as sgeom
-from netCDF4 import date2num
+# cartopy, shapely and netCDF4 are slow to import so they are imported in the functions
+# that use them
 
+from storm_assess import geodesy
 from storm_assess.functions import _get_time_range, _storms_in_time_range, _basin_polygon, _storm_in_basin
 
 # Set path for sample model data
@@ -15,14 +13,149 @@ SAMPLE_DATA_PATH = os.path.join(os.path.dirname(__file__), '../tests/')
 SAMPLE_TRACK_DATA = os.path.join(SAMPLE_DATA_PATH, 'combined_ff_trs.vor_10m_fullgrid_N512_xgxqe_L5.new_20002011.date')
 
 
-""" Store model storm observations as a named tuple (this enables access to data by its 
-name instead of position index) """
-Observation = collections.namedtuple('Observation', ['date', 'lat', 'lon', 'vort', 'vmax',
-                                                     'mslp', 'extras'])
+#: Names of the per-observation fields stored for every storm, in the order they are
+#: given to :class:`Observation`
+OBSERVATION_FIELDS = ('date', 'lat', 'lon', 'vort', 'vmax', 'mslp')
+
+#: Values used for missing data in TRACK files. The loaders in storm_assess.track
+#: replace them with NaN, but storms built directly can still contain them
+MISSING_VALUES = (1e12, 1e25, -999.)
+
+
+def _item(values, index):
+    """ Returns element *index* of an array as a Python object rather than a numpy scalar """
+    value = values[index]
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def _column(values, dtype=None):
+    """ Returns a list of per-observation values as a 1D array. Dates and other objects
+    that numpy can not store natively are kept in an object array """
+    if dtype is object:
+        column = np.empty(len(values), dtype=object)
+        column[:] = values
+        return column
+    column = np.asarray(values)
+    if column.ndim != 1:
+        return _column(values, dtype=object)
+    return column
+
+
+class _ObservationArrays(object):
+    """ Per-field arrays holding all the observations of a single storm. Additional
+    per-observation values (the Observation extras) are stored as named columns. """
+    __slots__ = ('fields', 'extras', 'hours')
+
+    def __init__(self, fields, extras, hours=None):
+        self.fields = fields
+        self.extras = extras
+        # The dates as hours since the epoch (see storm_assess.timing), which are
+        # calculated when they are first needed unless given when the storm is loaded
+        self.hours = hours
+
+    def __len__(self):
+        return len(self.fields['lat'])
+
+    @classmethod
+    def from_observations(cls, obs):
+        """ Converts a sequence of :class:`Observation` into arrays """
+        obs = list(obs)
+        fields = {name: _column([getattr(ob, name) for ob in obs],
+                                dtype=object if name == 'date' else None)
+                  for name in OBSERVATION_FIELDS}
+
+        # Use the keys of all observations (in order of appearance) so that nothing is
+        # lost if the extras differ between observations
+        keys = {}
+        for ob in obs:
+            keys.update(dict.fromkeys(ob.extras))
+        extras = {key: _column([ob.extras.get(key) for ob in obs]) for key in keys}
+        return cls(fields, extras)
+
+
+def _field_property(name):
+    def getter(self):
+        return _item(self._data.fields[name], self._index)
+    getter.__name__ = name
+    return property(getter, doc='The %s of the observation' % name)
+
+
+class Observation(object):
+    """ Represents a single observation of a model tropical storm.
+
+    Observations belonging to a :class:`Storm` are lightweight views onto one row of the
+    storm's arrays, so they hold no data of their own. They still behave like the
+    original named tuple of (date, lat, lon, vort, vmax, mslp, extras). Note that
+    :attr:`extras` is a read-only view of the storm's extras columns. """
+    __slots__ = ('_data', '_index')
+    _fields = OBSERVATION_FIELDS + ('extras',)
+
+    def __init__(self, date, lat, lon, vort, vmax, mslp, extras=None):
+        # A standalone observation is stored as a storm with a single record
+        if extras is None:
+            extras = {}
+        fields = dict(date=date, lat=lat, lon=lon, vort=vort, vmax=vmax, mslp=mslp)
+        self._data = _ObservationArrays(
+            {name: _column([fields[name]], dtype=object if name == 'date' else None)
+             for name in OBSERVATION_FIELDS},
+            {key: _column([value]) for key, value in extras.items()},
+        )
+        self._index = 0
+
+    @classmethod
+    def _view(cls, data, index):
+        """ Returns the Observation at row *index* of a storm's arrays without copying """
+        ob = cls.__new__(cls)
+        ob._data = data
+        ob._index = index
+        return ob
+
+    date = _field_property('date')
+    lat = _field_property('lat')
+    lon = _field_property('lon')
+    vort = _field_property('vort')
+    vmax = _field_property('vmax')
+    mslp = _field_property('mslp')
+
+    @property
+    def extras(self):
+        """ Any additional values stored for the observation, as a read-only mapping """
+        return _ObservationExtras(self._data, self._index)
+
+    def _asdict(self):
+        return dict(zip(self._fields, self))
+
+    def _replace(self, **kwargs):
+        values = self._asdict()
+        values.update(kwargs)
+        return Observation(**values)
+
+    def __iter__(self):
+        return iter(tuple(getattr(self, name) for name in self._fields))
+
+    def __len__(self):
+        return len(self._fields)
+
+    def __getitem__(self, index):
+        return tuple(self)[index]
+
+    def __eq__(self, other):
+        if isinstance(other, (Observation, tuple)):
+            return tuple(self) == tuple(other)
+        return NotImplemented
+
+    __hash__ = None
+
+    def __reduce__(self):
+        # Pickle only the values of this observation, not the whole storm
+        return Observation, tuple(self)[:-1] + (dict(self.extras),)
+
+    def __repr__(self):
+        return 'Observation(%s)' % ', '.join(
+            '%s=%r' % (name, value) for name, value in zip(self._fields, self))
 
-class Observation(Observation):
-    """  Represents a single observation of a model tropical storm. """
-    
     def six_hourly_timestep(self):
         """ Returns True if a storm record is taken at 00, 06, 12 or 18Z only """
         return self.date.hour in (0,6,12,18) and self.date.minute == 0 and self.date.second == 0
@@ -30,12 +163,67 @@ class Observation(Observation):
     def add_to_axes(self, ax):
         """ Instructions on how to plot a model tropical storm observation """
         ax.plot(self.lon, self.lat)
-        
+
+
+class _ObservationExtras(collections.abc.Mapping):
+    """ Read-only mapping of the extras of a single observation. The keys are shared by
+    all observations of the storm and the values are read from the storm's columns. """
+    __slots__ = ('_data', '_index')
+
+    def __init__(self, data, index):
+        self._data = data
+        self._index = index
+
+    def __getitem__(self, key):
+        return _item(self._data.extras[key], self._index)
+
+    def __iter__(self):
+        return iter(self._data.extras)
+
+    def __len__(self):
+        return len(self._data.extras)
+
+    def __repr__(self):
+        return repr(dict(self))
+
+
+class _Observations(collections.abc.Sequence):
+    """ Read-only sequence of the :class:`Observation` views of a storm """
+    __slots__ = ('_data',)
+
+    def __init__(self, data):
+        self._data = data
+
+    def __len__(self):
+        return len(self._data)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [Observation._view(self._data, i) for i in range(*index.indices(len(self)))]
+        n = len(self)
+        if index < 0:
+            index += n
+        if not 0 <= index < n:
+            raise IndexError('observation index out of range')
+        return Observation._view(self._data, index)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield Observation._view(self._data, i)
+
+    def __repr__(self):
+        return repr(list(self))
+
 
 class Storm(object):
+    __slots__ = ('snbr', 'extras', '_data')
+
     def __init__(self, snbr, obs, extras=None):
         """ Stores information about the model storm (such as its storm number) and corresponding 
-        observations. Any additional information for a storm should be stored in extras as a dictionary. """
+        observations. Any additional information for a storm should be stored in extras as a dictionary.
+
+        The observations are held as one array per field (see :meth:`column`) and
+        :attr:`obs` returns lightweight :class:`Observation` views onto them. """
         self.snbr = snbr
         self.obs = obs
         
@@ -44,26 +232,93 @@ class Storm(object):
             extras = {}
         self.extras = extras 
 
+    @classmethod
+    def from_arrays(cls, snbr, fields, obs_extras=None, extras=None, hours=None):
+        """ Creates a storm directly from per-observation arrays, without creating an
+        :class:`Observation` for each record.
+
+        Args:
+            snbr (int): The storm number
+            fields (dict): Maps each name in :data:`OBSERVATION_FIELDS` to a sequence of
+                values, one per observation
+            obs_extras (dict, optional): Maps the name of each additional per-observation
+                variable (e.g. 'vmax_kts') to a sequence of values
+            extras (dict, optional): Additional information about the storm
+            hours (numpy.ndarray, optional): The dates as hours since the epoch, if they
+                are already known. See :meth:`hours`
+        """
+        if obs_extras is None:
+            obs_extras = {}
+        storm = cls.__new__(cls)
+        storm.snbr = snbr
+        storm._data = _ObservationArrays(
+            {name: _column(fields[name], dtype=object if name == 'date' else None)
+             for name in OBSERVATION_FIELDS},
+            {key: _column(values) for key, values in obs_extras.items()},
+        )
+
+        npoints = len(storm._data)
+        columns = list(storm._data.fields.values()) + list(storm._data.extras.values())
+        if hours is not None:
+            storm._data.hours = np.asarray(hours, dtype=float)
+            columns.append(storm._data.hours)
+        if any(len(column) != npoints for column in columns):
+            raise ValueError('All observation arrays must have the same length')
+
+        if extras is None:
+            extras = {}
+        storm.extras = extras
+        return storm
+
+    @property
+    def obs(self):
+        """ The sequence of :class:`Observation` for the storm """
+        return _Observations(self._data)
+
+    @obs.setter
+    def obs(self, obs):
+        self._data = _ObservationArrays.from_observations(obs)
+
+    def column(self, name):
+        """ Returns an array of the values of a field (e.g. 'lat') or an extras entry (e.g.
+        'vmax_kts') for every observation of the storm. The array is not a copy. """
+        if name in self._data.fields:
+            return self._data.fields[name]
+        elif name in self._data.extras:
+            return self._data.extras[name]
+        raise KeyError('storm has no observation field or extras named %r' % name)
+
     @property
     def vmax(self):
         """ The maximum wind speed attained by the storm during its lifetime """
-        return max(ob.vmax for ob in self.obs)
+        return self.obs_at_vmax().vmax
     
     @property
     def mslp_min(self):
-        """ The minimum central pressure reached by the storm during its lifetime (set to 
-        -999 if no records are available) """
-        mslps = [ob.mslp for ob in self.obs if ob.mslp != 1e12]  
-        mslps = list([ob for ob in mslps if ob != -999.0])
-        if not mslps:
-            mslps = [-999]
-        return min(mslps)
+        """ The minimum central pressure reached by the storm during its lifetime, ignoring
+        missing values (NaN or :data:`MISSING_VALUES`). Set to -999 if no records are
+        available """
+        mslps = self.column('mslp')
+        mslps = mslps[~np.isnan(mslps) & ~np.isin(mslps, MISSING_VALUES)]
+        if len(mslps) == 0:
+            return -999
+        return mslps.min().item()
     
     @property
     def vort_max(self):
         """ The maximum 850 hPa relative vorticity attained by the storm during its lifetime """
-        return max(ob.vort for ob in self.obs)
+        return self.obs_at_max_vort().vort
     
+    def hours(self):
+        """ The dates of the observations as hours since 1970-01-01 00:00 in the calendar
+        of the dates (see :mod:`storm_assess.timing`). These are calculated once and
+        stored with the storm """
+        if self._data.hours is None:
+            from storm_assess import timing
+
+            self._data.hours = timing.hours_since_epoch(self.column('date'))
+        return self._data.hours
+
     def __len__(self):
         """ The total number of observations for the storm """
         return len(self.obs)
@@ -77,32 +332,28 @@ class Storm(object):
         member number) """
         return self.snbr    
     
-    def lifetime(self,calendar='360_day'):
-        """ The total length of time that the storm was active. This uses all observation
-        points, no maximum wind speed threshold has been set """
-        date1=min(ob.date for ob in self.obs)
-        date2=max(ob.date for ob in self.obs)
-        date1=date2num(date1,units='hours since 1970-01-01 00:00:00',calendar=calendar)
-        date2=date2num(date2,units='hours since 1970-01-01 00:00:00',calendar=calendar)
-        return date2-date1 
-        
-    def time_to_max(self,calendar='360_day'): 
-        '''The length of time between the genesis and the maximum'''
-        date1=self.genesis_date()
-        date2=self.max_date()
-        date1=date2num(date1,units='hours since 1970-01-01 00:00:00',calendar=calendar)
-        date2=date2num(date2,units='hours since 1970-01-01 00:00:00',calendar=calendar)
-        return date2-date1
-
-    def step_of_min_mslp(self, calendar='360_day'):
-        return int(self.time_of_min_mslp() - self.genesis_date() / datetime.timedelta(hours=6))
-
-    def step_of_max_vort(self,calendar='360_day'):
-        date1=self.genesis_date()
-        date2=self.time_of_max_vort()
-        date1=date2num(date1,units='hours since 1970-01-01 00:00:00',calendar=calendar)
-        date2=date2num(date2,units='hours since 1970-01-01 00:00:00',calendar=calendar)
-        return (date2-date1)/6
+    def lifetime(self, calendar=None):
+        """ The total length of time (hours) that the storm was active. This uses all
+        observation points, no maximum wind speed threshold has been set. The times are
+        in the calendar of the dates, so calendar is no longer used """
+        hours = self.hours()
+        return float(hours.max() - hours.min())
+
+    def time_to_max(self, calendar=None):
+        '''The length of time (hours) between the genesis and the maximum wind speed'''
+        return self._hours_after_genesis(_nanarg(np.nanargmax, self.column('vmax')))
+
+    def step_of_min_mslp(self, calendar=None):
+        """ The number of 6-hour steps between the genesis and the minimum pressure """
+        return int(self._hours_after_genesis(_nanarg(np.nanargmin, self.column('mslp'))) / 6)
+
+    def step_of_max_vort(self, calendar=None):
+        """ The number of 6-hour steps between the genesis and the maximum vorticity """
+        return self._hours_after_genesis(_nanarg(np.nanargmax, self.column('vort'))) / 6
+
+    def _hours_after_genesis(self, index):
+        hours = self.hours()
+        return float(hours[index] - hours[0])
 
     def time_of_min_mslp(self): 
         return self.obs_at_min_mslp().date
@@ -127,28 +378,29 @@ class Storm(object):
     def ace_index(self):
         """ The accumulated cyclone energy index for the storm. Calculated as the square of the
         storms maximum wind speed every 6 hours (0, 6, 12, 18Z) throughout its lifetime. Observations
-        of the storm taken in between these records are not currently used. Returns value rounded to
-        2 decimal places. Wind speed units: knots """
-        ace_index = 0
-        for ob in self.obs:
-            if ob.six_hourly_timestep():
-                ace_index += np.square(ob.extras['vmax_kts'])/10000.
-        return round(ace_index, 2)
+        of the storm taken in between these records are not currently used (see
+        :func:`storm_assess.resample.resample` to interpolate storms to 6-hourly times first).
+        Returns value rounded to 2 decimal places. Wind speed units: knots """
+        six_hourly = np.array([date.hour in (0,6,12,18) and date.minute == 0 and date.second == 0
+                               for date in self.column('date')], dtype=bool)
+        vmax_kts = self.column('vmax_kts')[six_hourly]
+        ace_index = np.nansum(np.square(vmax_kts)/10000.)
+        return round(float(ace_index), 2)
     
     def obs_at_vmax(self):
         """Return the maximum observed vmax Observation instance. If there is more than one obs 
         at vmax then it returns the first instance """
-        return max(self.obs, key=lambda ob: ob.vmax)
+        return self.obs[_nanarg(np.nanargmax, self.column('vmax'))]
     
     def obs_at_min_mslp(self):
         """Return the maximum observed vmax Observation instance. If there is more than one obs 
         at vmax then it returns the first instance """
-        return min(self.obs, key=lambda ob: ob.mslp)
+        return self.obs[_nanarg(np.nanargmin, self.column('mslp'))]
 
     def obs_at_max_vort(self):
         """Return the maximum observed vmax Observation instance. If there is more than one obs 
         at vmax then it returns the first instance """
-        return max(self.obs, key=lambda ob: ob.vort)
+        return self.obs[_nanarg(np.nanargmax, self.column('vort'))]
 
     def obs_at_genesis(self):
         """Returns the Observation instance for the first date that a storm becomes active """       
@@ -159,31 +411,34 @@ class Storm(object):
 
     def obs_at_lysis(self):
         """Returns the Observation instance for the last date that a storm was active """    
-        return [ob for ob in self.obs][-1]
+        return self.obs[-1]
     
 
+def _nanarg(function, values):
+    """ Index of the maximum/minimum of values (from np.nanargmax/np.nanargmin) ignoring
+    missing values, or 0 if all the values are missing """
+    try:
+        return int(function(values))
+    except ValueError:
+        return 0
+
+
 def _boundary_segment(boundary, project=True):
-    REGION_BOUNDARY = { 'west_midlat_na': ([-80, -68, -52, -62], [30, 43, 46, 60]),
-                 'south_midlat_na': ([-80, -12], [30, 30]),
-                       }
-    rbox = sgeom.LineString(list(zip(*REGION_BOUNDARY.get(boundary))))
+    import cartopy.crs as ccrs
+    import shapely.geometry as sgeom
+    from storm_assess.geometry import BOUNDARIES
+
+    rbox = sgeom.LineString(list(zip(*BOUNDARIES.get(boundary))))
     if project: 
         rbox = ccrs.PlateCarree().project_geometry(rbox, ccrs.PlateCarree())
     return rbox
     
 def _obs_in_basin(storm, basin):
-    """ Returns True if a storm track intersects a defined ocean basin """
-    rbox = _basin_polygon(basin)
-    list=[]
-    for ob in storm.obs:
-        lons, lats = list(zip(*[(ob.lon, ob.lat)]))
-        track = sgeom.Point(list(zip(lons, lats)))     
-        projected_track = ccrs.PlateCarree().project_geometry(track, ccrs.Geodetic())
-        if rbox.intersection(projected_track):
-            list.append(True)
-        else:
-            list.append(False)
-    return list 
+    """ Returns a list saying whether each observation of a storm is within a defined
+    ocean basin. To check many storms use :func:`storm_assess.geometry.basin_masks` """
+    from storm_assess.geometry import obs_in_basin
+
+    return obs_in_basin([storm], basin)[0].tolist()
     
 def _storm_motion(storm):
      fac=np.pi/180.
@@ -193,55 +448,50 @@ def _storm_motion(storm):
      return motion
 
 def _storm_speed(storm):
-     nr=storm.nrecords()
-     speeds = [] 
-     positions = [(ob.lon, ob.lat) for ob in storm.obs]
-     for i in range(0,nr-1):
-         speeds.append(lon_lat_to_distance(positions[i],positions[i+1]))
-     speeds=[np.abs(v)/(6.*3600.) for v in speeds]
-     speeds.append(np.float('NaN'))
-     return speeds
+    """ Returns the speed (m/s) of the storm between each observation and the next,
+    assuming 6-hourly observations. The last value is NaN """
+    lons, lats = storm.column('lon'), storm.column('lat')
+    speeds = np.full(len(storm), np.nan)
+    geodesy.distance(lons[:-1], lats[:-1], lons[1:], lats[1:], units="m", out=speeds[:-1])
+    speeds[:-1] /= 6. * 3600.
+    return speeds.tolist()
+
 
 def _storm_azimuth(storm):
-     nr=storm.nrecords()
-     azimuth = []
-     positions = [(ob.lon, ob.lat) for ob in storm.obs]
-     for i in range(0,nr-1):
-         azimuth.append(lon_lat_to_azimuth(positions[i],positions[i+1]))
-     azimuth.append(np.float('NaN'))
-     return azimuth
+    """ Returns the direction of motion (degrees clockwise from north) of the storm
+    between each observation and the next. The last value is NaN """
+    lons, lats = storm.column('lon'), storm.column('lat')
+    azimuth = np.full(len(storm), np.nan)
+    geodesy.bearing(lons[:-1], lats[:-1], lons[1:], lats[1:], out=azimuth[:-1])
+    return azimuth.tolist()
+
 
 def _storm_cross_boundary(storm, boundary):
-    """ Returns True if a storm intersects a region boundary """
-    rbox = _boundary_segment(boundary)
-    lons, lats = list(zip(*[(ob.lon, ob.lat) for ob in storm.obs]))
-    track = sgeom.LineString(list(zip(lons, lats)))
-    projected_track = ccrs.PlateCarree().project_geometry(track, ccrs.Geodetic())
-    if rbox.intersects(projected_track):
-        return True
-    return False
+    """ Returns True if a storm intersects a region boundary. To check many storms use
+    :func:`storm_assess.geometry.boundary_crossings` """
+    from storm_assess.geometry import boundary_crossings
+
+    return bool(boundary_crossings([storm], boundary).crossed.iloc[0])
 
     
 def _storm_vmax_in_basin(storm, basin):
     """ Returns True if the maximum intensity of the storm occurred
     in desired ocean basin. """
-    rbox = _basin_polygon(basin)  
-    xy = ccrs.PlateCarree().transform_point(storm.obs_at_vmax().lon, storm.obs_at_vmax().lat, ccrs.Geodetic())
-    point = sgeom.Point(xy[0], xy[1])
-    if point.within(rbox):
-        return True
-    return False
+    from storm_assess.geometry import points_in_basin
+
+    ob = storm.obs_at_vmax()
+    return bool(points_in_basin([ob.lon], [ob.lat], basin)[0])
+
 
 def _storm_genesis_in_basin(storm, basin):
-    """ Returns True if the maximum intensity of the storm occurred
+    """ Returns True if the genesis of the storm occurred
     in desired ocean basin. """
-    rbox = _basin_polygon(basin)  
-    xy = ccrs.PlateCarree().transform_point(storm.obs_at_genesis().lon, storm.obs_at_genesis().lat, ccrs.Geodetic())
-    point = sgeom.Point(xy[0], xy[1])
-    if point.within(rbox):
-        return True
-    return False
-    
+    from storm_assess.geometry import points_in_basin
+
+    ob = storm.obs_at_genesis()
+    return bool(points_in_basin([ob.lon], [ob.lat], basin)[0])
+
+
 def _storms_in_basin_year_member_forecast(storms, basin, years, members, fcst_dates):
     """ 
     A generator which yields storms that occur within a desired ocean basin 
@@ -277,24 +527,19 @@ def _storms_in_basin_year_month_member_forecast(storms, basin, year, months, mem
 
 
 def lon_lat_to_distance(pos1, pos2, units="m"):
+    """ Great-circle distance between two (lon, lat) positions. See
+    :func:`storm_assess.geodesy.distance` """
     lon1, lat1 = pos1
     lon2, lat2 = pos2
 
-    return haversine([lat1, lon1], [lat2, lon2], unit=units)
+    return geodesy.distance(lon1, lat1, lon2, lat2, units=units)[()]
 
 
 def lon_lat_to_azimuth(pos1, pos2):
+    """ Initial bearing from one (lon, lat) position to another. See
+    :func:`storm_assess.geodesy.bearing` """
     lon1, lat1 = pos1
     lon2, lat2 = pos2
-    fac=np.pi/180.
-    delta_lambda = (lon2-lon1)*fac
-    phi1 = lat1*fac
-    phi2 = lat2*fac
-    x = np.sin(delta_lambda) * np.cos(phi2)
-    y = np.cos(phi1) * np.sin(phi2) - (np.sin(phi1) * np.cos(phi2) * np.cos(delta_lambda))
-    initial_bearing = np.arctan2(x, y)
-    initial_bearing = np.degrees(initial_bearing)
-    compass_bearing = (initial_bearing + 360) % 360
-
-    return compass_bearing
+
+    return geodesy.bearing(lon1, lat1, lon2, lat2)[()]
 
@@ -0,0 +1,111 @@
+"""
+Helpers for treating a collection of tracks (:class:`storm_assess.Storm` or
+:class:`xarray.Dataset`) as "ragged" arrays: the values for every observation of every
+track concatenated into one array, with the offset of the first observation of each
+track.
+"""
+import numpy as np
+
+
+#: Names of the xarray track variables corresponding to the Storm observation fields
+XARRAY_NAMES = {'date': 'time', 'lat': 'latitude', 'lon': 'longitude', 'vort': 'vorticity'}
+
+
+def track_column(track, name):
+    """ Returns an array of the values of variable *name* for every observation of a
+    track. Storm field names (e.g. 'lat') are translated for xarray tracks """
+    if hasattr(track, 'column'):
+        return track.column(name)
+    return np.asarray(track[XARRAY_NAMES.get(name, name)].data)
+
+
+def track_id(track):
+    """ Returns the identifier of a track (Storm.snbr or the "track_id" attribute of an
+    xarray track) """
+    if hasattr(track, 'snbr'):
+        return track.snbr
+    return track.attrs.get('track_id')
+
+
+def track_member(track):
+    """ Returns the ensemble member of a track (the "member" in Storm.extras or the
+    attributes of an xarray track), or -1 if it is not set """
+    if hasattr(track, 'snbr'):
+        return track.extras.get('member', -1)
+    return track.attrs.get('member', -1)
+
+
+def ragged_arrays(tracks, names):
+    """ Concatenates the values of each variable in *names* for all observations of all
+    tracks
+
+    Args:
+        tracks (list): Storm or xarray.Dataset tracks
+        names (list of str): Variables to extract
+
+    Returns:
+        tuple (dict, numpy.ndarray):
+            Mapping of each name to the concatenated values and the offsets of the
+            first observation of each track. The offsets have length len(tracks) + 1 so
+            track n is values[offsets[n]:offsets[n + 1]]
+    """
+    columns = {name: [] for name in names}
+    lengths = np.zeros(len(tracks), dtype=int)
+    for n, track in enumerate(tracks):
+        for name in names:
+            columns[name].append(track_column(track, name))
+        lengths[n] = len(columns[names[0]][-1]) if names else len(track)
+
+    offsets = np.zeros(len(tracks) + 1, dtype=int)
+    np.cumsum(lengths, out=offsets[1:])
+
+    values = {}
+    for name in names:
+        if columns[name]:
+            values[name] = np.concatenate(columns[name])
+        else:
+            values[name] = np.zeros(0)
+    return values, offsets
+
+
+def track_index(offsets):
+    """ Returns the index of the track that each observation belongs to """
+    return np.repeat(np.arange(len(offsets) - 1), np.diff(offsets))
+
+
+def split(values, offsets):
+    """ Splits concatenated values back into a list of arrays, one per track. The arrays
+    are views onto *values* """
+    return np.split(values, offsets[1:-1])
+
+
+def first_true(mask, offsets, start=None):
+    """ Returns the index (relative to the start of each track) of the first True value of
+    a per-observation mask for each track, or -1 if there is none.
+
+    Args:
+        mask (numpy.ndarray): Concatenated boolean values for all observations
+        offsets (numpy.ndarray): Track offsets as returned by :func:`ragged_arrays`
+        start (numpy.ndarray, optional): Index within each track to start searching
+            from. Tracks with a negative start are not searched
+    """
+    ntracks = len(offsets) - 1
+    begin = offsets[:-1].copy()
+    searched = np.ones(ntracks, dtype=bool)
+    if start is not None:
+        start = np.asarray(start)
+        searched = start >= 0
+        begin[searched] += start[searched]
+
+    # For each track, find the first True value at or after its starting point and
+    # check it is still within the track
+    true_index = np.flatnonzero(mask)
+    first = np.full(ntracks, -1, dtype=int)
+    if len(true_index) == 0:
+        return first
+    position = np.searchsorted(true_index, begin)
+    candidate = true_index[np.minimum(position, len(true_index) - 1)]
+    found = searched & (position < len(true_index)) & (candidate < offsets[1:])
+    first[found] = candidate[found] - offsets[:-1][found]
+
+    return first
@@ -0,0 +1,181 @@
+"""
+xarray accessors (``ds.storm`` and ``ds.storms``) for calculating storm metrics from
+track Datasets.
+"""
+import numpy as np
+import xarray
+
+
+#: Conversion from m/s to knots, as used for vmax_kts by :func:`storm_assess.track.load`
+KNOTS_PER_MS = 1.944
+
+
+def _six_hourly(time):
+    """ True for times at 0, 6, 12 or 18Z, as used by :meth:`storm_assess.Storm.ace_index` """
+    return (time.dt.hour % 6 == 0) & (time.dt.minute == 0) & (time.dt.second == 0)
+
+
+def _energy(ds, name, scale):
+    """ Contribution of each observation to the ACE (knots squared / 10^4) """
+    vmax_kts = ds[name] * scale
+    return (vmax_kts ** 2 / 10000.).where(_six_hourly(ds.time), 0)
+
+
+@xarray.register_dataset_accessor("storm")
+class StormAccessor:
+    """Metrics of a single track stored as a Dataset along the "time" dimension"""
+
+    def __init__(self, ds):
+        self._ds = ds
+
+    def vmax(self, name="vmax"):
+        """ The maximum of the wind speed variable along the track """
+        return self._ds[name].max("time")
+
+    def mslp_min(self, name="mslp"):
+        """ The minimum of the pressure variable along the track """
+        return self._ds[name].min("time")
+
+    def lifetime(self):
+        """ The time between the first and last points of the track """
+        time = self._ds.time
+        return time[-1] - time[0]
+
+    def ace(self, name="vmax", scale=KNOTS_PER_MS):
+        """The accumulated cyclone energy, calculated as for
+        :meth:`storm_assess.Storm.ace_index` (without rounding)
+
+        Args:
+            name (str, optional): Wind speed variable. Default is "vmax"
+            scale (float, optional): Factor to convert the wind speed to knots. Default
+                is :data:`KNOTS_PER_MS`
+        """
+        return _energy(self._ds, name, scale).sum("time")
+
+    def genesis(self):
+        """ The first point of the track """
+        return self._ds.isel(time=0)
+
+    def lysis(self):
+        """ The last point of the track """
+        return self._ds.isel(time=-1)
+
+    def obs_at_vmax(self, name="vmax"):
+        """ The point of the track with the maximum wind speed. If there is more than
+        one it returns the first, and the first point if they are all missing """
+        return self._ds.isel(time=self._ds[name].fillna(-np.inf).argmax("time"))
+
+    def obs_at_min_mslp(self, name="mslp"):
+        """ The point of the track with the minimum pressure. If there is more than one
+        it returns the first, and the first point if they are all missing """
+        return self._ds.isel(time=self._ds[name].fillna(np.inf).argmin("time"))
+
+
+@xarray.register_dataset_accessor("storms")
+class StormsAccessor:
+    """Metrics of every track in a contiguous ragged Dataset. Each metric is returned
+    along the "tracks" dimension. Tracks without any points give missing values for the
+    reductions, but every track must have a point to select points (e.g. genesis)"""
+
+    def __init__(self, ds):
+        self._ds = ds
+
+    @property
+    def ntracks(self):
+        return self._ds.sizes["tracks"]
+
+    def _offsets(self):
+        """ First and last observation of each track as integer arrays. These are small
+        so are always loaded """
+        first = np.asarray(self._ds.FIRST_PT.values, dtype=int)
+        npoints = np.asarray(self._ds.NUM_PTS.values, dtype=int)
+        return first, npoints
+
+    def _track_index(self):
+        first, npoints = self._offsets()
+        index = np.full(self._ds.sizes["record"], -1, dtype=int)
+        for n in np.flatnonzero(npoints > 0):
+            index[first[n]:first[n] + npoints[n]] = n
+        return xarray.DataArray(index, dims="record", name="tracks")
+
+    def _per_track(self, result):
+        # Tracks without points don't form a group, so add them back as missing values
+        result = result.reindex(tracks=np.arange(self.ntracks))
+        if "tracks" in self._ds.coords:
+            result = result.assign_coords(tracks=self._ds.tracks)
+        else:
+            result = result.drop_vars("tracks")
+        return result
+
+    def _reduce(self, da, method):
+        track = self._track_index()
+        inside = track.values >= 0
+        if not inside.all():
+            da, track = da.isel(record=inside), track.isel(record=inside)
+        return self._per_track(getattr(da.groupby(track), method)())
+
+    def _points(self, index):
+        """ Select one observation of each track, given its index along "record" """
+        points = self._ds.drop_vars(["FIRST_PT", "NUM_PTS"]).isel(
+            record=xarray.DataArray(index, dims="tracks")
+        )
+        if "record" in points.coords:
+            points = points.drop_vars("record")
+        return points
+
+    def vmax(self, name="vmax"):
+        """ The maximum of the wind speed variable along each track """
+        return self._reduce(self._ds[name], "max")
+
+    def mslp_min(self, name="mslp"):
+        """ The minimum of the pressure variable along each track """
+        return self._reduce(self._ds[name], "min")
+
+    def lifetime(self):
+        """ The time between the first and last points of each track """
+        first, npoints = self._offsets()
+        time = self._ds.time.variable
+        last = first + np.maximum(npoints, 1) - 1
+        lifetime = time[last] - time[first]
+        return self._per_track(
+            xarray.DataArray(lifetime.data, dims="tracks", name="lifetime")
+            .assign_coords(tracks=np.arange(self.ntracks))
+        )
+
+    def ace(self, name="vmax", scale=KNOTS_PER_MS):
+        """ The accumulated cyclone energy of each track. See
+        :meth:`StormAccessor.ace` """
+        return self._reduce(_energy(self._ds, name, scale), "sum").fillna(0)
+
+    def genesis(self):
+        """ The first point of each track """
+        first, _ = self._offsets()
+        return self._points(first)
+
+    def lysis(self):
+        """ The last point of each track """
+        first, npoints = self._offsets()
+        return self._points(first + npoints - 1)
+
+    def _first_at(self, da, method):
+        """ Index along "record" of the first point where each track reaches its
+        maximum/minimum, or FIRST_PT if its values are all missing """
+        extreme = self._reduce(da, method)
+        track = self._track_index().values
+        at_extreme = da == xarray.DataArray(
+            extreme.data[np.maximum(track, 0)], dims="record"
+        )
+        record = xarray.DataArray(np.arange(da.sizes["record"]), dims="record")
+        index = np.asarray(self._reduce(record.where(at_extreme), "min").values)
+        first, _ = self._offsets()
+        return np.where(np.isnan(index), first, index).astype(int)
+
+    def obs_at_vmax(self, name="vmax"):
+        """ The point of each track with the maximum wind speed. If there is more than
+        one it returns the first, and the first point if they are all missing """
+        return self._points(self._first_at(self._ds[name], "max"))
+
+    def obs_at_min_mslp(self, name="mslp"):
+        """ The point of each track with the minimum pressure. If there is more than one
+        it returns the first, and the first point if they are all missing """
+        return self._points(self._first_at(self._ds[name], "min"))
@@ -0,0 +1,260 @@
+"""
+Command line interface for batch processing of TRACK files.
+"""
+import argparse
+import csv
+import datetime
+import functools
+import inspect
+import itertools
+import math
+import operator
+
+from storm_assess import density, index, parallel
+
+#: The loader used for each value of ``--format``
+LOADERS = {
+    "track": "load",
+    "hart": "load_hart",
+    "hurdat2": "load_hurdat2",
+    "no_assumptions": "load_no_assumptions",
+}
+
+#: Columns written by the summary command
+SUMMARY_COLUMNS = [
+    "file", "member", "snbr", "npoints", "genesis_date", "lysis_date", "lifetime",
+    "genesis_lat", "genesis_lon", "lysis_lat", "lysis_lon", "vmax", "mslp_min",
+    "vort_max", "ace",
+]
+
+
+def main(argv=None):
+    """Run the storm-assess command line interface
+
+    Args:
+        argv (list of str, optional): Command line arguments. Default is sys.argv
+
+    Returns:
+        int: The exit status
+    """
+    args = _parser().parse_args(argv)
+    args.function(args)
+    return 0
+
+
+def _int_list(text):
+    """Parse a comma separated list of integers or ranges (e.g. "1,3,6-9")"""
+    values = []
+    for item in text.split(","):
+        if "-" in item.strip("-"):
+            start, end = item.split("-")
+            values.extend(range(int(start), int(end) + 1))
+        else:
+            values.append(int(item))
+    return values
+
+
+def _parser():
+    parser = argparse.ArgumentParser(
+        prog="storm-assess",
+        description="Batch processing of TRACK storm files",
+    )
+    subparsers = parser.add_subparsers(required=True, dest="command")
+
+    # Options shared by all commands
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("inputs", nargs="+", help="TRACK files to read")
+    common.add_argument("-o", "--output", required=True, help="File to write")
+    common.add_argument(
+        "--format", choices=LOADERS, default="track",
+        help="Layout of the input files, which determines the loader used (default: %(default)s)",
+    )
+    common.add_argument(
+        "--ex-cols", type=int, default=0, help="Passed to the loader (default: %(default)s)"
+    )
+    common.add_argument(
+        "--calendar", default=None,
+        help='Passed to the loader, e.g. "netcdftime" for a 360-day calendar',
+    )
+    common.add_argument(
+        "-j", "--jobs", type=int, default=1,
+        help="Number of input files to process in parallel (default: %(default)s)",
+    )
+
+    select = argparse.ArgumentParser(add_help=False)
+    group = select.add_argument_group("selection")
+    group.add_argument(
+        "--years", type=_int_list, help="Years of genesis, e.g. 2000,2002 or 2000-2010"
+    )
+    group.add_argument("--months", type=_int_list, help="Months of genesis, e.g. 6-11")
+    group.add_argument("--basin", help='Ocean basin the track must pass through, e.g. "na"')
+    group.add_argument("--members", type=_int_list, help="Ensemble members to keep")
+
+    command = subparsers.add_parser(
+        "convert", parents=[common], help="Convert to TRACK text or netCDF (.nc) files"
+    )
+    command.set_defaults(function=_write_storms)
+
+    command = subparsers.add_parser(
+        "filter", parents=[common, select],
+        help="Select storms and write them as TRACK text or netCDF (.nc) files",
+    )
+    command.set_defaults(function=_write_storms)
+
+    command = subparsers.add_parser(
+        "summary", parents=[common, select], help="Write a CSV table of per-storm metrics"
+    )
+    command.set_defaults(function=_summary)
+
+    command = subparsers.add_parser(
+        "density", parents=[common, select], help="Write a gridded density as netCDF"
+    )
+    command.add_argument(
+        "--resolution", type=float, default=4.0,
+        help="Grid spacing in degrees (default: %(default)s)",
+    )
+    command.add_argument(
+        "--points", choices=density.POINTS, default="track",
+        help="Points of each track to count (default: %(default)s)",
+    )
+    command.set_defaults(function=_density)
+
+    return parser
+
+
+def _load(filename, member, args):
+    """Generator of the selected storms in a file"""
+    from storm_assess import track
+
+    members = getattr(args, "members", None)
+    if members is not None and member not in members:
+        return
+
+    loader = getattr(track, LOADERS[args.format])
+    selection = _selection(args)
+    if args.format == "no_assumptions":
+        storms = loader(filename, calendar=args.calendar, output_type="storm", **selection)
+    else:
+        storms = loader(filename, ex_cols=args.ex_cols, calendar=args.calendar, **selection)
+
+    years = getattr(args, "years", None)
+    for storm in storms:
+        storm.extras.setdefault("member", member)
+        if years is None or storm.genesis_date().year in years:
+            yield storm
+
+
+def _selection(args):
+    """ Selection arguments for the loaders, so that storms outside the requested times
+    and basin are skipped without being parsed """
+    selection = dict(
+        months=getattr(args, "months", None), basin=getattr(args, "basin", None)
+    )
+
+    # The loaders select a range of times so the years are also checked afterwards
+    years = getattr(args, "years", None)
+    if years is not None:
+        selection["start_time"] = (
+            index.time_number(f"{min(years):04d}010100"),
+            index.time_number(f"{max(years) + 1:04d}010100"),
+        )
+    return selection
+
+
+def _map_files(function, args):
+    """Apply function to each (member, filename) of the inputs, in parallel if requested,
+    returning an iterator of the results in the order of the inputs"""
+    if args.jobs == 1:
+        return (function(item, args) for item in enumerate(args.inputs))
+
+    return parallel.imap_storms(
+        _collect,
+        enumerate(args.inputs),
+        kwargs=dict(function=function, args=args),
+        executor="process",
+        max_workers=args.jobs,
+        chunksize=1,
+    )
+
+
+def _collect(item, function, args):
+    # Generators can't be returned from a worker process so convert them to lists
+    result = function(item, args)
+    if inspect.isgenerator(result):
+        return list(result)
+    return result
+
+
+def _select_file(item, args):
+    member, filename = item
+    return _load(filename, member, args)
+
+
+def _write_storms(args):
+    from storm_assess import track
+
+    storms = itertools.chain.from_iterable(_map_files(_select_file, args))
+    if args.output.endswith(".nc"):
+        track.save_netcdf([track.to_xarray(storm) for storm in storms], args.output)
+    else:
+        track.write(storms, args.output)
+
+
+def _summarise(storm):
+    genesis, lysis = storm.obs_at_genesis(), storm.obs_at_lysis()
+    if "vmax_kts" in genesis.extras:
+        ace = storm.ace_index()
+    else:
+        ace = math.nan
+
+    return dict(
+        snbr=storm.snbr,
+        member=storm.extras["member"],
+        npoints=len(storm),
+        genesis_date=genesis.date,
+        lysis_date=lysis.date,
+        lifetime=(lysis.date - genesis.date) / datetime.timedelta(hours=1),
+        genesis_lat=genesis.lat,
+        genesis_lon=genesis.lon,
+        lysis_lat=lysis.lat,
+        lysis_lon=lysis.lon,
+        vmax=storm.vmax,
+        mslp_min=storm.mslp_min,
+        vort_max=storm.vort_max,
+        ace=ace,
+    )
+
+
+def _summarise_file(item, args):
+    member, filename = item
+    for storm in _load(filename, member, args):
+        yield dict(_summarise(storm), file=filename)
+
+
+def _summary(args):
+    with open(args.output, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=SUMMARY_COLUMNS)
+        writer.writeheader()
+        for rows in _map_files(_summarise_file, args):
+            writer.writerows(rows)
+
+
+def _density_file(item, args):
+    member, filename = item
+
+    # Accumulate the counts in batches of storms to limit memory use
+    total = density.empty(args.resolution)
+    storms = _load(filename, member, args)
+    while True:
+        batch = list(itertools.islice(storms, 1000))
+        if not batch:
+            return total
+        total += density.point_density(batch, resolution=args.resolution, points=args.points)
+
+
+def _density(args):
+    total = functools.reduce(
+        operator.add, _map_files(_density_file, args), density.empty(args.resolution)
+    )
+    total.attrs["points"] = args.points
+    total.to_netcdf(args.output)
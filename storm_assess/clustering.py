@@ -0,0 +1,366 @@
+"""
+Clustering of storm tracks by the shape of their trajectories, with k-means,
+Gaussian mixtures or k-medoids on the pairwise distances between tracks.
+"""
+import numpy as np
+
+from storm_assess import _ragged, geodesy, parallel, resample, timing
+
+
+#: Default number of points each track is resampled to
+NPOINTS = 20
+
+#: Distances between tracks that can be calculated with :func:`pairwise_distances`
+METRICS = ("mean", "frechet", "dtw")
+
+#: Approximate memory (bytes) used for the temporary arrays of each block of distances
+BLOCK_MEMORY = 2 ** 27
+
+
+def features(tracks, npoints=NPOINTS):
+    """Resample every track to the same number of points, evenly spaced in time from its
+    first to its last point
+
+    Args:
+        tracks (list): :class:`storm_assess.Storm` or :class:`xarray.Dataset` tracks
+        npoints (int, optional): Number of points for each track. Default is
+            :data:`NPOINTS`
+
+    Returns:
+        tuple (numpy.ndarray, numpy.ndarray):
+            The longitudes (0 to 360) and latitudes of the points with shape
+            (len(tracks), npoints)
+    """
+    tracks = list(tracks)
+    hours, offsets = timing.time_axes(tracks)
+    if (np.diff(offsets) == 0).any():
+        raise ValueError("Can not calculate features for tracks with no points")
+    values, _ = _ragged.ragged_arrays(tracks, ["lon", "lat"])
+
+    new_hours, new_offsets = resample.target_times(hours, offsets, npoints=npoints)
+    lons, lats = resample.interpolate_positions(
+        hours, values["lon"], values["lat"], offsets, new_hours, new_offsets
+    )
+    return lons.reshape(len(tracks), npoints), lats.reshape(len(tracks), npoints)
+
+
+def cartesian(lons, lats):
+    """Converts positions to unit vectors, to be used as features for clustering
+
+    Args:
+        lons, lats (numpy.ndarray): Positions in degrees with shape (ntracks, npoints)
+
+    Returns:
+        numpy.ndarray: The x, y and z components of each point with shape
+        (ntracks, 3 * npoints)
+    """
+    lons, lats = np.radians(lons), np.radians(lats)
+    xyz = np.stack(
+        [np.cos(lats) * np.cos(lons), np.cos(lats) * np.sin(lons), np.sin(lats)], axis=-1
+    )
+    return xyz.reshape(len(xyz), -1)
+
+
+def _block_size(ntracks, npoints, metric, itemsize):
+    """ Number of rows of the distance matrix calculated at once """
+    # The separations between pairs of points take npoints values for each pair of
+    # tracks (npoints * npoints for Fréchet/DTW) and there are a few temporary arrays
+    per_pair = npoints if metric == "mean" else npoints * npoints
+    return max(1, int(BLOCK_MEMORY // (4 * itemsize * per_pair * max(ntracks, 1))))
+
+
+def _accumulate(separation, combine):
+    """ Discrete Fréchet (combine=np.maximum) or DTW (combine=np.add) distance from the
+    separations of every pair of points, with shape (npoints, npoints, ...) """
+    n, m = separation.shape[:2]
+    total = np.empty_like(separation)
+    total[0, 0] = separation[0, 0]
+    for j in range(1, m):
+        total[0, j] = combine(separation[0, j], total[0, j - 1])
+    for i in range(1, n):
+        total[i, 0] = combine(separation[i, 0], total[i - 1, 0])
+        for j in range(1, m):
+            previous = np.minimum(
+                np.minimum(total[i - 1, j], total[i, j - 1]), total[i - 1, j - 1]
+            )
+            total[i, j] = combine(separation[i, j], previous)
+    return total[-1, -1]
+
+
+def _distance_block(start, lons, lats, metric, block_size, units):
+    """ Distances from the tracks in rows start:start + block_size to the tracks from
+    start onwards """
+    rows = slice(start, start + block_size)
+    if metric == "mean":
+        separation = geodesy.distance(
+            lons[rows, np.newaxis], lats[rows, np.newaxis],
+            lons[np.newaxis, start:], lats[np.newaxis, start:], units=units,
+        )
+        return separation.mean(axis=-1)
+
+    # Every pair of points, with the points first so that each step of the dynamic
+    # programming works on contiguous arrays over all pairs of tracks
+    lons1 = lons[rows].T[:, np.newaxis, :, np.newaxis]
+    lats1 = lats[rows].T[:, np.newaxis, :, np.newaxis]
+    lons2 = lons[start:].T[np.newaxis, :, np.newaxis]
+    lats2 = lats[start:].T[np.newaxis, :, np.newaxis]
+    separation = geodesy.distance(lons1, lats1, lons2, lats2, units=units)
+    return _accumulate(separation, np.maximum if metric == "frechet" else np.add)
+
+
+def pairwise_distances(lons, lats, metric="mean", units="km", dtype=np.float64,
+                       out=None, block_size=None, executor="thread", max_workers=None):
+    """Distances between every pair of tracks
+
+    Args:
+        lons, lats (numpy.ndarray): Positions of the resampled tracks in degrees with
+            shape (ntracks, npoints), e.g. from :func:`features`
+        metric (str, optional): One of :data:`METRICS`
+
+            * "mean": The mean great-circle separation of the points at the same
+              times. Default
+            * "frechet": The discrete Fréchet distance, the smallest maximum separation
+              of the points when the tracks are traversed in order at any speeds
+            * "dtw": The dynamic time warping distance, the smallest sum of the
+              separations of the points along any alignment of the tracks
+
+        units (str, optional): Units of distance, one of
+            :data:`storm_assess.geodesy.UNITS`. Default is "km"
+        dtype (optional): Type of the calculation and result. Use numpy.float32 to
+            halve the memory used. Default is numpy.float64
+        out (numpy.ndarray, optional): Array of shape (ntracks, ntracks) to store the
+            result in, e.g. a :class:`numpy.memmap`
+        block_size (int, optional): Number of rows calculated in each task. Default is
+            chosen from :data:`BLOCK_MEMORY`
+        executor (str, optional): See :func:`storm_assess.parallel.imap_storms`. Default
+            is "thread" as numpy releases the GIL for the array calculations
+        max_workers (int, optional): Number of workers. Default is the number of CPUs
+
+    Returns:
+        numpy.ndarray: The symmetric distance matrix
+    """
+    if metric not in METRICS:
+        raise ValueError(f"metric must be one of {METRICS}, not {metric}")
+    lons, lats = np.asarray(lons, dtype=dtype), np.asarray(lats, dtype=dtype)
+    ntracks, npoints = lons.shape
+    if out is None:
+        out = np.empty((ntracks, ntracks), dtype=dtype)
+    if block_size is None:
+        block_size = _block_size(ntracks, npoints, metric, lons.itemsize)
+
+    starts = range(0, ntracks, block_size)
+    blocks = parallel.imap_storms(
+        _distance_block, starts, args=(lons, lats, metric, block_size, units),
+        executor=executor, max_workers=max_workers, chunksize=1,
+    )
+    for start, block in zip(starts, blocks):
+        end = start + len(block)
+        out[start:end, start:] = block
+        out[start:, start:end] = block.T
+
+    return out
+
+
+def _nearest(x, centres):
+    """ Index of the nearest centre to each row of x and the squared distance to it """
+    squared = (
+        np.einsum("ij,ij->i", x, x)[:, np.newaxis]
+        - 2 * x @ centres.T
+        + np.einsum("ij,ij->i", centres, centres)[np.newaxis]
+    )
+    nearest = squared.argmin(axis=1)
+    return nearest, np.maximum(squared[np.arange(len(x)), nearest], 0)
+
+
+def _kmeans_plus_plus(squared_distance, nclusters, npoints, rng):
+    """ Chooses initial centres (by index) with probability proportional to the squared
+    distance from the centres already chosen. squared_distance(index) gives the squared
+    distances of every point from point index """
+    chosen = [rng.integers(npoints)]
+    closest = squared_distance(chosen[0])
+    for _ in range(1, nclusters):
+        total = closest.sum()
+        if total > 0:
+            index = rng.choice(npoints, p=closest / total)
+        else:
+            index = rng.integers(npoints)
+        chosen.append(index)
+        closest = np.minimum(closest, squared_distance(index))
+    return np.array(chosen)
+
+
+def _check_nclusters(nclusters, npoints):
+    if not 1 <= nclusters <= npoints:
+        raise ValueError(
+            f"nclusters must be between 1 and the number of tracks ({npoints}), "
+            f"not {nclusters}"
+        )
+
+
+def kmeans(x, nclusters, niterations=100, seed=None):
+    """k-means clustering, initialised with k-means++
+
+    Args:
+        x (numpy.ndarray): Features with shape (ntracks, nfeatures), e.g. from
+            :func:`cartesian`
+        nclusters (int): Number of clusters
+        niterations (int, optional): Maximum number of iterations. Default is 100
+        seed (int, optional): Seed for the random initial centres
+
+    Returns:
+        tuple (numpy.ndarray, numpy.ndarray):
+            The cluster of each track and the centre of each cluster
+    """
+    x = np.asarray(x, dtype=float)
+    _check_nclusters(nclusters, len(x))
+    rng = np.random.default_rng(seed)
+    chosen = _kmeans_plus_plus(
+        lambda index: ((x - x[index]) ** 2).sum(axis=1), nclusters, len(x), rng
+    )
+    centres = x[chosen]
+
+    for _ in range(niterations):
+        labels, _ = _nearest(x, centres)
+        counts = np.bincount(labels, minlength=nclusters)
+        sums = np.zeros_like(centres)
+        np.add.at(sums, labels, x)
+
+        # Leave the centre of any empty cluster where it is
+        new_centres = centres.copy()
+        filled = counts > 0
+        new_centres[filled] = sums[filled] / counts[filled, np.newaxis]
+        if np.array_equal(new_centres, centres):
+            break
+        centres = new_centres
+
+    labels, _ = _nearest(x, centres)
+    return labels, centres
+
+
+def gaussian_mixture(x, ncomponents, niterations=100, tol=1e-6, seed=None):
+    """Gaussian mixture model clustering with diagonal covariances, fitted by
+    expectation-maximisation starting from :func:`kmeans`
+
+    Args:
+        x (numpy.ndarray): Features with shape (ntracks, nfeatures), e.g. from
+            :func:`cartesian`
+        ncomponents (int): Number of components (clusters)
+        niterations (int, optional): Maximum number of iterations. Default is 100
+        tol (float, optional): Stop when the mean log-likelihood changes by less than
+            this. Default is 1e-6
+        seed (int, optional): Seed for the random initial centres
+
+    Returns:
+        tuple (numpy.ndarray, numpy.ndarray):
+            The most likely component of each track and the probability of each track
+            belonging to each component, with shape (ntracks, ncomponents)
+    """
+    x = np.asarray(x, dtype=float)
+    labels, _ = kmeans(x, ncomponents, seed=seed)
+    probability = np.eye(ncomponents)[labels]
+
+    # Keep the variances away from zero, relative to the spread of the features
+    regularisation = 1e-6 * max(x.var(axis=0).mean(), np.finfo(float).tiny)
+    log_likelihood = -np.inf
+    for _ in range(niterations):
+        # Maximisation: the parameters of each component from its members
+        total = probability.sum(axis=0) + 10 * np.finfo(float).eps
+        weights = total / len(x)
+        means = probability.T @ x / total[:, np.newaxis]
+        variances = probability.T @ x ** 2 / total[:, np.newaxis] - means ** 2
+        variances = np.maximum(variances, 0) + regularisation
+
+        # Expectation: the log of the weighted probability density of each track for
+        # each component
+        precision = 1 / variances
+        log_density = -0.5 * (
+            x ** 2 @ precision.T
+            - 2 * x @ (means * precision).T
+            + (means ** 2 * precision).sum(axis=1)
+            + np.log(2 * np.pi * variances).sum(axis=1)
+        ) + np.log(weights)
+        log_total = np.logaddexp.reduce(log_density, axis=1)
+        probability = np.exp(log_density - log_total[:, np.newaxis])
+
+        previous, log_likelihood = log_likelihood, log_total.mean()
+        if abs(log_likelihood - previous) < tol:
+            break
+
+    return probability.argmax(axis=1), probability
+
+
+def kmedoids(distances, nclusters, niterations=100, seed=None):
+    """k-medoids clustering from a distance matrix, e.g. from :func:`pairwise_distances`
+
+    Each cluster is represented by one of its tracks (the medoid), which has the
+    smallest total distance to the other tracks in the cluster.
+
+    Args:
+        distances (numpy.ndarray): Symmetric distances with shape (ntracks, ntracks)
+        nclusters (int): Number of clusters
+        niterations (int, optional): Maximum number of iterations. Default is 100
+        seed (int, optional): Seed for the random initial medoids
+
+    Returns:
+        tuple (numpy.ndarray, numpy.ndarray):
+            The cluster of each track and the index of the medoid of each cluster
+    """
+    distances = np.asarray(distances)
+    _check_nclusters(nclusters, len(distances))
+    rng = np.random.default_rng(seed)
+    medoids = _kmeans_plus_plus(
+        lambda index: np.asarray(distances[index], dtype=float) ** 2,
+        nclusters, len(distances), rng,
+    )
+
+    for _ in range(niterations):
+        labels = distances[:, medoids].argmin(axis=1)
+        new_medoids = medoids.copy()
+        for cluster in range(nclusters):
+            members = np.flatnonzero(labels == cluster)
+            if len(members):
+                cost = distances[np.ix_(members, members)].sum(axis=1)
+                new_medoids[cluster] = members[cost.argmin()]
+        if np.array_equal(new_medoids, medoids):
+            break
+        medoids = new_medoids
+
+    return distances[:, medoids].argmin(axis=1), medoids
+
+
+def cluster_tracks(tracks, nclusters, method="kmeans", npoints=NPOINTS, seed=None):
+    """Cluster tracks by the positions of their resampled points. See :func:`features`
+    and :func:`cartesian`
+
+    Args:
+        tracks (list): :class:`storm_assess.Storm` or :class:`xarray.Dataset` tracks
+        nclusters (int): Number of clusters
+        method (str, optional): "kmeans" (:func:`kmeans`) or "mixture"
+            (:func:`gaussian_mixture`). Default is "kmeans"
+        npoints (int, optional): Number of points each track is resampled to
+        seed (int, optional): Seed for the random initialisation
+
+    Returns:
+        tuple (numpy.ndarray, numpy.ndarray):
+            The cluster of each track and the mean longitudes and latitudes of the
+            resampled points of each cluster, with shape (nclusters, npoints, 2)
+    """
+    if method not in ("kmeans", "mixture"):
+        raise ValueError(f'method must be "kmeans" or "mixture", not {method}')
+    lons, lats = features(tracks, npoints=npoints)
+    x = cartesian(lons, lats)
+    if method == "kmeans":
+        labels, _ = kmeans(x, nclusters, seed=seed)
+    else:
+        labels, _ = gaussian_mixture(x, nclusters, seed=seed)
+
+    # Mean positions as the direction of the mean unit vector of each point
+    counts = np.bincount(labels, minlength=nclusters)
+    sums = np.zeros((nclusters, x.shape[1]))
+    np.add.at(sums, labels, x)
+    xyz = (sums / np.maximum(counts, 1)[:, np.newaxis]).reshape(nclusters, npoints, 3)
+    mean_lons = np.degrees(np.arctan2(xyz[..., 1], xyz[..., 0])) % 360
+    mean_lats = np.degrees(np.arctan2(xyz[..., 2], np.hypot(xyz[..., 0], xyz[..., 1])))
+    centres = np.stack([mean_lons, mean_lats], axis=-1)
+    centres[counts == 0] = np.nan
+    return labels, centres
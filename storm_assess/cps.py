@@ -0,0 +1,135 @@
+"""
+Classification of storms in the cyclone phase space (CPS) of Hart (2003), including
+the onset and completion of extratropical transition.
+"""
+import numpy as np
+import pandas as pd
+
+from storm_assess import _ragged
+
+
+#: Thermal asymmetry (m) above which a storm is considered asymmetric (frontal)
+B_THRESHOLD = 10.
+
+#: Phase categories. Observations with missing CPS parameters are labelled MISSING
+MISSING = -1
+SYMMETRIC_WARM_CORE = 0
+ASYMMETRIC_WARM_CORE = 1
+SYMMETRIC_COLD_CORE = 2
+ASYMMETRIC_COLD_CORE = 3
+
+#: Descriptions of each phase category
+PHASE_NAMES = {
+    MISSING: 'missing',
+    SYMMETRIC_WARM_CORE: 'symmetric warm core',
+    ASYMMETRIC_WARM_CORE: 'asymmetric warm core',
+    SYMMETRIC_COLD_CORE: 'symmetric cold core',
+    ASYMMETRIC_COLD_CORE: 'asymmetric cold core',
+}
+
+
+def _valid(values):
+    # TRACK uses large values (1e12 or 1e25) for missing data
+    return np.isfinite(values) & (np.abs(values) < 1e10)
+
+
+def _phase(b, thermal_wind, b_threshold):
+    phase = np.where(b > b_threshold, ASYMMETRIC_WARM_CORE, SYMMETRIC_WARM_CORE)
+    phase[thermal_wind < 0] += SYMMETRIC_COLD_CORE
+    phase[~(_valid(b) & _valid(thermal_wind))] = MISSING
+    return phase
+
+
+def classify(storms, b_threshold=B_THRESHOLD, thermal_wind='TL', b='B'):
+    """Classify every observation of every storm into a CPS phase category
+
+    Args:
+        storms (list): :class:`storm_assess.Storm` or :class:`xarray.Dataset` tracks
+            with the CPS parameters as per-observation variables
+        b_threshold (float, optional): Thermal asymmetry separating symmetric and
+            asymmetric storms. Default is 10 m
+        thermal_wind (str, optional): Name of the thermal wind parameter used to define
+            warm/cold core. Default is "TL" (the lower troposphere)
+        b (str, optional): Name of the thermal asymmetry parameter. Default is "B"
+
+    Returns:
+        list of numpy.ndarray:
+            The phase category (e.g. :data:`SYMMETRIC_WARM_CORE`) of each observation
+            for each storm
+    """
+    values, offsets = _ragged.ragged_arrays(storms, [b, thermal_wind])
+    phase = _phase(values[b], values[thermal_wind], b_threshold)
+
+    return _ragged.split(phase, offsets)
+
+
+def extratropical_transition(storms, b_threshold=B_THRESHOLD, tl='TL', tu='TU', b='B'):
+    """Detect the extratropical transition of each storm and summarise its CPS phases
+
+    Args:
+        storms (list): :class:`storm_assess.Storm` or :class:`xarray.Dataset` tracks
+            with the CPS parameters as per-observation variables
+        b_threshold (float, optional): Thermal asymmetry separating symmetric and
+            asymmetric storms. Default is 10 m
+        tl, tu, b (str, optional): Names of the CPS parameters
+
+    Returns:
+        pandas.DataFrame:
+            One row per storm with the index of the observation and time of ET onset
+            and completion (-1 and null if they do not occur), whether the storm
+            completed ET, the fraction of (valid) observations in each phase category
+            and the maximum B and minimum/maximum TL and TU.
+    """
+    values, offsets = _ragged.ragged_arrays(storms, ['date', b, tl, tu])
+    phase = _phase(values[b], values[tl], b_threshold)
+    times = values['date']
+
+    # A storm can only undergo ET after being a symmetric warm-core system
+    tropical = _ragged.first_true(phase == SYMMETRIC_WARM_CORE, offsets)
+    asymmetric = (phase == ASYMMETRIC_WARM_CORE) | (phase == ASYMMETRIC_COLD_CORE)
+    onset = _ragged.first_true(asymmetric, offsets, start=tropical)
+    cold_core = (phase == SYMMETRIC_COLD_CORE) | (phase == ASYMMETRIC_COLD_CORE)
+    completion = _ragged.first_true(cold_core, offsets, start=onset)
+
+    summary = pd.DataFrame(dict(
+        onset_index=onset,
+        onset_time=_times_at(times, offsets, onset),
+        completion_index=completion,
+        completion_time=_times_at(times, offsets, completion),
+        transitioned=completion >= 0,
+    ))
+
+    # Fraction of time spent in each phase, excluding missing values
+    storm_index = _ragged.track_index(offsets)
+    valid = phase != MISSING
+    nvalid = np.bincount(storm_index[valid], minlength=len(storms))
+    for category in PHASE_NAMES:
+        if category == MISSING:
+            continue
+        count = np.bincount(storm_index[phase == category], minlength=len(storms))
+        with np.errstate(invalid='ignore', divide='ignore'):
+            summary['fraction_' + PHASE_NAMES[category].replace(' ', '_')] = count / nvalid
+
+    for name, function in [(b, np.fmax), (tl, np.fmin), (tl, np.fmax), (tu, np.fmin), (tu, np.fmax)]:
+        label = '%s_%s' % (function.__name__[1:], name)
+        summary[label] = _reduce(values[name], offsets, function)
+
+    return summary
+
+
+def _times_at(times, offsets, index):
+    """ Returns the time at the given index of each track or None if index is -1 """
+    result = np.full(len(index), None, dtype=object)
+    found = index >= 0
+    result[found] = times[offsets[:-1][found] + index[found]]
+    return result
+
+
+def _reduce(values, offsets, function):
+    """ Reduce the valid values for each track with a NaN-ignoring ufunc """
+    values = np.where(_valid(values), values, np.nan)
+    result = np.full(len(offsets) - 1, np.nan)
+    nonempty = np.diff(offsets) > 0
+    if nonempty.any():
+        result[nonempty] = function.reduceat(values, offsets[:-1][nonempty])
+    return result
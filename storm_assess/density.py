@@ -0,0 +1,314 @@
+"""
+Gridded densities of storm positions (e.g. track, genesis or lysis densities) and
+ensemble strike probabilities.
+"""
+import numpy as np
+import xarray
+
+from storm_assess import _ragged, geodesy, parallel
+
+
+#: Points of each track that can be counted
+POINTS = ("track", "genesis", "lysis", "max_intensity")
+
+#: Default radius (km) of the track footprints for strike probabilities
+STRIKE_RADIUS = 120.0
+
+#: Maximum number of (segment, grid cell) distances calculated at once
+MAX_PAIRS = 2 ** 20
+
+
+def grid(resolution=4.0):
+    """Returns the cell edges of a global lat/lon grid
+
+    Args:
+        resolution (float, optional): Grid spacing in degrees. Default is 4 degrees to
+            match :func:`storm_assess.functions._cube_data`
+
+    Returns:
+        tuple (numpy.ndarray, numpy.ndarray):
+            Latitude edges from -90 to 90 and longitude edges from 0 to 360
+    """
+    lat_edges = np.linspace(-90, 90, int(round(180 / resolution)) + 1)
+    lon_edges = np.linspace(0, 360, int(round(360 / resolution)) + 1)
+    return lat_edges, lon_edges
+
+
+def empty(resolution=4.0):
+    """Returns a density grid of zeros. See :func:`point_density` """
+    lat_edges, lon_edges = grid(resolution)
+    return _to_dataarray(np.zeros((len(lat_edges) - 1, len(lon_edges) - 1)), lat_edges, lon_edges)
+
+
+def storm_points(storms, points="track"):
+    """Returns the latitudes and longitudes of the requested points of every storm
+
+    Args:
+        storms (list): :class:`storm_assess.Storm` or :class:`xarray.Dataset` tracks
+        points (str, optional): One of :data:`POINTS`. "track" uses every point of each
+            track, "genesis"/"lysis" the first/last point and "max_intensity" the point
+            of maximum vmax
+
+    Returns:
+        tuple (numpy.ndarray, numpy.ndarray): latitudes and longitudes
+    """
+    if points not in POINTS:
+        raise ValueError(f"points must be one of {POINTS}, not {points}")
+
+    names = ["lat", "lon"]
+    if points == "max_intensity":
+        names.append("vmax")
+    values, offsets = _ragged.ragged_arrays(storms, names)
+    lats, lons = values["lat"], values["lon"]
+
+    nonempty = np.diff(offsets) > 0
+    if points == "genesis":
+        index = offsets[:-1][nonempty]
+    elif points == "lysis":
+        index = offsets[1:][nonempty] - 1
+    elif points == "max_intensity":
+        # Index of the first maximum of each track, ignoring missing values. Use the
+        # first point if vmax is missing for the whole track
+        vmax = values["vmax"]
+        track_max = np.fmax.reduceat(vmax, offsets[:-1][nonempty])
+        is_max = vmax == np.repeat(track_max, np.diff(offsets)[nonempty])
+        first = _ragged.first_true(is_max, offsets)
+        first[first < 0] = 0
+        index = (offsets[:-1] + first)[nonempty]
+    else:
+        return lats, lons
+
+    return lats[index], lons[index]
+
+
+def point_density(storms, resolution=4.0, points="track"):
+    """Count the number of storm points in each cell of a global lat/lon grid
+
+    Args:
+        storms (list): :class:`storm_assess.Storm` or :class:`xarray.Dataset` tracks
+        resolution (float, optional): Grid spacing in degrees. Default is 4
+        points (str, optional): Which points of the tracks to count. See
+            :func:`storm_points`
+
+    Returns:
+        xarray.DataArray: The number of points in each grid cell
+    """
+    lats, lons = storm_points(storms, points=points)
+    lat_edges, lon_edges = grid(resolution)
+
+    # Normalise lon values into the range 0-360
+    counts, _, _ = np.histogram2d(lats, lons % 360, bins=[lat_edges, lon_edges])
+
+    return _to_dataarray(counts, lat_edges, lon_edges)
+
+
+def _segments(lons, lats, offsets):
+    """ Indices of the start and end points of every segment of each track. Tracks with
+    a single point have a segment of zero length and segments with missing positions
+    are left out """
+    lengths = np.diff(offsets)
+    start = np.arange(len(lons))
+    last = np.repeat(offsets[1:] - 1, lengths)
+    keep = (start < last) | (np.repeat(lengths, lengths) == 1)
+    start = start[keep]
+    end = np.minimum(start + 1, last[keep])
+
+    valid = np.isfinite(lons) & np.isfinite(lats)
+    keep = valid[start] & valid[end]
+    return start[keep], end[keep]
+
+
+def _windows(lon1, lat1, lon2, lat2, radius, resolution, nlon, nlat):
+    """ The first row and column and the number of rows and columns of the grid cells
+    that may be within radius of each segment """
+    # Degrees of latitude within radius, plus the distance that the great circle can
+    # bulge poleward of the end points and one cell for the cell centres
+    radius_degrees = np.degrees(radius / geodesy.EARTH_RADIUS)
+    length = geodesy.distance(lon1, lat1, lon2, lat2) / geodesy.EARTH_RADIUS
+    max_lat = np.minimum(np.maximum(np.abs(lat1), np.abs(lat2)), 89)
+    bulge = np.degrees(length ** 2 * np.tan(np.radians(max_lat)) / 8)
+    margin = radius_degrees + bulge + resolution
+
+    lat_low = np.minimum(lat1, lat2) - margin
+    lat_high = np.maximum(lat1, lat2) + margin
+    row = np.clip(np.floor((lat_low + 90) / resolution), 0, nlat - 1).astype(int)
+    nrows = np.clip(np.floor((lat_high + 90) / resolution), 0, nlat - 1).astype(int) - row + 1
+
+    # The longitudes within radius get wider towards the poles. Use the whole circle of
+    # longitude if the window reaches a pole
+    edge = np.minimum(np.maximum(np.abs(lat_low), np.abs(lat_high)), 90)
+    cos_lat = np.cos(np.radians(edge))
+    lon_margin = np.divide(
+        radius_degrees, cos_lat, out=np.full(len(lon1), np.inf), where=cos_lat > 1e-6
+    ) + resolution
+
+    # Take the end of each segment on the same side of the dateline as its start
+    lon2 = lon1 + (lon2 - lon1 + 180) % 360 - 180
+    lon_low = np.minimum(lon1, lon2) - lon_margin
+    lon_high = np.maximum(lon1, lon2) + lon_margin
+    whole = lon_high - lon_low >= 360
+    column = np.floor(np.where(whole, 0, lon_low) / resolution).astype(int)
+    ncolumns = np.floor(np.where(whole, 0, lon_high) / resolution).astype(int) - column + 1
+    ncolumns = np.where(whole, nlon, np.minimum(ncolumns, nlon))
+    return row, nrows, column % nlon, ncolumns
+
+
+def _footprint_counts(lons, lats, offsets, radius, resolution):
+    """ Number of tracks passing within radius of the centre of each grid cell """
+    lat_edges, lon_edges = grid(resolution)
+    nlat, nlon = len(lat_edges) - 1, len(lon_edges) - 1
+    lat_centres = 0.5 * (lat_edges[1:] + lat_edges[:-1])
+    lon_centres = 0.5 * (lon_edges[1:] + lon_edges[:-1])
+
+    lons, lats = np.asarray(lons, dtype=float) % 360, np.asarray(lats, dtype=float)
+    start, end = _segments(lons, lats, offsets)
+    track = _ragged.track_index(offsets)[start]
+    lon1, lat1, lon2, lat2 = lons[start], lats[start], lons[end], lats[end]
+    row, nrows, column, ncolumns = _windows(
+        lon1, lat1, lon2, lat2, radius, resolution, nlon, nlat
+    )
+
+    # Work through the segments in chunks with a limited number of (segment, cell) pairs
+    npairs = nrows * ncolumns
+    total = np.cumsum(npairs)
+    bounds = np.unique(np.concatenate([
+        [0], np.searchsorted(total, np.arange(MAX_PAIRS, total[-1:].sum(), MAX_PAIRS)),
+        [len(npairs)],
+    ]))
+
+    hits = []
+    for first, last in zip(bounds[:-1], bounds[1:]):
+        chunk = slice(first, last)
+        segment = np.repeat(np.arange(first, last), npairs[chunk])
+        pair_offsets = np.cumsum(npairs[chunk]) - npairs[chunk]
+        local = np.arange(len(segment)) - np.repeat(pair_offsets, npairs[chunk])
+        i = row[segment] + local // ncolumns[segment]
+        j = (column[segment] + local % ncolumns[segment]) % nlon
+
+        distance = geodesy.distance_to_segment(
+            lon_centres[j], lat_centres[i],
+            lon1[segment], lat1[segment], lon2[segment], lat2[segment],
+        )
+        near = distance <= radius
+        # Count each track once in each cell
+        cell = i[near] * nlon + j[near]
+        hits.append(np.unique(track[segment[near]] * (nlat * nlon) + cell))
+
+    cells = np.unique(np.concatenate(hits + [np.zeros(0, dtype=int)])) % (nlat * nlon)
+    return np.bincount(cells, minlength=nlat * nlon).reshape(nlat, nlon)
+
+
+def _track_positions(storms):
+    values, offsets = _ragged.ragged_arrays(storms, ["lon", "lat"])
+    return values["lon"], values["lat"], offsets
+
+
+def _member_footprint_counts(positions, radius, resolution):
+    return _footprint_counts(*positions, radius, resolution)
+
+
+def footprint_counts(storms, radius=STRIKE_RADIUS, resolution=1.0):
+    """Count the number of storms passing within a radius of the centre of each cell of
+    a global lat/lon grid
+
+    Args:
+        storms (list): :class:`storm_assess.Storm` or :class:`xarray.Dataset` tracks
+        radius (float, optional): Distance (km). Default is :data:`STRIKE_RADIUS`
+        resolution (float, optional): Grid spacing in degrees. Default is 1
+
+    Returns:
+        xarray.DataArray: The number of storms
+    """
+    lat_edges, lon_edges = grid(resolution)
+    counts = _footprint_counts(*_track_positions(list(storms)), radius, resolution)
+    return _to_dataarray(counts, lat_edges, lon_edges, name="footprint_counts")
+
+
+def member_footprint_counts(storms, radius=STRIKE_RADIUS, resolution=1.0, members=None,
+                            executor="process", max_workers=None):
+    """Count the number of storms in each ensemble member passing within a radius of
+    the centre of each cell of a global lat/lon grid. See :func:`footprint_counts`
+
+    Args:
+        storms (iterable): :class:`storm_assess.Storm` or :class:`xarray.Dataset` tracks
+            with the ensemble member in the "member" of their extras (or attributes).
+            Storms without a member are counted as member -1
+        radius (float, optional): Distance (km). Default is :data:`STRIKE_RADIUS`
+        resolution (float, optional): Grid spacing in degrees. Default is 1
+        members (list, optional): All the ensemble members, including any without
+            storms. Storms from other members are ignored. Default is the members of the
+            storms
+        executor (str, optional): See :func:`storm_assess.parallel.imap_storms`.
+            Default is "process"
+        max_workers (int, optional): Number of workers. Default is the number of CPUs
+
+    Returns:
+        xarray.DataArray: The number of storms with dimensions (member, latitude,
+        longitude)
+    """
+    groups = {}
+    for storm in storms:
+        groups.setdefault(_ragged.track_member(storm), []).append(storm)
+    if members is None:
+        members = sorted(groups)
+    members = list(members)
+
+    lat_edges, lon_edges = grid(resolution)
+    shape = (len(members), len(lat_edges) - 1, len(lon_edges) - 1)
+    counts = np.zeros(shape, dtype=int)
+    results = parallel.imap_storms(
+        _member_footprint_counts,
+        (_track_positions(groups.get(member, [])) for member in members),
+        args=(radius, resolution), executor=executor, max_workers=max_workers,
+        chunksize=1,
+    )
+    for n, result in enumerate(results):
+        counts[n] = result
+
+    return _to_dataarray(
+        counts, lat_edges, lon_edges, name="footprint_counts", members=members
+    )
+
+
+def strike_probability(storms, radius=STRIKE_RADIUS, resolution=1.0, members=None,
+                       executor="process", max_workers=None):
+    """The fraction of ensemble members with a storm passing within a radius of the
+    centre of each cell of a global lat/lon grid. See :func:`member_footprint_counts`
+    for the arguments
+
+    Returns:
+        xarray.DataArray: The strike probability (0 to 1)
+    """
+    counts = member_footprint_counts(
+        storms, radius=radius, resolution=resolution, members=members,
+        executor=executor, max_workers=max_workers,
+    )
+    return (counts > 0).mean("member").rename("strike_probability")
+
+
+def ensemble_track_density(storms, radius=STRIKE_RADIUS, resolution=1.0, members=None,
+                           executor="process", max_workers=None):
+    """The mean number of storms per ensemble member passing within a radius of the
+    centre of each cell of a global lat/lon grid. See :func:`member_footprint_counts`
+    for the arguments
+
+    Returns:
+        xarray.DataArray: The mean number of storms
+    """
+    counts = member_footprint_counts(
+        storms, radius=radius, resolution=resolution, members=members,
+        executor=executor, max_workers=max_workers,
+    )
+    return counts.mean("member").rename("track_density")
+
+
+def _to_dataarray(data, lat_edges, lon_edges, name="density", members=None):
+    dims = ["latitude", "longitude"]
+    coords = dict(
+        latitude=0.5 * (lat_edges[1:] + lat_edges[:-1]),
+        longitude=0.5 * (lon_edges[1:] + lon_edges[:-1]),
+    )
+    if members is not None:
+        dims = ["member"] + dims
+        coords["member"] = members
+    return xarray.DataArray(data, dims=dims, coords=coords, name=name)
@@ -8,13 +8,8 @@ import numpy
 import datetime
 import calendar
 
-import matplotlib.pyplot as plt
-import cartopy.crs as ccrs
-import shapely.geometry as sgeom
-
-import iris
-import iris.coord_systems as icoord_systems
-import iris.coords as icoords
+# matplotlib, cartopy, shapely and iris are slow to import so they are imported in the
+# functions that use them
 
 
 #: Lat/lon locations for each ocean basin for mapping. If set to 
@@ -108,6 +103,9 @@ def _storms_in_time_range(storms, year, months):
 
 def load_map(basin=None):
     """ Produces map for desired ocean basins for plotting. """ 
+    import matplotlib.pyplot as plt
+    import cartopy.crs as ccrs
+
     ax = plt.axes(projection=ccrs.PlateCarree(central_longitude=-160))
     if basin == None:
         ax.set_global()
@@ -132,6 +130,9 @@ def _basin_polygon(basin, project=True):
     through the area defined by -270 to -200W, 0 to -40S.
     
     """
+    import cartopy.crs as ccrs
+    import shapely.geometry as sgeom
+
     rbox = sgeom.Polygon(list(zip(*TRACKING_REGION.get(basin))))
     if project: 
         rbox = ccrs.PlateCarree().project_geometry(rbox, ccrs.PlateCarree())
@@ -139,36 +140,30 @@ def _basin_polygon(basin, project=True):
     
     
 def _storm_in_basin(storm, basin):
-    """ Returns True if a storm track intersects a defined ocean basin """
-    rbox = _basin_polygon(basin)   
-    lons, lats = list(zip(*[(ob.lon, ob.lat) for ob in storm.obs]))
-    track = sgeom.LineString(list(zip(lons, lats)))       
-    projected_track = ccrs.PlateCarree().project_geometry(track, ccrs.Geodetic())
-    if rbox.intersects(projected_track):
-        return True
-    return False
+    """ Returns True if a storm track intersects a defined ocean basin. To check many
+    storms use :func:`storm_assess.geometry.storms_in_basin` """
+    from storm_assess.geometry import storms_in_basin
+
+    return bool(storms_in_basin([storm], basin)[0])
 
 
 def _get_genesis_months(storms, years, basin):
     """ 
     Returns genesis month of all storms that formed within a 
-    given set of years 
+    given set of years. See :func:`storm_assess.stats.genesis_months`
     
     """
-    genesis_months = []
-    for storm in storms:
-        if (storm.genesis_date().year in years) and _storm_in_basin(storm, basin):
-            genesis_months.append(storm.genesis_date().month)
-    return genesis_months
-            
-            
+    from storm_assess.stats import genesis_months
+
+    return list(genesis_months(storms, years, basin))
+
+
 def _get_monthly_storm_count(storms, years, months, basin):
-    """ Returns list of storm counts for a desired set of months """
-    genesis_months = _get_genesis_months(storms, years, basin)
-    monthly_count = []
-    for month in months:
-        monthly_count.append(genesis_months.count(month))
-    return monthly_count
+    """ Returns list of storm counts for a desired set of months. See
+    :func:`storm_assess.stats.monthly_storm_count` """
+    from storm_assess.stats import monthly_storm_count
+
+    return monthly_storm_count(storms, years, months, basin)
 
 
 def _month_names(months):
@@ -201,6 +196,10 @@ def _get_time_period(years, months):
     
 def _cube_data(data):
     """Returns a cube given a list of lat lon information."""
+    import iris.cube
+    import iris.coord_systems as icoord_systems
+    import iris.coords as icoords
+
     cube = iris.cube.Cube(data)
     lat_lon_coord_system = icoord_systems.GeogCS(6371229)
     
@@ -272,16 +271,15 @@ def storm_lats_lons(storms, years, months, basin, genesis=False,
                 count += 1
                 
     # Normalise lon values into the range 0-360
-    norm_lons = []
-    for lon in lons:
-        norm_lons.append((lon + 720) % 360)
-    return lats, norm_lons, count
+    from storm_assess.geodesy import normalise_longitude
+
+    return lats, list(normalise_longitude(lons)), count
 
 
 def get_projected_track(storm, map_proj):
-    """ Returns track of storm as a linestring """
-    lons, lats = list(zip(*[(ob.lon, ob.lat) for ob in storm.obs]))
-    track = sgeom.LineString(list(zip(lons, lats)))
-    projected_track = map_proj.project_geometry(track, ccrs.Geodetic())
-    return projected_track
+    """ Returns track of storm as a linestring. The projected track is cached, see
+    :func:`storm_assess.geometry.track_geometry` """
+    from storm_assess.geometry import track_geometry
+
+    return track_geometry(storm, map_proj)
 
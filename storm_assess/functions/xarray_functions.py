@@ -5,60 +5,50 @@ tropical storms.
 
 """
 import numpy as np
-import pandas
-import cartopy.crs as ccrs
-import shapely.geometry as sgeom
 
-from storm_assess.functions import _get_time_range, _basin_polygon
-
-
-def _fudge_time(time):
-    return pandas.to_datetime(time.astype(str).data)
+from storm_assess import accessors  # noqa: F401 (registers the storm accessor)
+# storm_assess.geometry and storm_assess.stats are imported in the functions that use
+# them as shapely is slow to import
 
 
 def _storms_in_time_range(storms, year, months):
     """Returns a generator of storms that formed during the desired time period """
-    start_date, end_date = _get_time_range(year, months)
+    from storm_assess.stats import in_season, time_components
 
     for storm in storms:
-        time_0 = _fudge_time(storm.time[0])
+        # Compare the year and month, which works for any calendar
+        genesis = time_components(storm.time.data[:1])
+        inside, season = in_season(genesis["year"], genesis["month"], months)
 
-        if start_date <= time_0 < end_date:
+        if inside[0] and season[0] == year:
             yield storm
 
 
 def storm_in_basin(storm, basin):
-    """ Returns True if a storm track intersects a defined ocean basin """
-    rbox = _basin_polygon(basin)
-
-    tr = sgeom.LineString(list(zip(storm.longitude, storm.latitude)))
+    """ Returns True if a storm track intersects a defined ocean basin. To check many
+    storms use :func:`storm_assess.geometry.storms_in_basin` """
+    from storm_assess.geometry import storms_in_basin
 
-    projected_track = ccrs.PlateCarree().project_geometry(tr, ccrs.Geodetic())
-
-    return rbox.intersects(projected_track)
+    return bool(storms_in_basin([storm], basin)[0])
 
 
 def _get_genesis_months(storms, years, basin):
     """
     Returns genesis month of all storms that formed within a
-    given set of years
+    given set of years. See :func:`storm_assess.stats.genesis_months`
 
     """
-    genesis_months = []
-    for storm in storms:
-        t0 = _fudge_time(storm.time[0])
-        if t0.year in years and storm_in_basin(storm, basin):
-            genesis_months.append(t0.month)
-    return genesis_months
+    from storm_assess.stats import genesis_months
+
+    return list(genesis_months(storms, years, basin))
 
 
 def _get_monthly_storm_count(storms, years, months, basin):
-    """ Returns list of storm counts for a desired set of months """
-    genesis_months = _get_genesis_months(storms, years, basin)
-    monthly_count = []
-    for month in months:
-        monthly_count.append(genesis_months.count(month))
-    return monthly_count
+    """ Returns list of storm counts for a desired set of months. See
+    :func:`storm_assess.stats.monthly_storm_count` """
+    from storm_assess.stats import monthly_storm_count
+
+    return monthly_storm_count(storms, years, months, basin)
 
 
 def storm_lats_lons(storms, years, months, basin, genesis=False,
@@ -89,8 +79,9 @@ def storm_lats_lons(storms, years, months, basin, genesis=False,
                     lons.extend([storm.longitude[-1]])
                 elif max_intensity:
                     # print 'getting max int locations'
-                    lats.extend([storm.obs_at_vmax().lat])
-                    lons.extend([storm.obs_at_vmax().lon])
+                    peak = storm.storm.obs_at_vmax()
+                    lats.extend([float(peak.latitude)])
+                    lons.extend([float(peak.longitude)])
                 else:
                     # print 'getting whole storm track locations'
                     lats.extend(storm.latitude.data)
@@ -98,17 +89,16 @@ def storm_lats_lons(storms, years, months, basin, genesis=False,
                 count += 1
 
     # Normalise lon values into the range 0-360
-    lons = (np.array(lons) + 720) % 360
+    from storm_assess.geodesy import normalise_longitude
+
+    lons = normalise_longitude(lons)
 
     return np.array(lats), lons, count
 
 
 def get_projected_track(storm, map_proj=None):
-    """ Returns track of storm as a linestring """
-    track = sgeom.LineString(zip(storm.longitude, storm.latitude))
-
-    if map_proj is None:
-        return track
-    else:
-        return map_proj.project_geometry(track, ccrs.Geodetic())
+    """ Returns track of storm as a linestring. The projected track is cached, see
+    :func:`storm_assess.geometry.track_geometry` """
+    from storm_assess.geometry import track_geometry
 
+    return track_geometry(storm, map_proj)
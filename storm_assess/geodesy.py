@@ -0,0 +1,192 @@
+"""
+Great-circle calculations on arrays of positions on a spherical Earth.
+"""
+import numpy as np
+
+
+#: Mean radius of the Earth (km)
+EARTH_RADIUS = 6371.0088
+
+#: Conversion factors from kilometres to each supported unit of distance (the units of
+#: the haversine package). "rad" and "deg" are the angle at the centre of the Earth
+UNITS = {
+    "km": 1.0,
+    "m": 1000.0,
+    "mi": 0.621371192,
+    "nmi": 0.539956803,
+    "ft": 3280.839895013,
+    "in": 39370.078740158,
+    "rad": 1 / EARTH_RADIUS,
+    "deg": np.degrees(1 / EARTH_RADIUS),
+}
+
+
+def _radius(units):
+    if units not in UNITS:
+        raise ValueError(f"units must be one of {list(UNITS)}, not {units}")
+    return EARTH_RADIUS * UNITS[units]
+
+
+def _as_float(*args):
+    """ Converts the arguments to arrays of a common floating-point type, keeping
+    float32 if all the arguments are float32 """
+    arrays = [np.asarray(arg) for arg in args]
+    dtype = np.result_type(*arrays, np.float32)
+    if dtype != np.float32:
+        dtype = np.float64
+    return [array.astype(dtype, copy=False) for array in arrays]
+
+
+def normalise_longitude(lon):
+    """ Returns longitudes shifted by multiples of 360 into the range 0 <= lon < 360.
+    Missing values (TRACK uses 1e12 or 1e25) are left unchanged """
+    lon = np.asarray(lon, dtype=float)
+    return np.where(np.abs(lon) < 1e10, lon % 360, lon)
+
+
+def distance(lon1, lat1, lon2, lat2, units="km", out=None):
+    """Great-circle distance between points, using the haversine formula
+
+    Args:
+        lon1, lat1 (array_like): Positions of the first points in degrees
+        lon2, lat2 (array_like): Positions of the second points in degrees
+        units (str, optional): Units of the result, one of :data:`UNITS`. Default is
+            "km"
+        out (numpy.ndarray, optional): Array to store the result in
+
+    Returns:
+        numpy.ndarray: The distance between each pair of points
+    """
+    radius = _radius(units)
+    lon1, lat1, lon2, lat2 = (np.radians(x) for x in _as_float(lon1, lat1, lon2, lat2))
+
+    d = (np.sin((lat2 - lat1) * 0.5) ** 2 +
+         np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) * 0.5) ** 2)
+
+    # Rounding can give values slightly above 1 for antipodal points
+    angle = 2 * np.arcsin(np.sqrt(np.minimum(d, 1)))
+    return np.multiply(radius, angle, out=out)
+
+
+def bearing(lon1, lat1, lon2, lat2, out=None):
+    """Initial bearing of the great circle from the first to the second points
+
+    Args:
+        lon1, lat1 (array_like): Positions of the first points in degrees
+        lon2, lat2 (array_like): Positions of the second points in degrees
+        out (numpy.ndarray, optional): Array to store the result in
+
+    Returns:
+        numpy.ndarray: The bearing in degrees clockwise from north (0 to 360)
+    """
+    lon1, lat1, lon2, lat2 = (np.radians(x) for x in _as_float(lon1, lat1, lon2, lat2))
+    dlon = lon2 - lon1
+
+    x = np.sin(dlon) * np.cos(lat2)
+    y = np.cos(lat1) * np.sin(lat2) - np.sin(lat1) * np.cos(lat2) * np.cos(dlon)
+    return np.mod(np.degrees(np.arctan2(x, y)), 360, out=out)
+
+
+def destination(lon, lat, bearing, distance, units="km", out=None):
+    """Position reached by travelling along a great circle from a starting point
+
+    Args:
+        lon, lat (array_like): Starting positions in degrees
+        bearing (array_like): Initial direction of travel in degrees clockwise from
+            north
+        distance (array_like): Distance travelled
+        units (str, optional): Units of distance, one of :data:`UNITS`. Default is "km"
+        out (tuple of numpy.ndarray, optional): Arrays to store the longitudes and
+            latitudes in
+
+    Returns:
+        tuple (numpy.ndarray, numpy.ndarray):
+            The longitudes (0 to 360) and latitudes of the destinations in degrees
+    """
+    if out is None:
+        out = (None, None)
+    radius = _radius(units)
+    lon, lat, bearing, distance = _as_float(lon, lat, bearing, distance)
+    lon, lat, bearing = np.radians(lon), np.radians(lat), np.radians(bearing)
+    angle = distance / radius
+
+    sin_lat2 = np.sin(lat) * np.cos(angle) + np.cos(lat) * np.sin(angle) * np.cos(bearing)
+    sin_lat2 = np.clip(sin_lat2, -1, 1)
+    lon2 = lon + np.arctan2(
+        np.sin(bearing) * np.sin(angle) * np.cos(lat),
+        np.cos(angle) - np.sin(lat) * sin_lat2,
+    )
+
+    lon2 = np.mod(np.degrees(lon2), 360, out=out[0])
+    lat2 = np.degrees(np.arcsin(sin_lat2), out=out[1])
+    return lon2, lat2
+
+
+def along_track_distance(lons, lats, offsets=None, units="km", out=None):
+    """Cumulative distance along each track from its first point
+
+    Args:
+        lons, lats (array_like): Concatenated positions of all tracks in degrees
+        offsets (numpy.ndarray, optional): Offsets of the first point of each track
+            (see :func:`storm_assess._ragged.ragged_arrays`). Default is to treat the
+            points as a single track
+        units (str, optional): Units of the result, one of :data:`UNITS`. Default is
+            "km"
+        out (numpy.ndarray, optional): Array to store the result in
+
+    Returns:
+        numpy.ndarray: The distance travelled to each point, which is zero at the start
+        of each track
+    """
+    lons, lats = _as_float(lons, lats)
+    if offsets is None:
+        offsets = np.array([0, len(lons)])
+    if out is None:
+        out = np.empty_like(lons)
+
+    out[:1] = 0
+    distance(lons[:-1], lats[:-1], lons[1:], lats[1:], units=units, out=out[1:])
+
+    # Restart the sum at the first point of each track
+    lengths = np.diff(offsets)
+    starts = offsets[:-1][lengths > 0]
+    out[starts] = 0
+    np.cumsum(out, out=out)
+    out -= np.repeat(out[starts], lengths[lengths > 0])
+
+    return out
+
+
+def distance_to_segment(lon, lat, lon1, lat1, lon2, lat2, units="km", out=None):
+    """Shortest distance from points to the great-circle segments between two other
+    points
+
+    Args:
+        lon, lat (array_like): Positions of the points in degrees
+        lon1, lat1 (array_like): Positions of the start of the segments in degrees
+        lon2, lat2 (array_like): Positions of the end of the segments in degrees. The
+            segments can have zero length
+        units (str, optional): Units of the result, one of :data:`UNITS`. Default is
+            "km"
+        out (numpy.ndarray, optional): Array to store the result in
+
+    Returns:
+        numpy.ndarray: The distance from each point to the nearest point on its segment
+    """
+    radius = _radius(units)
+    to_point = distance(lon1, lat1, lon, lat, units=units) / radius
+    length = distance(lon1, lat1, lon2, lat2, units=units) / radius
+    angle = np.radians(bearing(lon1, lat1, lon, lat) - bearing(lon1, lat1, lon2, lat2))
+
+    # Distance from the great circle through the segment and distance along it to the
+    # closest point on the great circle
+    cross_track = np.arcsin(np.clip(np.sin(to_point) * np.sin(angle), -1, 1))
+    along_track = np.arctan2(np.sin(to_point) * np.cos(angle), np.cos(to_point))
+
+    # Otherwise the closest point is one of the ends
+    to_end = distance(lon2, lat2, lon, lat, units=units) / radius
+    result = np.where(
+        (along_track >= 0) & (along_track <= length),
+        np.abs(cross_track), np.minimum(to_point, to_end),
+    )
+    return np.multiply(radius, result, out=out)
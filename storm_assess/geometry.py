@@ -0,0 +1,526 @@
+"""
+Vectorised geometry calculations on whole collections of tracks.
+"""
+import collections
+import functools
+import threading
+
+import numpy as np
+import pandas as pd
+import shapely
+
+from storm_assess import _ragged
+# Defined in geodesy so that the loaders can use it without importing shapely
+from storm_assess.geodesy import normalise_longitude  # noqa: F401
+
+
+#: Lon/lat points of named region boundaries. A boundary is a line (not a closed
+#: polygon) that storms can cross
+BOUNDARIES = {
+    'west_midlat_na': ([-80, -68, -52, -62], [30, 43, 46, 60]),
+    'south_midlat_na': ([-80, -12], [30, 30]),
+}
+
+
+#: Maximum number of track geometries kept by :func:`track_geometry`
+GEOMETRY_CACHE_SIZE = 4096
+
+# Least-recently-used cache of track geometries, keyed by the id of the track and the
+# projection. The track itself is kept alongside each geometry so that ids can't be
+# reused while they are in the cache
+_geometry_cache = collections.OrderedDict()
+_geometry_cache_lock = threading.Lock()
+
+
+def wrap_longitude(lon, centre=0.):
+    """ Returns longitudes shifted by multiples of 360 into the range centre +/- 180 """
+    return (np.asarray(lon) - centre + 180) % 360 - 180 + centre
+
+
+def unwrap_longitude(lons, offsets=None):
+    """Shift longitudes by multiples of 360 so that each track is continuous, i.e. there
+    are no jumps of more than 180 degrees between consecutive points. The first point of
+    each track is unchanged
+
+    Args:
+        lons (numpy.ndarray): Concatenated longitudes of all tracks
+        offsets (numpy.ndarray, optional): Track offsets (see
+            :func:`storm_assess._ragged.ragged_arrays`). Default is to treat lons as a
+            single track
+
+    Returns:
+        numpy.ndarray: The unwrapped longitudes
+    """
+    lons = np.asarray(lons, dtype=float)
+    if offsets is None:
+        offsets = np.array([0, len(lons)])
+    lengths = np.diff(offsets)
+    starts = offsets[:-1][lengths > 0]
+
+    # Count the number of times each track wraps around, using integers so the
+    # longitudes are shifted by exact multiples of 360
+    # Missing longitudes (NaN) are treated as no turn
+    turns = np.zeros(len(lons), dtype=int)
+    dlon = np.diff(lons)
+    turns[1:] = np.nan_to_num(np.rint((dlon - wrap_longitude(dlon)) / 360))
+    turns[starts] = 0
+    turns = np.cumsum(turns)
+    turns -= np.repeat(turns[starts], lengths[lengths > 0])
+
+    return lons - 360 * turns
+
+
+def split_at_antimeridian(lons, lats, offsets=None, centre=0.):
+    """Split tracks into pieces that don't cross the edge of a map centred on the given
+    longitude. A point is added on each side of the edge where a track crosses it, with
+    the latitude linearly interpolated
+
+    Args:
+        lons, lats (numpy.ndarray): Concatenated positions of all tracks
+        offsets (numpy.ndarray, optional): Track offsets (see
+            :func:`storm_assess._ragged.ragged_arrays`). Default is to treat the points
+            as a single track
+        centre (float, optional): Central longitude of the map. Default is 0, i.e.
+            split at the dateline
+
+    Returns:
+        tuple (numpy.ndarray, numpy.ndarray, numpy.ndarray, numpy.ndarray):
+            The longitudes (in the range centre +/- 180) and latitudes of the pieces,
+            the offsets of each piece, and the index of the track each piece belongs to
+    """
+    lons = np.asarray(lons, dtype=float)
+    lats = np.asarray(lats, dtype=float)
+    if offsets is None:
+        offsets = np.array([0, len(lons)])
+
+    wrapped = wrap_longitude(lons, centre)
+    x0, y0, dx, dy, segment = _track_segments(lons, lats, offsets, centre)
+    crossing = np.abs(wrapped[segment + 1] - x0) > 180
+    x0, y0, dx, dy, segment = (a[crossing] for a in (x0, y0, dx, dy, segment))
+
+    # The edge of the map and where the track crosses it
+    edge = centre + 180 * np.sign(dx)
+    lat_edge = y0 + dy * (edge - x0) / dx
+
+    # Insert the two points at the edge after the first point of each crossing segment
+    position = np.repeat(segment + 1, 2)
+    new_lons = np.stack([edge, edge - 360 * np.sign(dx)], axis=1).ravel()
+    new_lats = np.repeat(lat_edge, 2)
+    out_lons = np.insert(wrapped, position, new_lons)
+    out_lats = np.insert(lats, position, new_lats)
+
+    # Position of each original point in the output. A new piece starts at the
+    # beginning of each track and at the second point added for each crossing
+    moved = np.arange(len(lons)) + 2 * np.searchsorted(segment, np.arange(len(lons)))
+    track_starts = offsets[:-1][np.diff(offsets) > 0]
+    crossing_starts = moved[segment] + 2
+    piece_starts = np.union1d(moved[track_starts], crossing_starts).astype(int)
+    piece_offsets = np.append(piece_starts, len(out_lons))
+
+    track = np.searchsorted(offsets, np.searchsorted(moved, piece_starts, side='right') - 1,
+                            side='right') - 1
+
+    return out_lons, out_lats, piece_offsets, track
+
+
+@functools.lru_cache(maxsize=None)
+def basin_polygon(basin):
+    """Returns the tracking region of an ocean basin (see
+    :data:`storm_assess.functions.TRACKING_REGION`) as a prepared planar polygon.
+
+    Regions defined with both positive and negative longitudes cross the dateline, so
+    their negative longitudes are shifted by 360 degrees to give a valid polygon. The
+    polygons are cached so they are only built once.
+    """
+    from storm_assess.functions import TRACKING_REGION
+
+    lons, lats = TRACKING_REGION[basin]
+    lons = np.asarray(lons, dtype=float)
+    if (lons > 0).any() and (lons < 0).any():
+        lons = np.where(lons < 0, lons + 360, lons)
+
+    polygon = shapely.Polygon(list(zip(lons, lats)))
+    shapely.prepare(polygon)
+    return polygon
+
+
+def _points_in_polygon(polygon, lons, lats):
+    """ Returns whether each point is inside or on the edge of a polygon, shifting the
+    longitudes by 360 degrees to match the range of the polygon """
+    xmin = polygon.bounds[0]
+    lons = xmin + (np.asarray(lons) - xmin) % 360
+    return shapely.intersects_xy(polygon, lons, lats)
+
+
+def _linestrings(lons, lats, offsets):
+    """ Build a geometry for every track in one call. Tracks with a single point are
+    returned as points and empty tracks as None """
+    lengths = np.diff(offsets)
+    result = np.full(len(lengths), None, dtype=object)
+
+    is_line = lengths > 1
+    if is_line.any():
+        points = np.repeat(is_line, lengths)
+        index = np.repeat(np.arange(is_line.sum()), lengths[is_line])
+        result[is_line] = shapely.linestrings(lons[points], lats[points], indices=index)
+
+    single = lengths == 1
+    if single.any():
+        index = offsets[:-1][single]
+        result[single] = shapely.points(lons[index], lats[index])
+
+    return result
+
+
+def track_linestrings(storms, unwrap=False):
+    """Build the lon/lat track of every storm as a shapely geometry in one call
+
+    Args:
+        storms (list): :class:`storm_assess.Storm` or :class:`xarray.Dataset` tracks
+        unwrap (bool, optional): Shift the longitudes so each track is continuous (see
+            :func:`unwrap_longitude`). Default is False
+
+    Returns:
+        numpy.ndarray:
+            A LineString for each storm (a Point for storms with a single observation
+            and None for storms with no observations)
+    """
+    values, offsets = _ragged.ragged_arrays(storms, ['lat', 'lon'])
+    lons, lats = values['lon'].astype(float), values['lat'].astype(float)
+    if unwrap:
+        lons = unwrap_longitude(lons, offsets)
+    return _linestrings(lons, lats, offsets)
+
+
+def _cache_key(storm, map_proj):
+    # The observations of a Storm can be replaced, so check they are the same too
+    return (id(storm), map_proj), (storm, getattr(storm, '_data', None))
+
+
+def _cache_get(key, owner):
+    with _geometry_cache_lock:
+        if key in _geometry_cache:
+            cached_owner, geometry = _geometry_cache[key]
+            if all(a is b for a, b in zip(cached_owner, owner)):
+                _geometry_cache.move_to_end(key)
+                return geometry
+    return None
+
+
+def _cache_set(key, owner, geometry):
+    with _geometry_cache_lock:
+        _geometry_cache[key] = (owner, geometry)
+        _geometry_cache.move_to_end(key)
+        while len(_geometry_cache) > GEOMETRY_CACHE_SIZE:
+            _geometry_cache.popitem(last=False)
+
+
+def _project(geometry, map_proj):
+    import cartopy.crs as ccrs
+
+    return map_proj.project_geometry(geometry, ccrs.Geodetic())
+
+
+def track_geometries(storms, map_proj=None):
+    """Get the track of each storm as a shapely geometry, projected onto a map.
+
+    Geometries are cached (see :func:`track_geometry`) and any that aren't cached
+    are built together with :func:`track_linestrings`
+
+    Args:
+        storms (list): :class:`storm_assess.Storm` or :class:`xarray.Dataset` tracks
+        map_proj (cartopy.crs.Projection, optional): The projection to use. Tracks are
+            treated as great circles between points. Default is to return the lon/lat
+            tracks as straight lines
+
+    Returns:
+        list: The geometry of each track
+    """
+    storms = list(storms)
+    keys = [_cache_key(storm, map_proj) for storm in storms]
+    result = [_cache_get(key, owner) for key, owner in keys]
+
+    missing = [n for n, geometry in enumerate(result) if geometry is None]
+    if missing:
+        lines = track_linestrings([storms[n] for n in missing])
+        for n, geometry in zip(missing, lines):
+            if geometry is not None and map_proj is not None:
+                geometry = _project(geometry, map_proj)
+            _cache_set(*keys[n], geometry)
+            result[n] = geometry
+
+    return result
+
+
+def track_geometry(storm, map_proj=None):
+    """Get the track of a storm as a shapely geometry, projected onto a map.
+
+    The geometry is only calculated the first time it is needed for each storm and
+    projection. The most recently used :data:`GEOMETRY_CACHE_SIZE` geometries are kept
+    (see :func:`clear_geometry_cache`)
+
+    Args:
+        storm (storm_assess.Storm or xarray.Dataset):
+        map_proj (cartopy.crs.Projection, optional): The projection to use. Tracks are
+            treated as great circles between points. Default is to return the lon/lat
+            track as straight lines
+
+    Returns:
+        shapely.Geometry:
+    """
+    return track_geometries([storm], map_proj)[0]
+
+
+def clear_geometry_cache():
+    """ Remove all geometries cached by :func:`track_geometry` """
+    with _geometry_cache_lock:
+        _geometry_cache.clear()
+
+
+def points_in_basin(lons, lats, basin):
+    """ Returns whether each point is inside or on the edge of an ocean basin """
+    return _points_in_polygon(
+        basin_polygon(basin), np.asarray(lons, dtype=float), np.asarray(lats, dtype=float)
+    )
+
+
+def _tracks_intersect(polygon, lons, lats, offsets):
+    ntracks = len(offsets) - 1
+    result = np.zeros(ntracks, dtype=bool)
+
+    # Leave out missing positions, so tracks are joined up across them
+    valid = np.isfinite(lons) & np.isfinite(lats)
+    if not valid.all():
+        lengths = np.bincount(_ragged.track_index(offsets)[valid], minlength=ntracks)
+        offsets = np.zeros(ntracks + 1, dtype=int)
+        np.cumsum(lengths, out=offsets[1:])
+        lons, lats = lons[valid], lats[valid]
+    lengths = np.diff(offsets)
+    if len(lons) == 0:
+        return result
+
+    # Tracks with a single point can't be made into lines
+    single = lengths == 1
+    if single.any():
+        index = offsets[:-1][single]
+        result[single] = _points_in_polygon(polygon, lons[index], lats[index])
+
+    # Shift each (continuous) track by all multiples of 360 that put it within the
+    # longitude range of the polygon and check for intersections
+    lons = unwrap_longitude(lons, offsets)
+    nonempty = lengths > 0
+    lon_min = np.full(ntracks, np.nan)
+    lon_max = np.full(ntracks, np.nan)
+    lon_min[nonempty] = np.minimum.reduceat(lons, offsets[:-1][nonempty])
+    lon_max[nonempty] = np.maximum.reduceat(lons, offsets[:-1][nonempty])
+
+    xmin, _, xmax, _ = polygon.bounds
+    is_line = lengths > 1
+    if not is_line.any():
+        return result
+    shift_min = np.ceil((xmin - lon_max[is_line]) / 360).astype(int)
+    shift_max = np.floor((xmax - lon_min[is_line]) / 360).astype(int)
+    lines = np.flatnonzero(is_line)
+    point_track = _ragged.track_index(offsets)
+
+    for shift in range(shift_min.min(), shift_max.max() + 1):
+        tracks = lines[(shift_min <= shift) & (shift <= shift_max)]
+        tracks = tracks[~result[tracks]]
+        if len(tracks) == 0:
+            continue
+        points = np.isin(point_track, tracks)
+        track_offsets = np.zeros(len(tracks) + 1, dtype=int)
+        np.cumsum(lengths[tracks], out=track_offsets[1:])
+        geometries = _linestrings(lons[points] + 360 * shift, lats[points], track_offsets)
+        result[tracks] = shapely.intersects(polygon, geometries)
+
+    return result
+
+
+def tracks_intersect(storms, polygon):
+    """Find which storms intersect a region, treating each track as straight lines
+    between its points in latitude/longitude
+
+    Args:
+        storms (list): :class:`storm_assess.Storm` or :class:`xarray.Dataset` tracks
+        polygon (shapely.Geometry): The region in lon/lat. Can use any longitude range
+
+    Returns:
+        numpy.ndarray: True for each storm that intersects the region
+    """
+    values, offsets = _ragged.ragged_arrays(storms, ['lat', 'lon'])
+    shapely.prepare(polygon)
+    return _tracks_intersect(
+        polygon, values['lon'].astype(float), values['lat'].astype(float), offsets
+    )
+
+
+def storms_in_basin(storms, basin):
+    """ Returns a boolean array which is True for each storm whose track intersects an
+    ocean basin. See :func:`tracks_intersect` """
+    return tracks_intersect(storms, basin_polygon(basin))
+
+
+def basin_masks(storms, basins):
+    """Find which observations of each storm are within one or more ocean basins
+
+    Args:
+        storms (list): :class:`storm_assess.Storm` or :class:`xarray.Dataset` tracks
+        basins (list): Names of basins in :data:`storm_assess.functions.TRACKING_REGION`
+
+    Returns:
+        dict:
+            Maps each basin to a list with a boolean array for each storm which is True
+            for the observations inside (or on the edge of) the basin
+    """
+    values, offsets = _ragged.ragged_arrays(storms, ['lat', 'lon'])
+    lons, lats = values['lon'].astype(float), values['lat'].astype(float)
+
+    return {
+        basin: _ragged.split(_points_in_polygon(basin_polygon(basin), lons, lats), offsets)
+        for basin in basins
+    }
+
+
+def obs_in_basin(storms, basin):
+    """Find which observations of each storm are within an ocean basin. See
+    :func:`basin_masks`
+
+    Returns:
+        list of numpy.ndarray: A boolean array for each storm
+    """
+    return basin_masks(storms, [basin])[basin]
+
+
+def _boundary_coordinates(boundary):
+    if isinstance(boundary, str):
+        if boundary not in BOUNDARIES:
+            raise KeyError(f"Unknown boundary {boundary}. Choose from {list(BOUNDARIES)}")
+        boundary = BOUNDARIES[boundary]
+    lons, lats = boundary
+    return np.asarray(lons, dtype=float), np.asarray(lats, dtype=float)
+
+
+def _track_segments(lons, lats, offsets, centre):
+    """ Returns the start point and extent of every segment of every track, with
+    longitudes relative to centre, and the index of the point each segment starts at.
+    The extent is unwrapped so that segments never jump 360 degrees """
+    x0 = wrap_longitude(lons[:-1], centre)
+    dx = wrap_longitude(lons[1:] - lons[:-1])
+    y0 = lats[:-1]
+    dy = lats[1:] - lats[:-1]
+
+    # Remove the "segments" joining the end of one track to the start of the next
+    is_segment = np.ones(max(len(lons) - 1, 0), dtype=bool)
+    joins = offsets[1:-1] - 1
+    is_segment[joins[(joins >= 0) & (joins < len(is_segment))]] = False
+    index = np.flatnonzero(is_segment)
+
+    return x0[index], y0[index], dx[index], dy[index], index
+
+
+def _crossings(lons, lats, offsets, times, boundary):
+    blons, blats = _boundary_coordinates(boundary)
+    centre = 0.5 * (blons.min() + blons.max())
+    blons = wrap_longitude(blons, centre)
+
+    # Boundary segments (along axis 1)
+    bx0, by0 = blons[:-1][np.newaxis, :], blats[:-1][np.newaxis, :]
+    bdx, bdy = np.diff(blons)[np.newaxis, :], np.diff(blats)[np.newaxis, :]
+
+    # Track segments (along axis 0)
+    x0, y0, dx, dy, segment = _track_segments(lons, lats, offsets, centre)
+    x0, y0, dx, dy = (a[:, np.newaxis] for a in (x0, y0, dx, dy))
+
+    # Solve P + t r = Q + u s for all pairs of track and boundary segments
+    denominator = dx * bdy - dy * bdx
+    qpx, qpy = bx0 - x0, by0 - y0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t = (qpx * bdy - qpy * bdx) / denominator
+        u = (qpx * dy - qpy * dx) / denominator
+    intersects = (denominator != 0) & (t >= 0) & (t <= 1) & (u >= 0) & (u <= 1)
+
+    # Take the earliest intersection along each track segment
+    t = np.where(intersects, t, np.inf)
+    boundary_segment = np.argmin(t, axis=1)
+    rows = np.arange(len(t))
+    t = t[rows, boundary_segment]
+    crossed = np.isfinite(t)
+
+    # First crossing segment of each track
+    crossed_points = np.zeros(len(lons), dtype=bool)
+    crossed_points[segment[crossed]] = True
+    first = _ragged.first_true(crossed_points, offsets)
+
+    nstorms = len(offsets) - 1
+    result = pd.DataFrame(dict(
+        crossed=first >= 0,
+        index=first,
+        time=np.full(nstorms, None, dtype=object),
+        lat=np.full(nstorms, np.nan),
+        lon=np.full(nstorms, np.nan),
+        direction=np.zeros(nstorms, dtype=int),
+    ))
+
+    found = first >= 0
+    if found.any():
+        point = offsets[:-1][found] + first[found]
+        # Map from point index to segment row
+        row = np.searchsorted(segment, point)
+        t_found = t[row]
+        result.loc[found, 'lat'] = (y0[row, 0] + t_found * dy[row, 0])
+        result.loc[found, 'lon'] = (x0[row, 0] + t_found * dx[row, 0])
+
+        # Positive when the track crosses from the right to the left of the boundary
+        # (looking along the boundary from its first to last point)
+        bseg = boundary_segment[row]
+        cross = bdx[0, bseg] * dy[row, 0] - bdy[0, bseg] * dx[row, 0]
+        result.loc[found, 'direction'] = np.sign(cross).astype(int)
+
+        if times is not None:
+            start, end = times[point], times[point + 1]
+            result.loc[found, 'time'] = pd.Series(
+                [t0 + (t1 - t0) * float(frac) for t0, t1, frac in zip(start, end, t_found)],
+                index=result.index[found], dtype=object,
+            )
+
+    return result
+
+
+def boundary_crossings(storms, boundaries=tuple(BOUNDARIES)):
+    """Find where each storm first crosses one or more boundaries
+
+    Args:
+        storms (list): :class:`storm_assess.Storm` or :class:`xarray.Dataset` tracks
+        boundaries (str, list or dict, optional): The name of a boundary in
+            :data:`BOUNDARIES`, a list of names, or a dictionary mapping names to custom
+            boundaries given as (lons, lats). Default is all of :data:`BOUNDARIES`
+
+    Returns:
+        pandas.DataFrame:
+            One row for each boundary and storm, indexed by (boundary, storm) where
+            storm is the position of the storm in storms. The columns are
+
+            * crossed: Whether the storm crosses the boundary
+            * index: The index of the observation before the first crossing (-1 if
+              the storm does not cross)
+            * time, lat, lon: The time and position of the crossing, linearly
+              interpolated between observations. lon is in the range of the boundary
+              +/- 180 degrees
+            * direction: +1 if the storm crosses from the right to the left of the
+              boundary (looking from its first to last point), -1 for left to right
+              and 0 if the storm does not cross
+    """
+    if isinstance(boundaries, str):
+        boundaries = [boundaries]
+    if not isinstance(boundaries, dict):
+        boundaries = {name: name for name in boundaries}
+
+    values, offsets = _ragged.ragged_arrays(storms, ['date', 'lat', 'lon'])
+    lons, lats = values['lon'].astype(float), values['lat'].astype(float)
+
+    results = {
+        name: _crossings(lons, lats, offsets, values['date'], boundary)
+        for name, boundary in boundaries.items()
+    }
+    return pd.concat(results, names=['boundary', 'storm'])
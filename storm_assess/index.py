@@ -0,0 +1,257 @@
+"""
+Index of the tracks in a TRACK text file, for reading selected tracks without parsing
+the rest of the file.
+"""
+import mmap
+import os
+import re
+import tempfile
+import zipfile
+
+import numpy as np
+import pandas as pd
+
+
+#: Added to the name of a TRACK file to give the name of its saved index
+INDEX_SUFFIX = ".index.npz"
+
+#: Columns of the index
+COLUMNS = ("track_id", "npoints", "start_time", "offset", "nbytes")
+
+# The TRACK_ID and POINT_NUM lines of each track, and the date at the start of the first
+# point (if it is a YYYYMMDDHH date rather than a timestep)
+_track_header = re.compile(
+    rb"TRACK_ID[ \t]+(\d+)[^\n]*\n[ \t]*POINT_NUM[ \t]+(\d+)[ \t]*\r?\n"
+    rb"(?:[ \t]*(\d{10})[ \t])?"
+)
+
+
+def _check_uncompressed(filename):
+    if str(filename).endswith(".gz"):
+        raise ValueError(f"Only uncompressed TRACK files can be indexed, not {filename}")
+
+
+def build_index(filename):
+    """Scan the track headers of a TRACK file
+
+    Args:
+        filename (str):
+
+    Returns:
+        pandas.DataFrame:
+            One row per track, in the order of the file, with the columns
+            :data:`COLUMNS`. start_time is -1 if the times are not dates
+    """
+    _check_uncompressed(filename)
+    size = os.path.getsize(filename)
+    if size == 0:
+        return _to_dataframe([], size)
+
+    rows = []
+    with open(filename, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        # Searching for the fixed string is much faster than a regular expression search
+        # of the whole file, so only match the headers where it is found
+        position = mm.find(b"TRACK_ID")
+        while position >= 0:
+            match = None
+            if position == 0 or mm[position - 1] == ord("\n"):
+                match = _track_header.match(mm, position)
+            if match is not None:
+                track_id, npoints, start = match.groups()
+                rows.append((int(track_id), int(npoints), int(start or -1), position))
+            position = mm.find(b"TRACK_ID", position + 1)
+
+    return _to_dataframe(rows, size)
+
+
+def _to_dataframe(rows, size):
+    rows = np.array(rows, dtype=np.int64).reshape(-1, 4)
+    offset = rows[:, 3]
+    return pd.DataFrame(dict(
+        track_id=rows[:, 0],
+        npoints=rows[:, 1],
+        start_time=rows[:, 2],
+        offset=offset,
+        nbytes=np.diff(offset, append=size),
+    ))
+
+
+def index_filename(filename):
+    """ Returns the name of the saved index of a TRACK file """
+    return str(filename) + INDEX_SUFFIX
+
+
+def _file_state(filename):
+    status = os.stat(filename)
+    return np.array([status.st_size, status.st_mtime_ns], dtype=np.int64)
+
+
+def read_index(filename, save=True):
+    """Returns the index of a TRACK file, using the saved index if it is up to date
+
+    Args:
+        filename (str):
+        save (bool, optional): Save a new index alongside the file if it had to be
+            built. Failures to write the file (e.g. in a read-only directory) are
+            ignored. Default is True
+
+    Returns:
+        pandas.DataFrame: See :func:`build_index`
+    """
+    _check_uncompressed(filename)
+    state = _file_state(filename)
+    sidecar = index_filename(filename)
+
+    # A saved index that can't be read (e.g. truncated) is rebuilt
+    try:
+        with np.load(sidecar) as saved:
+            if np.array_equal(saved["state"], state):
+                return pd.DataFrame({name: saved[name] for name in COLUMNS})
+    except (OSError, KeyError, ValueError, EOFError, zipfile.BadZipFile):
+        pass
+
+    index = build_index(filename)
+    if save:
+        _save_index(sidecar, state, index)
+    return index
+
+
+def _save_index(sidecar, state, index):
+    """ Write the index to a temporary file and move it into place, so that the saved
+    index is never incomplete, even with several processes saving it at once """
+    try:
+        f = tempfile.NamedTemporaryFile(
+            dir=os.path.dirname(os.path.abspath(sidecar)), suffix=INDEX_SUFFIX,
+            delete=False,
+        )
+    except OSError:
+        return
+
+    try:
+        with f:
+            np.savez(f, state=state, **{name: index[name].to_numpy() for name in COLUMNS})
+        os.replace(f.name, sidecar)
+    except OSError:
+        if os.path.exists(f.name):
+            os.remove(f.name)
+
+
+def time_number(time):
+    """ Returns a date (datetime, cftime or YYYYMMDDHH number/string) as a YYYYMMDDHH
+    number to compare with the start_time of the index """
+    if isinstance(time, (int, np.integer, str)):
+        return int(time)
+    return ((time.year * 100 + time.month) * 100 + time.day) * 100 + time.hour
+
+
+def select(index, track_ids=None, start_time=None, track_slice=None, months=None,
+           min_points=None):
+    """Select rows of an index
+
+    Args:
+        index (pandas.DataFrame): From :func:`read_index`
+        track_ids (list of int, optional): IDs of the tracks to select
+        start_time (tuple, optional): The range of start times (first, last) of the
+            tracks to select, with first <= start time < last. Either can be None.
+            Times can be datetime or cftime objects or YYYYMMDDHH numbers
+        track_slice (slice, optional): Select tracks by their position in the file
+        months (list of int, optional): Months of the start time of the tracks to select
+        min_points (int, optional): Minimum number of points of the tracks to select
+
+    Returns:
+        pandas.DataFrame: The selected rows, in the order of the file
+    """
+    if track_slice is not None:
+        index = index.iloc[track_slice]
+    if track_ids is not None:
+        index = index[index.track_id.isin(np.asarray(list(track_ids)))]
+    if start_time is not None:
+        first, last = start_time
+        if first is not None:
+            index = index[index.start_time >= time_number(first)]
+        if last is not None:
+            index = index[index.start_time < time_number(last)]
+    if months is not None:
+        index = index[(index.start_time // 10000 % 100).isin(list(months))]
+    if min_points is not None:
+        index = index[index.npoints >= min_points]
+    return index
+
+
+def split(rows, nchunks):
+    """Split rows of an index into contiguous chunks with similar numbers of bytes, e.g.
+    to parse the chunks of a file in parallel
+
+    Args:
+        rows (pandas.DataFrame): Rows of the index of a file, e.g. from :func:`select`
+        nchunks (int): The number of chunks. There are fewer if there are fewer rows
+
+    Returns:
+        list of pandas.DataFrame: The chunks, in the order of the rows
+    """
+    total = np.cumsum(rows.nbytes.to_numpy())
+    if len(total) == 0:
+        return []
+    bounds = np.searchsorted(total, total[-1] * np.arange(1, nchunks) / nchunks)
+    edges = np.unique(np.concatenate([[0], bounds, [len(rows)]]))
+    return [rows.iloc[start:end] for start, end in zip(edges[:-1], edges[1:])]
+
+
+class TrackLines(object):
+    """Lines of a TRACK file containing only the header and the selected tracks. This
+    can be passed to the loaders in place of a file handle
+
+    Args:
+        filename (str):
+        rows (pandas.DataFrame): Selected rows of the index of the file
+    """
+
+    def __init__(self, filename, rows):
+        self.filename = filename
+        self.ntracks = len(rows)
+        self._blocks = zip(rows.offset.to_numpy(), rows.nbytes.to_numpy())
+        self._file = open(filename, "rb")
+
+        # The header is everything before the first track
+        first = _first_offset(filename)
+        self._lines = iter(self._file.read(first).decode().splitlines(keepends=True))
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        while True:
+            try:
+                return next(self._lines)
+            except StopIteration:
+                offset, nbytes = next(self._blocks, (None, None))
+                if offset is None:
+                    self.close()
+                    raise
+                self._file.seek(offset)
+                self._lines = iter(
+                    self._file.read(nbytes).decode().splitlines(keepends=True)
+                )
+
+    def readline(self):
+        return next(self, "")
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+def _first_offset(filename):
+    """ Returns the byte offset of the first TRACK_ID line (the size of the header) """
+    with open(filename, "rb") as f:
+        offset = 0
+        for line in f:
+            if line.startswith(b"TRACK_ID"):
+                return offset
+            offset += len(line)
+    return offset
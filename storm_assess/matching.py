@@ -0,0 +1,167 @@
+"""
+Matching of model tracks (e.g. from :func:`storm_assess.track.load`) to observed best
+tracks (e.g. from :func:`storm_assess.track.load_hurdat2`).
+"""
+import numpy as np
+import pandas as pd
+
+from storm_assess import _ragged, geodesy
+
+#: Columns of the table returned by :func:`match_tracks`
+MATCH_COLUMNS = [
+    "model", "observed", "model_id", "observed_id", "n_overlap", "n_matched",
+    "mean_separation", "min_separation", "start_time", "end_time",
+]
+
+
+def _times(values):
+    """ Returns times as an object array of hashable values so that datetime64 times
+    (from xarray tracks) can be compared with datetime times """
+    values = np.asarray(values)
+    if np.issubdtype(values.dtype, np.datetime64):
+        return values.astype("datetime64[us]").astype(object)
+    return values.astype(object)
+
+
+def _same_key_pairs(model_keys, observed_keys):
+    """ Returns the indices of every pair of (model, observed) points with the same key """
+    order = np.argsort(observed_keys, kind="stable")
+    sorted_keys = observed_keys[order]
+
+    start = np.searchsorted(sorted_keys, model_keys, side="left")
+    count = np.searchsorted(sorted_keys, model_keys, side="right") - start
+
+    model_index = np.repeat(np.arange(len(model_keys)), count)
+    position = np.arange(count.sum()) - np.repeat(np.cumsum(count) - count, count)
+    observed_index = order[np.repeat(start, count) + position]
+
+    return model_index, observed_index
+
+
+def _overlap(model, observed, model_codes, model_offsets, obs_codes, obs_track):
+    """ Number of times with a point on both tracks for each (model, observed) pair of
+    tracks, from the number of points of each observed track at each time """
+    ncodes = max(model_codes.max(initial=0), obs_codes.max(initial=0)) + 1
+    obs_keys, obs_counts = np.unique(obs_track * ncodes + obs_codes, return_counts=True)
+    if len(obs_keys) == 0:
+        return np.zeros(len(model), dtype=int)
+
+    # Look up the time of every point of each model track
+    lengths = np.diff(model_offsets)[model]
+    pair = np.repeat(np.arange(len(model)), lengths)
+    point = np.arange(lengths.sum()) + np.repeat(
+        model_offsets[:-1][model] - (np.cumsum(lengths) - lengths), lengths
+    )
+    keys = observed[pair] * ncodes + model_codes[point]
+    position = np.minimum(np.searchsorted(obs_keys, keys), len(obs_keys) - 1)
+    count = np.where(obs_keys[position] == keys, obs_counts[position], 0)
+    return np.bincount(pair, weights=count, minlength=len(model)).astype(int)
+
+
+def match_tracks(model, observed, max_distance=300., min_overlap=4):
+    """Find the model tracks that match each observed track
+
+    Args:
+        model (list): :class:`storm_assess.Storm` or :class:`xarray.Dataset` tracks
+        observed (list): :class:`storm_assess.Storm` or :class:`xarray.Dataset` tracks.
+            Times must be the same type as the model times (e.g. datetime or cftime
+            with the same calendar)
+        max_distance (float, optional): Maximum separation (km) of model and observed
+            points for them to match. Default is 300 km
+        min_overlap (int, optional): Minimum number of matching time steps for a pair
+            of tracks to match. Default is 4
+
+    Returns:
+        pandas.DataFrame:
+            One row for each matching pair of tracks with the columns
+
+            * model, observed: Position of the tracks in model and observed
+            * model_id, observed_id: Identifiers of the tracks (Storm.snbr or the
+              track_id attribute)
+            * n_overlap: Number of times with a point on both tracks
+            * n_matched: Number of times the points are within max_distance
+            * mean_separation, min_separation: Separation (km) of matching points
+            * start_time, end_time: Times of the first and last matching points
+    """
+    model = list(model)
+    observed = list(observed)
+
+    model_values, model_offsets = _ragged.ragged_arrays(model, ["date", "lat", "lon"])
+    obs_values, obs_offsets = _ragged.ragged_arrays(observed, ["date", "lat", "lon"])
+    model_times = _times(model_values["date"])
+    nmodel = len(model_times)
+
+    # Index all points by time
+    codes, _ = pd.factorize(np.concatenate([model_times, _times(obs_values["date"])]))
+    model_codes, obs_codes = codes[:nmodel], codes[nmodel:]
+    model_points = _ragged.track_index(model_offsets)
+    obs_points = _ragged.track_index(obs_offsets)
+
+    # Key the points by time and latitude band, with bands at least max_distance wide,
+    # and only pair the points at the same time in the same or neighbouring bands
+    band_width = np.degrees(max_distance / geodesy.EARTH_RADIUS)
+    model_lat = model_values["lat"].astype(float)
+    obs_lat = obs_values["lat"].astype(float)
+    model_valid = np.flatnonzero(np.isfinite(model_lat))
+    obs_valid = np.flatnonzero(np.isfinite(obs_lat))
+    model_band = np.floor(model_lat[model_valid] / band_width).astype(np.int64)
+    obs_band = np.floor(obs_lat[obs_valid] / band_width).astype(np.int64)
+    lowest = min(model_band.min(initial=0), obs_band.min(initial=0)) - 1
+    nbands = max(model_band.max(initial=0), obs_band.max(initial=0)) - lowest + 2
+
+    obs_keys = obs_codes[obs_valid] * nbands + obs_band - lowest
+    model_keys = model_codes[model_valid] * nbands + model_band - lowest
+    pairs = [_same_key_pairs(model_keys + shift, obs_keys) for shift in (-1, 0, 1)]
+    model_index = model_valid[np.concatenate([pair[0] for pair in pairs])]
+    obs_index = obs_valid[np.concatenate([pair[1] for pair in pairs])]
+    model_track = model_points[model_index]
+    obs_track = obs_points[obs_index]
+
+    separation = geodesy.distance(
+        model_values["lon"].astype(float)[model_index], model_lat[model_index],
+        obs_values["lon"].astype(float)[obs_index], obs_lat[obs_index],
+    )
+    close = separation <= max_distance
+
+    pairs = pd.DataFrame(dict(
+        model=model_track[close],
+        observed=obs_track[close],
+        separation=separation[close],
+        point=model_index[close],
+    ))
+    table = pairs.groupby(["model", "observed"]).agg(
+        n_matched=("separation", "size"),
+        mean_separation=("separation", "mean"),
+        min_separation=("separation", "min"),
+        first=("point", "min"),
+        last=("point", "max"),
+    )
+    table = table[table.n_matched >= min_overlap].reset_index()
+    table["n_overlap"] = _overlap(
+        table.model.to_numpy(dtype=int), table.observed.to_numpy(dtype=int),
+        model_codes, model_offsets, obs_codes, obs_points,
+    )
+
+    table["model_id"] = [_ragged.track_id(model[n]) for n in table.model]
+    table["observed_id"] = [_ragged.track_id(observed[n]) for n in table.observed]
+    table["start_time"] = model_times[table["first"].to_numpy(dtype=int)]
+    table["end_time"] = model_times[table["last"].to_numpy(dtype=int)]
+
+    return table[MATCH_COLUMNS]
+
+
+def best_matches(matches):
+    """Select the best observed match for each model track
+
+    Args:
+        matches (pandas.DataFrame): Output from :func:`match_tracks`
+
+    Returns:
+        pandas.DataFrame:
+            The row of matches with the most matching time steps for each model track,
+            using the smallest mean separation to break ties
+    """
+    ordered = matches.sort_values(
+        ["n_matched", "mean_separation"], ascending=[False, True], kind="stable"
+    )
+    return ordered.groupby("model").head(1).sort_values("model").reset_index(drop=True)
@@ -0,0 +1,120 @@
+"""
+Apply per-storm analysis functions over a collection of storms in parallel.
+"""
+import collections
+import concurrent.futures
+import functools
+import itertools
+import operator
+import os
+
+
+#: Default number of storms sent to a worker in each task
+CHUNKSIZE = 64
+
+_EXECUTORS = {
+    "thread": concurrent.futures.ThreadPoolExecutor,
+    "process": concurrent.futures.ProcessPoolExecutor,
+}
+
+
+def _chunks(storms, chunksize):
+    iterator = iter(storms)
+    while True:
+        chunk = list(itertools.islice(iterator, chunksize))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _apply(function, chunk, args, kwargs):
+    return [function(storm, *args, **kwargs) for storm in chunk]
+
+
+def imap_storms(function, storms, args=(), kwargs=None, executor="thread",
+                max_workers=None, chunksize=CHUNKSIZE):
+    """Lazily apply a function to every storm in parallel
+
+    Args:
+        function (callable): Function taking a storm as its first argument
+        storms (iterable): The storms. Can be a generator
+        args (tuple, optional): Additional positional arguments passed to function
+        kwargs (dict, optional): Additional keyword arguments passed to function
+        executor (str or concurrent.futures.Executor, optional): "thread", "process",
+            "serial" (no parallelism) or an existing executor to submit the tasks to.
+            Default is "thread"
+        max_workers (int, optional): Number of workers when creating a new executor.
+            Default is the number of CPUs
+        chunksize (int, optional): Number of storms in each task
+
+    Yields:
+        The result of function for each storm, in the same order as storms
+    """
+    if kwargs is None:
+        kwargs = {}
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+
+    if executor == "serial":
+        for storm in storms:
+            yield function(storm, *args, **kwargs)
+        return
+
+    if isinstance(executor, concurrent.futures.Executor):
+        pool = executor
+        shutdown = False
+    elif executor in _EXECUTORS:
+        pool = _EXECUTORS[executor](max_workers=max_workers)
+        shutdown = True
+    else:
+        raise ValueError(
+            f"executor must be one of {['serial'] + list(_EXECUTORS)} or an Executor, "
+            f"not {executor}"
+        )
+
+    # Keep a bounded number of chunks in progress and yield the results in order
+    pending = collections.deque()
+    try:
+        for chunk in _chunks(storms, chunksize):
+            pending.append(pool.submit(_apply, function, chunk, args, kwargs))
+            if len(pending) >= 2 * max_workers:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+    finally:
+        for future in pending:
+            future.cancel()
+        if shutdown:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+
+def map_storms(function, storms, args=(), kwargs=None, executor="thread",
+               max_workers=None, chunksize=CHUNKSIZE):
+    """Apply a function to every storm in parallel. See :func:`imap_storms`
+
+    Returns:
+        list: The result of function for each storm, in the same order as storms
+    """
+    return list(imap_storms(
+        function, storms, args=args, kwargs=kwargs, executor=executor,
+        max_workers=max_workers, chunksize=chunksize,
+    ))
+
+
+def reduce_storms(function, storms, reducer=operator.add, initial=0, args=(),
+                  kwargs=None, executor="thread", max_workers=None, chunksize=CHUNKSIZE):
+    """Apply a function to every storm in parallel and combine the results as they
+    arrive, without holding all the results in memory. See :func:`imap_storms`
+
+    Args:
+        reducer (callable, optional): Function combining the running total and the
+            result for the next storm. Default is addition
+        initial (optional): The starting value of the total. Default is 0
+
+    Returns:
+        The combined result
+    """
+    return functools.reduce(reducer, imap_storms(
+        function, storms, args=args, kwargs=kwargs, executor=executor,
+        max_workers=max_workers, chunksize=chunksize,
+    ), initial)
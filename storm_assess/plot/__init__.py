@@ -1,19 +1,15 @@
 import numpy as np
-import matplotlib.pyplot as plt
 
 
 def plot_track(tr, *args, ax=None, xname="lon", yname="lat", **kwargs):
-    # Look for points along the track crossing the wrapping point in longitude
-    # If any exist set the longitudes to wrap at the point at the opposite side of the
-    # Earth (-180 degrees) from the current wrap point
-    dlon = np.diff(tr[xname])
-    if (np.abs(dlon) > 180).any():
-        wrap_point = tr[xname].max().data[()]
-        lon = ((tr[xname] + (wrap_point - 180)) % 360) - (wrap_point - 180)
-    else:
-        lon = tr[xname]
+    # Shift the longitudes so the track doesn't jump 360 degrees where it crosses the
+    # wrapping point in longitude
+    from storm_assess.geometry import unwrap_longitude
+
+    lon = unwrap_longitude(np.asarray(tr[xname]))
 
     if ax is None:
+        import matplotlib.pyplot as plt
         ax = plt.gca()
 
     ax.plot(lon, tr[yname], *args, **kwargs)
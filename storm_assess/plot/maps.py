@@ -0,0 +1,302 @@
+"""
+Fast rendering of many tracks and density maps.
+"""
+import threading
+
+import numpy as np
+import cartopy.crs as ccrs
+from matplotlib.collections import LineCollection
+from matplotlib.colors import Normalize
+from matplotlib.figure import Figure
+
+from storm_assess import _ragged, geometry, parallel
+from storm_assess.functions import MAP_REGION
+
+
+#: Central longitude of the maps, matching :func:`storm_assess.functions.load_map`
+CENTRAL_LONGITUDE = -160
+
+# Cached figures and axes of the base maps, keyed by the arguments of base_map. Each
+# process (and thread) has its own cache since a figure can only be drawn by one
+# thread at a time
+_base_maps = threading.local()
+
+
+def track_segments(storms, color_by="vmax", central_longitude=CENTRAL_LONGITUDE):
+    """Returns the line segments of all tracks and the value used to colour each one
+
+    Args:
+        storms (list): :class:`storm_assess.Storm` or :class:`xarray.Dataset` tracks
+        color_by (str, optional): Variable to colour the segments by, or None. Default
+            is "vmax"
+        central_longitude (float, optional): Central longitude of the map projection.
+            Default is :data:`CENTRAL_LONGITUDE`
+
+    Returns:
+        tuple (numpy.ndarray, numpy.ndarray):
+            The segments, with shape (nsegments, 2, 2), as x/y in the coordinates of
+            ``cartopy.crs.PlateCarree(central_longitude)``, and the mean of the colour
+            variable at the two ends of each segment (None if color_by is None)
+    """
+    names = ["lon", "lat"] if color_by is None else ["lon", "lat", color_by]
+    values, offsets = _ragged.ragged_arrays(list(storms), names)
+
+    lons, lats, pieces, _ = geometry.split_at_antimeridian(
+        values["lon"], values["lat"], offsets, centre=central_longitude
+    )
+    x = lons - central_longitude
+
+    # Consecutive points form a segment unless the second point starts a new piece
+    start = np.ones(max(len(x) - 1, 0), dtype=bool)
+    start[pieces[1:-1] - 1] = False
+    start = np.flatnonzero(start)
+    segments = np.stack([
+        np.stack([x[start], lats[start]], axis=1),
+        np.stack([x[start + 1], lats[start + 1]], axis=1),
+    ], axis=1)
+
+    if color_by is None:
+        return segments, None
+
+    # Splitting the colour variable in the same way interpolates it to the edge points
+    _, colour, _, _ = geometry.split_at_antimeridian(
+        values["lon"], np.asarray(values[color_by], dtype=float), offsets,
+        centre=central_longitude,
+    )
+    return segments, 0.5 * (colour[start] + colour[start + 1])
+
+
+def track_collection(storms, color_by="vmax", projection=None, **kwargs):
+    """Create a single LineCollection for every track
+
+    Args:
+        storms (list): :class:`storm_assess.Storm` or :class:`xarray.Dataset` tracks
+        color_by (str, optional): Variable to colour the segments by, or None to use a
+            single colour (e.g. ``color="k"``). Default is "vmax"
+        projection (cartopy.crs.Projection, optional): Projection of the map. The
+            points are transformed to the map coordinates here, all at once, so the
+            collection can be drawn without cartopy transforming each segment. Default
+            is ``PlateCarree(central_longitude=CENTRAL_LONGITUDE)``
+        **kwargs: Passed to :class:`matplotlib.collections.LineCollection`, e.g.
+            cmap, norm or linewidths
+
+    Returns:
+        matplotlib.collections.LineCollection: The tracks in the map coordinates
+    """
+    if projection is None:
+        projection = ccrs.PlateCarree(central_longitude=CENTRAL_LONGITUDE)
+
+    # Split the tracks at the edge of the map
+    central_longitude = projection.proj4_params.get("lon_0", 0)
+    segments, colour = track_segments(storms, color_by, central_longitude)
+
+    source = ccrs.PlateCarree(central_longitude=central_longitude)
+    if projection != source:
+        points = projection.transform_points(
+            source, segments[..., 0].ravel(), segments[..., 1].ravel()
+        )
+        segments = points[:, :2].reshape(segments.shape)
+
+    collection = LineCollection(segments, **kwargs)
+    if colour is not None:
+        collection.set_array(colour)
+    return collection
+
+
+def plot_tracks(storms, ax, color_by="vmax", **kwargs):
+    """Draw every track on a cartopy axes as one LineCollection. See
+    :func:`track_collection` for the arguments
+
+    Returns:
+        matplotlib.collections.LineCollection:
+    """
+    collection = track_collection(storms, color_by, ax.projection, **kwargs)
+    # The map extent is already set, so skip calculating the limits of every segment
+    ax.add_collection(collection, autolim=False)
+    return collection
+
+
+def plot_density(density, ax, **kwargs):
+    """Draw a density grid from :mod:`storm_assess.density` on a cartopy axes
+
+    Args:
+        density (xarray.DataArray): Values on the grid of :func:`storm_assess.density.grid`
+        ax (cartopy.mpl.geoaxes.GeoAxes):
+        **kwargs: Passed to :meth:`matplotlib.axes.Axes.pcolormesh`
+
+    Returns:
+        matplotlib.collections.QuadMesh:
+    """
+    lat_edges = _edges(density.latitude.values)
+    lon_edges = _edges(density.longitude.values)
+    kwargs.setdefault("transform", ccrs.PlateCarree())
+    return ax.pcolormesh(lon_edges, lat_edges, density.values, **kwargs)
+
+
+def _edges(centres):
+    half = 0.5 * np.diff(centres)
+    return np.concatenate([
+        [centres[0] - half[0]], centres[:-1] + half, [centres[-1] + half[-1]]
+    ])
+
+
+def base_map(basin=None, figsize=(10, 5), dpi=100, coastlines=True):
+    """Returns the cached figure and axes of the map for a basin, creating them the
+    first time they are requested
+
+    Args:
+        basin (str, optional): Basin in :data:`storm_assess.functions.MAP_REGION`.
+            Default is a global map
+        figsize (tuple, optional): Figure size in inches. Default is (10, 5)
+        dpi (int, optional): Resolution of the figure. Default is 100
+        coastlines (bool, optional): Draw the coastlines. These need the Natural
+            Earth data, which cartopy downloads the first time it is used. Default is
+            True
+
+    Returns:
+        tuple (matplotlib.figure.Figure, cartopy.mpl.geoaxes.GeoAxes):
+    """
+    cache = _base_maps.__dict__
+    key = (basin, tuple(figsize), dpi, coastlines)
+    if key not in cache:
+        fig = Figure(figsize=figsize, dpi=dpi)
+        ax = fig.add_subplot(
+            projection=ccrs.PlateCarree(central_longitude=CENTRAL_LONGITUDE)
+        )
+        if basin is None:
+            ax.set_global()
+        else:
+            ax.set_extent(MAP_REGION[basin])
+        if coastlines:
+            ax.coastlines(linewidth=0.5)
+        cache[key] = (fig, ax)
+
+    return cache[key]
+
+
+def clear_base_maps():
+    """ Remove the cached base maps of the current thread """
+    _base_maps.__dict__.clear()
+
+
+def render(filename, storms=None, density=None, basin=None, title=None,
+           color_by="vmax", colorbar=True, track_kwargs=None, density_kwargs=None,
+           **map_kwargs):
+    """Draw tracks and/or a density on the cached base map of a basin and save it
+
+    Args:
+        filename (str): File to save the figure to. The format is taken from the
+            extension, e.g. ".png"
+        storms (list, optional): Tracks to draw with :func:`plot_tracks`
+        density (xarray.DataArray, optional): Density to draw with
+            :func:`plot_density`
+        basin (str, optional): Basin for the map extent. See :func:`base_map`
+        title (str, optional):
+        color_by (str, optional): Variable to colour the tracks by. Default is "vmax"
+        colorbar (bool, optional): Add a colour bar for the tracks or density. Default
+            is True
+        track_kwargs (dict, optional): Passed to :func:`plot_tracks`
+        density_kwargs (dict, optional): Passed to :func:`plot_density`
+        **map_kwargs: Passed to :func:`base_map`
+
+    Returns:
+        str: The filename
+    """
+    fig, ax = base_map(basin, **map_kwargs)
+
+    # Everything added here is removed again so the base map can be reused
+    artists = []
+    mappable = None
+    position = ax.get_position(original=True)
+    try:
+        if density is not None:
+            mappable = plot_density(density, ax, **(density_kwargs or {}))
+            artists.append(mappable)
+        if storms is not None:
+            artists.append(plot_tracks(storms, ax, color_by, **(track_kwargs or {})))
+            if color_by is not None:
+                mappable = artists[-1]
+        if colorbar and mappable is not None:
+            artists.append(fig.colorbar(mappable, ax=ax, shrink=0.8))
+        if title is not None:
+            ax.set_title(title)
+
+        fig.savefig(filename)
+    finally:
+        for artist in reversed(artists):
+            artist.remove()
+        ax.set_position(position)
+        ax.set_title("")
+
+    return filename
+
+
+def _render_item(item, kwargs):
+    filename, storms = item
+    return render(filename, storms=storms, **kwargs)
+
+
+def render_many(figures, executor="process", max_workers=None, **kwargs):
+    """Render a figure of tracks for each group of storms, in parallel
+
+    Each worker keeps its own cache of base maps, so the maps are only drawn once per
+    worker.
+
+    Args:
+        figures (dict): Mapping of filename to the tracks drawn in that figure, e.g. from
+            :func:`group_storms`
+        executor (str, optional): Passed to :func:`storm_assess.parallel.imap_storms`.
+            Default is "process"
+        max_workers (int, optional): Number of workers. Default is the number of CPUs
+        **kwargs: Passed to :func:`render`. Unless a norm is given in track_kwargs, the
+            same colour scale is used for every figure
+
+    Returns:
+        list: The filenames
+    """
+    figures = {filename: list(storms) for filename, storms in figures.items()}
+
+    color_by = kwargs.get("color_by", "vmax")
+    track_kwargs = dict(kwargs.get("track_kwargs") or {})
+    if color_by is not None and "norm" not in track_kwargs:
+        values, _ = _ragged.ragged_arrays(
+            [storm for storms in figures.values() for storm in storms], [color_by]
+        )
+        if np.isfinite(values[color_by]).any():
+            track_kwargs["norm"] = Normalize(
+                np.nanmin(values[color_by]), np.nanmax(values[color_by])
+            )
+        kwargs["track_kwargs"] = track_kwargs
+
+    return parallel.map_storms(
+        _render_item, figures.items(), args=(kwargs,), executor=executor,
+        max_workers=max_workers, chunksize=1,
+    )
+
+
+def group_storms(storms, by="year"):
+    """Group storms by genesis year or ensemble member
+
+    Args:
+        storms (list): :class:`storm_assess.Storm` or :class:`xarray.Dataset` tracks
+        by (str, optional): "year" or "member" (from the storm extras, see
+            :func:`storm_assess.stats.genesis_table`). Default is "year"
+
+    Returns:
+        dict: Mapping of each year or member to a list of storms, in sorted order
+    """
+    from storm_assess import stats
+
+    if by not in ("year", "member"):
+        raise ValueError(f'by must be "year" or "member", not {by}')
+    storms = list(storms)
+    if by == "year":
+        values, offsets = _ragged.ragged_arrays(storms, ["date"])
+        keys = stats.time_components(values["date"][offsets[:-1]], ["year"])["year"]
+    else:
+        keys = [_ragged.track_member(storm) for storm in storms]
+
+    groups = {}
+    for key, storm in zip(np.asarray(keys).tolist(), storms):
+        groups.setdefault(key, []).append(storm)
+    return dict(sorted(groups.items()))
@@ -1,10 +1,8 @@
-import shapely
-from haversine import haversine_vector
 import numpy as np
-from cartopy.io.shapereader import natural_earth
-import geopandas
 
-from storm_assess.functions.xarray_functions import get_projected_track
+from storm_assess import geodesy
+# storm_assess.geometry imports shapely which is slow to import, so it is imported in
+# the functions that use it
 
 
 # Keep combined shapes rather than reproducing them multiple times
@@ -33,10 +31,9 @@ def hits_europe(storm):
     Returns:
         bool: True if storm intersects Europe, False otherwise
     """
-    europe = get_europe()
-    linestring = get_projected_track(storm)
+    from storm_assess.geometry import tracks_intersect
 
-    return linestring.intersects(europe)
+    return bool(tracks_intersect([storm], get_europe())[0])
 
 
 def landfall_europe(storm, distance=200):
@@ -52,23 +49,28 @@ def landfall_europe(storm, distance=200):
             A boolean array matching the storm length (in time) saying which points are
             within the threshold distance.
     """
-    europe_coast_xy = np.vstack([
-        np.array(g.exterior.coords.xy).transpose() for g in get_europe().geoms
+    coast_lon, coast_lat = np.hstack([
+        np.array(g.exterior.coords.xy) for g in get_europe().geoms
     ])
-    europe_coast_yx = europe_coast_xy[:, ::-1]
-    europe_coast_yx[:, 1] = (europe_coast_yx[:, 1] + 180) % 360 - 180
 
-    storm_yx = np.array([storm.latitude.data, storm.longitude.data]).transpose()
-    storm_yx[:, 1] = (storm_yx[:, 1] + 180) % 360 - 180
-
-    # Array of distances between each storm point and all coastline points
-    distances = haversine_vector(storm_yx, europe_coast_yx, comb=True)
+    # Array of distances between all coastline points (axis 0) and each storm point
+    # (axis 1)
+    distances = geodesy.distance(
+        coast_lon[:, np.newaxis], coast_lat[:, np.newaxis],
+        storm.longitude.data[np.newaxis, :], storm.latitude.data[np.newaxis, :],
+    )
 
     return (distances < distance).any(axis=0)
 
 
 @_cached_shape(name="europe")
 def get_europe():
+    # cartopy, geopandas and shapely are slow to import so only import them when the
+    # shape is first needed
+    import shapely
+    from cartopy.io.shapereader import natural_earth
+    import geopandas
+
     # Get filename of country boundaries from cartopy.
     # cartopy will download and keep the file if it has not been downloaded before
     fname = natural_earth(
@@ -93,5 +95,6 @@ def get_europe():
             for g in row.geometry.geoms:
                 geoms.append(g)
     europe_shape = shapely.union_all(geoms)
+    shapely.prepare(europe_shape)
 
     return europe_shape
@@ -0,0 +1,256 @@
+"""
+Resampling of tracks to a uniform time step or a fixed number of points.
+"""
+import numpy as np
+
+import storm_assess
+from storm_assess import _ragged, geodesy, timing
+
+
+def target_times(hours, offsets, frequency=None, npoints=None):
+    """Times to resample each track to
+
+    Args:
+        hours (numpy.ndarray): Concatenated times of all tracks in hours since the epoch
+            (see :func:`storm_assess.timing.time_axes`)
+        offsets (numpy.ndarray): Offsets of the first point of each track
+        frequency (float, optional): Time step in hours. Each track is resampled to the
+            multiples of the time step within its lifetime, so a track may have no
+            points if it is shorter than the time step
+        npoints (int, optional): Number of evenly spaced times from the first to the
+            last point of each track. Tracks with no points are left empty
+
+    Returns:
+        tuple (numpy.ndarray, numpy.ndarray):
+            The concatenated new times of all tracks and their offsets
+    """
+    if (frequency is None) == (npoints is None):
+        raise ValueError("Specify exactly one of frequency or npoints")
+
+    lengths = np.diff(offsets)
+    nonempty = lengths > 0
+    start = np.zeros(len(lengths))
+    end = np.zeros(len(lengths))
+    start[nonempty] = hours[offsets[:-1][nonempty]]
+    end[nonempty] = hours[offsets[1:][nonempty] - 1]
+
+    if frequency is not None:
+        if frequency <= 0:
+            raise ValueError(f"frequency must be positive, not {frequency}")
+        # Allow for rounding errors so that times on the time step are included
+        first = np.ceil(start / frequency - 1e-9)
+        last = np.floor(end / frequency + 1e-9)
+        count = np.where(nonempty, np.maximum(last - first + 1, 0), 0).astype(int)
+        new_offsets = np.zeros(len(lengths) + 1, dtype=int)
+        np.cumsum(count, out=new_offsets[1:])
+        step = np.arange(new_offsets[-1]) - np.repeat(new_offsets[:-1], count)
+        new_hours = (np.repeat(first, count) + step) * frequency
+    else:
+        if npoints < 1:
+            raise ValueError(f"npoints must be at least 1, not {npoints}")
+        count = np.where(nonempty, npoints, 0)
+        new_offsets = np.zeros(len(lengths) + 1, dtype=int)
+        np.cumsum(count, out=new_offsets[1:])
+        fraction = np.tile(np.linspace(0, 1, npoints), nonempty.sum())
+        duration = np.repeat((end - start)[nonempty], npoints)
+        new_hours = np.repeat(start[nonempty], npoints) + fraction * duration
+
+    return new_hours, new_offsets
+
+
+def _segments(hours, offsets, new_hours, new_offsets):
+    """ Returns the index of the observations before and after each new time, the
+    fraction of the time between them and whether the new time is within its track """
+    lengths = np.diff(offsets)
+    new_lengths = np.diff(new_offsets)
+    if (lengths[new_lengths > 0] == 0).any():
+        raise ValueError("New times given for a track with no points")
+
+    if len(new_hours) == 0:
+        empty = np.zeros(0, dtype=int)
+        return empty, empty, np.zeros(0), np.zeros(0, dtype=bool)
+
+    # Shift the times of each track so they are relative to its first point and
+    # separated from the other tracks. Then all tracks can be searched at once
+    start = np.minimum(offsets[:-1], len(hours) - 1)
+    relative = hours - np.repeat(hours[start], lengths)
+    span = np.abs(relative).max() + 1
+    key = relative + np.repeat(np.arange(len(lengths)) * span, lengths)
+
+    new_relative = new_hours - np.repeat(hours[start], new_lengths)
+    new_key = new_relative + np.repeat(np.arange(len(lengths)) * span, new_lengths)
+    left = np.searchsorted(key, new_key, side="right") - 1
+
+    # Use the first or last segment for times at (or beyond) the ends of each track
+    first = np.repeat(offsets[:-1], new_lengths)
+    last = np.repeat(offsets[1:], new_lengths) - 1
+    left = np.clip(left, first, np.maximum(last - 1, first))
+    right = np.minimum(left + 1, last)
+
+    interval = hours[right] - hours[left]
+    fraction = np.divide(
+        new_hours - hours[left], interval,
+        out=np.zeros(len(new_hours)), where=interval > 0,
+    )
+    within = (new_hours >= hours[first]) & (new_hours <= hours[last])
+    return left, right, np.clip(fraction, 0, 1), within
+
+
+def interpolate(hours, values, offsets, new_hours, new_offsets):
+    """Interpolate the values of each track linearly to new times
+
+    Args:
+        hours (numpy.ndarray): Concatenated times of all tracks (e.g. in hours since the
+            epoch). The times of each track must be increasing
+        values (numpy.ndarray): Concatenated values of all tracks
+        offsets (numpy.ndarray): Offsets of the first point of each track
+        new_hours (numpy.ndarray): Concatenated new times of all tracks
+        new_offsets (numpy.ndarray): Offsets of the first new time of each track
+
+    Returns:
+        numpy.ndarray: The values at the new times. Values at times outside of each
+        track are NaN
+    """
+    left, right, fraction, within = _segments(hours, offsets, new_hours, new_offsets)
+    return _linear(np.asarray(values, dtype=float), left, right, fraction, within)
+
+
+def _linear(values, left, right, fraction, within):
+    before, after = values[left], values[right]
+    result = before + fraction * (after - before)
+
+    # Keep the original values exactly at the original times, even if the
+    # neighbouring values are missing
+    result = np.where(fraction == 0, before, np.where(fraction == 1, after, result))
+    result[~within] = np.nan
+    return result
+
+
+def interpolate_positions(hours, lons, lats, offsets, new_hours, new_offsets):
+    """Interpolate the positions of each track to new times along great circles
+
+    Args:
+        hours (numpy.ndarray): Concatenated times of all tracks. The times of each
+            track must be increasing
+        lons, lats (numpy.ndarray): Concatenated positions of all tracks in degrees
+        offsets (numpy.ndarray): Offsets of the first point of each track
+        new_hours (numpy.ndarray): Concatenated new times of all tracks
+        new_offsets (numpy.ndarray): Offsets of the first new time of each track
+
+    Returns:
+        tuple (numpy.ndarray, numpy.ndarray):
+            The longitudes (0 to 360) and latitudes at the new times. Positions at times
+            outside of each track are NaN
+    """
+    left, right, fraction, within = _segments(hours, offsets, new_hours, new_offsets)
+    return _great_circle(
+        np.asarray(lons, dtype=float), np.asarray(lats, dtype=float),
+        left, right, fraction, within,
+    )
+
+
+def _great_circle(lons, lats, left, right, fraction, within):
+    lon1, lat1, lon2, lat2 = lons[left], lats[left], lons[right], lats[right]
+    distance = geodesy.distance(lon1, lat1, lon2, lat2)
+    bearing = geodesy.bearing(lon1, lat1, lon2, lat2)
+    new_lons, new_lats = geodesy.destination(lon1, lat1, bearing, fraction * distance)
+
+    # Keep the original positions exactly at the original times
+    new_lons = np.where(fraction == 0, lon1 % 360, np.where(fraction == 1, lon2 % 360, new_lons))
+    new_lats = np.where(fraction == 0, lat1, np.where(fraction == 1, lat2, new_lats))
+    new_lons[~within] = np.nan
+    new_lats[~within] = np.nan
+    return new_lons, new_lats
+
+
+def _variables(tracks):
+    """ Names of the per-observation variables shared by all tracks, other than the
+    time and position """
+    if hasattr(tracks[0], "column"):
+        names = [[name for name in storm_assess.OBSERVATION_FIELDS[3:]] +
+                 list(track.obs[0].extras if len(track) else []) for track in tracks]
+    else:
+        names = [[name for name, variable in track.data_vars.items()
+                  if variable.dims == ("time",)
+                  and name not in ("latitude", "longitude")] for track in tracks]
+    common = set.intersection(*(set(track_names) for track_names in names))
+    return [name for name in names[0] if name in common]
+
+
+def resample(tracks, frequency=None, npoints=None):
+    """Resample every track in a collection to a uniform time step or a fixed number of
+    points
+
+    Args:
+        tracks (list): :class:`storm_assess.Storm` or :class:`xarray.Dataset` tracks.
+            The times of each track must be increasing
+        frequency (float, optional): Time step in hours, e.g. 6 for the synoptic
+            times. See :func:`target_times`
+        npoints (int, optional): Number of evenly spaced times from the first to the
+            last point of each track
+
+    Returns:
+        list: New tracks of the same type as the input with the positions and all
+        variables shared by every track interpolated to the new times. Storm extras
+        and xarray attributes are copied
+    """
+    tracks = list(tracks)
+    if not tracks:
+        return []
+    hours, offsets = timing.time_axes(tracks)
+    names = _variables(tracks)
+    values, _ = _ragged.ragged_arrays(tracks, ["lon", "lat"] + names)
+
+    new_hours, new_offsets = target_times(hours, offsets, frequency, npoints)
+    left, right, fraction, within = _segments(hours, offsets, new_hours, new_offsets)
+    new_values = {}
+    new_values["lon"], new_values["lat"] = _great_circle(
+        np.asarray(values["lon"], dtype=float), np.asarray(values["lat"], dtype=float),
+        left, right, fraction, within,
+    )
+    for name in names:
+        if np.issubdtype(values[name].dtype, np.number):
+            new_values[name] = _linear(
+                values[name].astype(float), left, right, fraction, within
+            )
+        else:
+            new_values[name] = values[name][np.where(fraction < 0.5, left, right)]
+
+    dates = _ragged.track_column(tracks[0], "date")
+    calendar = getattr(dates[0], "calendar", None) if len(dates) else None
+    new_dates = timing.dates_from_hours(new_hours, calendar)
+
+    resampled = []
+    for n, track in enumerate(tracks):
+        points = slice(new_offsets[n], new_offsets[n + 1])
+        if hasattr(track, "column"):
+            resampled.append(storm_assess.Storm.from_arrays(
+                track.snbr,
+                {name: new_values[name][points] if name != "date" else new_dates[points]
+                 for name in storm_assess.OBSERVATION_FIELDS},
+                obs_extras={name: new_values[name][points] for name in names
+                            if name not in storm_assess.OBSERVATION_FIELDS},
+                extras=dict(track.extras),
+                hours=new_hours[points],
+            ))
+        else:
+            resampled.append(_dataset(track, new_dates[points], dict(
+                longitude=new_values["lon"][points],
+                latitude=new_values["lat"][points],
+                **{name: new_values[name][points] for name in names},
+            )))
+
+    return resampled
+
+
+def _dataset(track, dates, data):
+    import xarray
+
+    dataset = xarray.Dataset(
+        {name: ("time", values) for name, values in data.items()},
+        coords=dict(time=list(dates)),
+        attrs=track.attrs,
+    )
+    if "start_time" in dataset.attrs and len(dates):
+        dataset.attrs["start_time"] = dataset.time[0].data[()]
+    return dataset
@@ -0,0 +1,256 @@
+"""
+Seasonal and monthly statistics of storm collections.
+"""
+import numpy as np
+import pandas as pd
+
+from storm_assess import _ragged, geometry
+
+
+#: Columns of :func:`genesis_table` that statistics can be grouped by, along with
+#: "basin"
+GROUPS = ("year", "month", "season", "member")
+
+
+def time_components(times, names=("year", "month")):
+    """Extract components (e.g. year or hour) of an array of times as integer arrays
+
+    Args:
+        times (numpy.ndarray): datetime64 values or datetime/cftime objects
+        names (list of str): Attributes of the times to extract, any of "year",
+            "month", "day", "hour", "minute" or "second"
+
+    Returns:
+        dict: Mapping of each name to an integer array
+    """
+    times = np.asarray(times)
+    if np.issubdtype(times.dtype, np.datetime64):
+        # Work from the fields of the datetime64 values rather than converting every time
+        units = dict(year="Y", month="M", day="D", hour="h", minute="m", second="s")
+        components = {}
+        for name in names:
+            if name == "year":
+                components[name] = times.astype("datetime64[Y]").astype(int) + 1970
+            elif name == "month":
+                components[name] = times.astype("datetime64[M]").astype(int) % 12 + 1
+            elif name == "day":
+                days = times.astype("datetime64[D]")
+                components[name] = (days - days.astype("datetime64[M]")).astype(int) + 1
+            else:
+                unit = units[name]
+                larger = {"hour": "D", "minute": "h", "second": "m"}[name]
+                value = times.astype(f"datetime64[{unit}]")
+                start = value.astype(f"datetime64[{larger}]")
+                components[name] = (value - start).astype(int)
+        return components
+
+    return {
+        name: np.fromiter(
+            (getattr(time, name) for time in times), dtype=int, count=len(times)
+        )
+        for name in names
+    }
+
+
+def in_season(years, months, season_months):
+    """Find which times are within a season and the year each season starts in
+
+    Args:
+        years, months (numpy.ndarray): Year and month of each time
+        season_months (list of int): Consecutive months in the season, e.g.
+            [11, 12, 1, 2, 3, 4]. As for :func:`storm_assess.functions._get_time_range`
+            all months from the first to the last are included
+
+    Returns:
+        tuple (numpy.ndarray, numpy.ndarray):
+            Whether each time is in the season and the year the season started in (-1
+            for times outside the season)
+    """
+    years, months = np.asarray(years), np.asarray(months)
+    first, last = season_months[0], season_months[-1]
+
+    inside = (months - first) % 12 <= (last - first) % 12
+    season = np.where(inside, years - (months < first), -1)
+    return inside, season
+
+
+def _ace(storms, offsets):
+    """ ACE of each storm from vmax_kts at 6-hourly times. See
+    :meth:`storm_assess.Storm.ace_index` """
+    try:
+        values, _ = _ragged.ragged_arrays(storms, ["date", "vmax_kts"])
+    except KeyError:
+        return np.full(len(storms), np.nan)
+
+    times = time_components(values["date"], names=["hour", "minute", "second"])
+    six_hourly = (
+        (times["hour"] % 6 == 0) & (times["minute"] == 0) & (times["second"] == 0)
+    )
+    vmax_kts = values["vmax_kts"].astype(float)
+    energy = np.where(six_hourly & ~np.isnan(vmax_kts), np.square(vmax_kts) / 10000., 0)
+
+    result = np.zeros(len(storms))
+    nonempty = np.diff(offsets) > 0
+    if nonempty.any():
+        result[nonempty] = np.add.reduceat(energy, offsets[:-1][nonempty])
+    return result
+
+
+def genesis_table(storms, basins=(), season_months=None, intensity="vmax"):
+    """Summarise the genesis time, member, basins and intensity of every storm
+
+    Args:
+        storms (list): :class:`storm_assess.Storm` or :class:`xarray.Dataset` tracks
+        basins (list, optional): Basins in
+            :data:`storm_assess.functions.TRACKING_REGION` to check whether each storm
+            passes through (see :func:`storm_assess.geometry.storms_in_basin`)
+        season_months (list of int, optional): Months of the season used for the
+            "season" column (see :func:`in_season`). Default is the calendar year
+        intensity (str, optional): Variable used for the "intensity" column. Default
+            is "vmax". If None, the intensity and ace columns are left out so that
+            only the dates and positions of the storms are read
+
+    Returns:
+        pandas.DataFrame:
+            One row per storm with the columns
+
+            * year, month: The time of the first point of the track
+            * season: The year the season containing the genesis time started, or -1
+              if the storm formed outside the season
+            * member: The ensemble member from the storm's extras (or attributes for
+              xarray tracks), or -1 if it is not set
+            * intensity: The maximum of the intensity variable along the track
+            * ace: The accumulated cyclone energy, calculated as for
+              :meth:`storm_assess.Storm.ace_index` (without rounding). NaN if the
+              storms don't have vmax_kts
+            * One boolean column for each basin
+    """
+    if season_months is None:
+        season_months = list(range(1, 13))
+    storms = list(storms)
+
+    names = ["date"] if intensity is None else ["date", intensity]
+    values, offsets = _ragged.ragged_arrays(storms, names)
+    nonempty = np.diff(offsets) > 0
+    if not nonempty.all():
+        raise ValueError("All storms must have at least one observation")
+
+    genesis = time_components(values["date"][offsets[:-1]])
+    _, season = in_season(genesis["year"], genesis["month"], season_months)
+
+    table = pd.DataFrame(dict(
+        year=genesis["year"],
+        month=genesis["month"],
+        season=season,
+        member=np.array([_ragged.track_member(storm) for storm in storms], dtype=int),
+    ))
+    if intensity is not None:
+        table["intensity"] = (
+            np.fmax.reduceat(values[intensity].astype(float), offsets[:-1])
+            if len(storms) > 0 else np.zeros(0)
+        )
+        table["ace"] = _ace(storms, offsets)
+    for basin in basins:
+        table[basin] = geometry.storms_in_basin(storms, basin)
+
+    return table
+
+
+def _grouped(table, by, basin):
+    """ Returns the rows to use, duplicated for each basin if grouping by basin """
+    by = [by] if isinstance(by, str) else list(by)
+    if basin is not None:
+        table = table[table[basin]]
+
+    if "basin" in by:
+        basins = [
+            name for name in table.columns if name not in GROUPS + ("intensity", "ace")
+        ]
+        table = table.melt(
+            id_vars=[name for name in table.columns if name not in basins],
+            value_vars=basins, var_name="basin", value_name="in_basin",
+        )
+        table = table[table.in_basin]
+
+    return table, by
+
+
+def storm_counts(table, by=("year",), basin=None):
+    """Count the number of storms in each group
+
+    Args:
+        table (pandas.DataFrame): Output from :func:`genesis_table`
+        by (str or list of str): Columns to group by. Any of :data:`GROUPS` or "basin"
+            (a storm is counted once for each basin it passes through)
+        basin (str, optional): Only count storms passing through this basin
+
+    Returns:
+        pandas.Series: Number of storms indexed by the groups
+    """
+    table, by = _grouped(table, by, basin)
+    return table.groupby(by).size().rename("count")
+
+
+def ace(table, by=("year",), basin=None):
+    """Total accumulated cyclone energy of the storms in each group. See
+    :func:`storm_counts` for the arguments
+
+    Returns:
+        pandas.Series: Total ACE indexed by the groups
+    """
+    table, by = _grouped(table, by, basin)
+    return table.groupby(by).ace.sum()
+
+
+def intensity_histogram(table, bins, by=("year",), basin=None):
+    """Histogram of the lifetime maximum intensity of the storms in each group. See
+    :func:`storm_counts` for the other arguments
+
+    Args:
+        bins (array_like): Edges of the intensity bins
+
+    Returns:
+        pandas.DataFrame:
+            The number of storms in each bin (columns, labelled by the lower edge of
+            the bin) for each group (rows)
+    """
+    table, by = _grouped(table, by, basin)
+    bins = np.asarray(bins)
+    nbins = len(bins) - 1
+
+    # Storms outside the range of the bins are dropped
+    index = np.digitize(table.intensity, bins) - 1
+    index[table.intensity.to_numpy() == bins[-1]] = nbins - 1
+    valid = (index >= 0) & (index < nbins)
+
+    codes, groups = pd.MultiIndex.from_frame(table[by]).factorize()
+    counts = np.bincount(
+        codes[valid] * nbins + index[valid], minlength=len(groups) * nbins
+    ).reshape(len(groups), nbins)
+
+    if len(by) == 1:
+        groups = groups.get_level_values(0)
+    return pd.DataFrame(counts, index=groups, columns=bins[:-1]).sort_index()
+
+
+def genesis_months(storms, years, basin):
+    """Genesis month of each storm that formed in the given years and passes through
+    a basin
+
+    Returns:
+        numpy.ndarray: Genesis months in the order of the storms
+    """
+    table = genesis_table(storms, basins=[basin], intensity=None)
+    selected = table.year.isin(years) & table[basin]
+    return table.month[selected].to_numpy()
+
+
+def monthly_storm_count(storms, years, months, basin):
+    """Number of storms passing through a basin that formed in each month of the given
+    years
+
+    Returns:
+        list: The number of storms for each month in months
+    """
+    count = np.bincount(genesis_months(storms, years, basin), minlength=13)
+    return [int(count[month]) for month in months]
@@ -0,0 +1,239 @@
+"""
+Generate synthetic TRACK files for testing how the loaders and filters scale.
+"""
+import datetime
+
+import numpy as np
+
+from storm_assess import parallel
+
+
+#: Supported file layouts. See the module documentation
+LAYOUTS = ("track", "hart", "hurdat2", "no_assumptions")
+
+#: Number of vorticity levels in the added fields
+NLEVELS = 7
+
+#: Value written by TRACK for missing data
+MISSING = 1e25
+
+# Lengths used for dates in the 360-day calendar
+_HOURS_PER_DAY = 24
+_DAYS_PER_MONTH_360 = 30
+
+
+def _fields(layout, v10m, has_coords):
+    """ Returns a list of (name, has_coords) for each added field """
+    vorticity = [("vorticity_%d" % n, True) for n in range(NLEVELS)]
+    if layout == "track":
+        fields = vorticity + [("mslp", True), ("vmax", True)]
+        if v10m:
+            fields.append(("v10m", True))
+    elif layout == "hart":
+        fields = vorticity + [("mslp", True), ("vmax", True), ("v10m", True),
+                              ("TL", False), ("TU", False), ("B", False)]
+    elif layout == "hurdat2":
+        fields = vorticity + [("vmax", True), ("mslp", True), ("v10m", True)]
+    elif layout == "no_assumptions":
+        if has_coords is None:
+            has_coords = [True, False, True]
+        fields = [("field_%d" % n, bool(coords)) for n, coords in enumerate(has_coords)]
+    else:
+        raise ValueError(f"layout must be one of {LAYOUTS}, not {layout}")
+
+    if has_coords is not None and layout != "no_assumptions":
+        raise ValueError("has_coords can only be set for the no_assumptions layout")
+
+    return fields
+
+
+def _header(ntracks, fields):
+    has_coords = "".join("1" if coords else "0" for _, coords in fields)
+    nvars = sum(3 if coords else 1 for _, coords in fields)
+    return (
+        "0\n"
+        "ADDED_FIELDS: " + " ".join(name for name, _ in fields) + "\n"
+        "0 0\n"
+        f"TRACK_NUM {ntracks:8d} ADD_FLD {len(fields):4d} {nvars:4d} &{has_coords}\n"
+    )
+
+
+def _line_format(fields):
+    """ Format of each line: date, lon, lat, vorticity, then the added fields """
+    fmt = "%d %f %f %e &"
+    for _, coords in fields:
+        if coords:
+            fmt += " %f & %f & %e &"
+        else:
+            fmt += " %e &"
+    return fmt + "\n"
+
+
+def _date_numbers(hours, start, calendar):
+    """ Returns dates as YYYYMMDDHH numbers for times in hours since start """
+    if calendar == "netcdftime":
+        # 360-day calendar: Every month has 30 days
+        days = hours // _HOURS_PER_DAY + (start.day - 1)
+        months = days // _DAYS_PER_MONTH_360 + (start.month - 1)
+        year = start.year + months // 12
+        month = months % 12 + 1
+        day = days % _DAYS_PER_MONTH_360 + 1
+        hour = hours % _HOURS_PER_DAY
+    else:
+        times = np.datetime64(start, "h") + hours.astype("timedelta64[h]")
+        year = times.astype("datetime64[Y]").astype(int) + 1970
+        month = times.astype("datetime64[M]").astype(int) % 12 + 1
+        day = (times.astype("datetime64[D]") - times.astype("datetime64[M]")).astype(int) + 1
+        hour = (times - times.astype("datetime64[D]")).astype(int)
+
+    return ((year * 100 + month) * 100 + day) * 100 + hour
+
+
+def _tracks(rng, ntracks, npoints, fields, timestep):
+    """ Generate the values for a batch of tracks
+
+    Returns the number of points in each track and an array with the values for every
+    point of every track (one row per point) in the order they are written, starting
+    with the time in hours since the start date """
+    lengths = rng.integers(npoints[0], npoints[1] + 1, ntracks)
+    start_hours = rng.integers(0, 365 * 24 // timestep, ntracks) * timestep
+    n = np.repeat(np.arange(ntracks), lengths)
+    offsets = np.concatenate([[0], np.cumsum(lengths)])
+    step = np.arange(offsets[-1]) - offsets[:-1][n]
+    fraction = step / np.maximum(lengths[n] - 1, 1)
+
+    # Tracks move westwards then recurve polewards and eastwards
+    hemisphere = rng.choice([-1, 1], ntracks)[n]
+    lon0 = rng.uniform(0, 360, ntracks)[n]
+    lat0 = rng.uniform(5, 25, ntracks)[n]
+    speed = rng.uniform(0.5, 1.5, ntracks)[n] * timestep / 6
+    lon = (lon0 + speed * (-2 * step + 3 * step * fraction ** 2)) % 360
+    lat = hemisphere * (lat0 + speed * 0.6 * step) + rng.normal(0, 0.1, len(n))
+    lat = np.clip(lat, -89, 89)
+
+    # Intensity peaks part way through each track
+    peak = rng.uniform(20, 70, ntracks)[n]
+    profile = np.sin(np.pi * fraction) ** 1.5
+    vmax = 10 + (peak - 10) * profile
+    vort = hemisphere * (2 + 10 * profile)
+
+    values = {
+        "vmax": vmax,
+        "v10m": 0.8 * vmax,
+        "mslp": (1010 - 1.2 * (vmax - 10)) * 100,
+        "TL": 150 - 250 * fraction,
+        "TU": 100 - 300 * fraction,
+        "B": 60 * fraction ** 2 - 5,
+    }
+    for level in range(NLEVELS):
+        values["vorticity_%d" % level] = vort * (1 - 0.08 * level)
+
+    columns = [start_hours[n] + step * timestep, lon, lat, vort]
+    for name, coords in fields:
+        value = values.get(name)
+        if value is None:
+            value = rng.normal(0, 1, len(n))
+        if coords:
+            columns.extend([
+                (lon + rng.normal(0, 0.2, len(n))) % 360,
+                lat + rng.normal(0, 0.2, len(n)),
+                value,
+            ])
+        else:
+            columns.append(value)
+
+    return lengths, np.column_stack(columns)
+
+
+def write_tracks(filename, ntracks=100, npoints=(8, 60), layout="track", v10m=False,
+                 has_coords=None, calendar=None, header="new", start=None, timestep=6,
+                 missing_fraction=0., seed=None, chunksize=10000, jobs=1):
+    """Write a file of synthetic tracks in the TRACK text format
+
+    Args:
+        filename (str):
+        ntracks (int, optional): Number of tracks. Default is 100
+        npoints (tuple of int, optional): Minimum and maximum number of points in each
+            track. Default is (8, 60)
+        layout (str, optional): One of :data:`LAYOUTS`, which determines the added
+            fields. Default is "track"
+        v10m (bool, optional): Add the 10 m wind speed to the "track" layout
+        has_coords (list of bool, optional): For the "no_assumptions" layout, whether
+            each added field has coordinates. Default is [True, False, True]
+        calendar (str, optional): None for the standard calendar or "netcdftime" for
+            the 360-day calendar, matching the loaders
+        header (str, optional): "new" for ``TRACK_ID n START_TIME YYYYMMDDHH`` track
+            headers or "old" for ``TRACK_ID n``. Default is "new"
+        start (datetime.datetime, optional): Earliest possible start time. Tracks start
+            at random times in the following year. Default is 2000-01-01
+        timestep (int, optional): Hours between points. Default is 6
+        missing_fraction (float, optional): Fraction of the added field values set to
+            the TRACK missing value (:data:`MISSING`). Default is 0
+        seed (int, optional): Seed for the random number generator, to produce the same
+            file each time (for the same chunksize)
+        chunksize (int, optional): Number of tracks generated and written at once.
+            Default is 10000
+        jobs (int, optional): Number of processes used to generate the chunks of
+            tracks. Default is 1
+    """
+    if header not in ("new", "old"):
+        raise ValueError(f'header must be "new" or "old", not {header}')
+    if start is None:
+        start = datetime.datetime(2000, 1, 1)
+
+    fields = _fields(layout, v10m, has_coords)
+    settings = dict(
+        npoints=npoints, fields=fields, calendar=calendar, header=header, start=start,
+        timestep=timestep, missing_fraction=missing_fraction,
+    )
+
+    # Each chunk has its own random numbers so the file is the same however many
+    # processes are used
+    chunks = [
+        (first, min(chunksize, ntracks - first), chunk_seed)
+        for first, chunk_seed in zip(
+            range(0, ntracks, chunksize),
+            np.random.SeedSequence(seed).spawn(-(-ntracks // chunksize)),
+        )
+    ]
+
+    with open(filename, "w") as f:
+        f.write(_header(ntracks, fields))
+        executor = "serial" if jobs == 1 else "process"
+        for text in parallel.imap_storms(
+            _chunk_text, chunks, kwargs=settings, executor=executor, max_workers=jobs,
+            chunksize=1,
+        ):
+            f.write(text)
+
+
+def _chunk_text(chunk, npoints, fields, calendar, header, start, timestep,
+                missing_fraction):
+    """ Returns the text for a chunk of tracks given as (first track, number of tracks,
+    seed) """
+    first, ntracks, seed = chunk
+    rng = np.random.default_rng(seed)
+    lengths, values = _tracks(rng, ntracks, npoints, fields, timestep)
+
+    # Replace the first column (time) with the date as YYYYMMDDHH
+    values[:, 0] = _date_numbers(values[:, 0].astype(int), start, calendar)
+    if missing_fraction > 0:
+        missing = rng.random((len(values), values.shape[1] - 4)) < missing_fraction
+        values[:, 4:][missing] = MISSING
+
+    # Format all lines in one go and then add the header of each track
+    line_format = _line_format(fields)
+    lines = [line_format % tuple(row) for row in values.tolist()]
+    offset = 0
+    blocks = []
+    for n, npoints_track in enumerate(lengths.tolist()):
+        track_id = first + n + 1
+        if header == "new":
+            blocks.append("TRACK_ID %d START_TIME %d\n" % (track_id, values[offset, 0]))
+        else:
+            blocks.append("TRACK_ID %d\n" % track_id)
+        blocks.append("POINT_NUM %d\n" % npoints_track)
+        blocks.extend(lines[offset:offset + npoints_track])
+        offset += npoints_track
+
+    return "".join(blocks)
@@ -0,0 +1,225 @@
+"""
+Numeric time axes and timing metrics (lifetimes, time to peak intensity) for
+collections of storms.
+"""
+import numpy as np
+
+from storm_assess import _ragged
+
+
+#: Units of the numeric times, as for netCDF4/cftime (in the calendar of the dates)
+UNITS = "hours since 1970-01-01 00:00:00"
+
+_EPOCH_YEAR = 1970
+_HOURS_PER_DAY = 24
+_DAYS_PER_MONTH_360 = 30
+
+
+def _hours_360_day(year, month, day, hour):
+    """ Hours since the epoch for date components in the 360-day calendar """
+    days = ((year - _EPOCH_YEAR) * 12 + month - 1) * _DAYS_PER_MONTH_360 + day - 1
+    return days * _HOURS_PER_DAY + hour
+
+
+def _hours_standard(year, month, day, hour):
+    """ Hours since the epoch for date components in the standard calendar """
+    months = ((year - _EPOCH_YEAR) * 12 + month - 1).astype("datetime64[M]")
+    days = months.astype("datetime64[D]") + (day - 1)
+    return days.astype(np.int64) * _HOURS_PER_DAY + hour
+
+
+def date_number_hours(dates, calendar=None):
+    """Returns hours since the epoch for dates given as YYYYMMDDHH numbers, as in TRACK
+    files
+
+    Args:
+        dates (array_like): Integers (or their text)
+        calendar (str, optional): As for the loaders in :mod:`storm_assess.track`, None
+            for the standard calendar or "netcdftime" for the 360-day calendar
+
+    Returns:
+        numpy.ndarray: Hours as floats
+    """
+    dates = np.asarray(dates, dtype=np.int64)
+    year, month = dates // 1000000, dates // 10000 % 100
+    day, hour = dates // 100 % 100, dates % 100
+    if calendar == "netcdftime":
+        hours = _hours_360_day(year, month, day, hour)
+    else:
+        hours = _hours_standard(year, month, day, hour)
+    return hours.astype(float)
+
+
+def hours_since_epoch(times):
+    """Returns times as hours since the epoch (:data:`UNITS`) in their own calendar
+
+    Args:
+        times (array_like): datetime64 values or datetime/cftime objects
+
+    Returns:
+        numpy.ndarray: Hours as floats
+    """
+    times = np.asarray(times)
+    if len(times) == 0:
+        return np.zeros(0)
+    if np.issubdtype(times.dtype, np.datetime64):
+        return (times - np.datetime64("1970-01-01T00")) / np.timedelta64(1, "h")
+
+    calendar = getattr(times[0], "calendar", None)
+    if calendar not in (None, "", "standard", "gregorian", "proleptic_gregorian",
+                        "360_day"):
+        import cftime
+
+        return np.asarray(cftime.date2num(times, UNITS, calendar=calendar), dtype=float)
+
+    year, month, day, hour, minute, second = (
+        np.fromiter((getattr(time, name) for time in times), dtype=np.int64,
+                    count=len(times))
+        for name in ("year", "month", "day", "hour", "minute", "second")
+    )
+    if calendar == "360_day":
+        hours = _hours_360_day(year, month, day, hour)
+    else:
+        hours = _hours_standard(year, month, day, hour)
+    return hours + minute / 60 + second / 3600
+
+
+def time_axes(storms):
+    """Concatenated time axes of all storms
+
+    Args:
+        storms (list): :class:`storm_assess.Storm` or :class:`xarray.Dataset` tracks
+
+    Returns:
+        tuple (numpy.ndarray, numpy.ndarray):
+            The hours since the epoch of every observation and the offsets of the first
+            observation of each storm (see :func:`storm_assess._ragged.ragged_arrays`)
+    """
+    hours = [
+        storm.hours() if hasattr(storm, "hours")
+        else hours_since_epoch(_ragged.track_column(storm, "date"))
+        for storm in storms
+    ]
+    offsets = np.zeros(len(hours) + 1, dtype=int)
+    np.cumsum([len(values) for values in hours], out=offsets[1:])
+    if not hours:
+        return np.zeros(0), offsets
+    return np.concatenate(hours), offsets
+
+
+def lifetimes(storms):
+    """ Hours between the first and last observations of each storm (NaN if a storm has
+    no observations) """
+    hours, offsets = time_axes(storms)
+    result = np.full(len(offsets) - 1, np.nan)
+    nonempty = np.diff(offsets) > 0
+    result[nonempty] = hours[offsets[1:][nonempty] - 1] - hours[offsets[:-1][nonempty]]
+    return result
+
+
+def _peak_index(values, offsets, method):
+    """ Index (relative to the start of each track) of the first maximum or minimum of
+    each track, ignoring missing values, or -1 if they are all missing """
+    values = np.asarray(values, dtype=float)
+    nonempty = np.diff(offsets) > 0
+    peak = np.full(len(offsets) - 1, np.nan)
+    function = np.fmax if method == "max" else np.fmin
+    if nonempty.any():
+        peak[nonempty] = function.reduceat(values, offsets[:-1][nonempty])
+    return _ragged.first_true(values == np.repeat(peak, np.diff(offsets)), offsets)
+
+
+def time_to_peak(storms, variable="vmax", method="max"):
+    """Hours from the first observation of each storm to its peak intensity
+
+    Args:
+        storms (list): :class:`storm_assess.Storm` or :class:`xarray.Dataset` tracks
+        variable (str, optional): Default is "vmax"
+        method (str, optional): "max" (e.g. for wind speed or vorticity) or "min" (e.g.
+            for "mslp"). Default is "max"
+
+    Returns:
+        numpy.ndarray: NaN for storms without any valid values of the variable
+    """
+    if method not in ("max", "min"):
+        raise ValueError(f'method must be "max" or "min", not {method}')
+    storms = list(storms)
+    hours, offsets = time_axes(storms)
+    values, _ = _ragged.ragged_arrays(storms, [variable])
+    index = _peak_index(values[variable], offsets, method)
+
+    result = np.full(len(storms), np.nan)
+    found = index >= 0
+    result[found] = hours[offsets[:-1][found] + index[found]] - hours[offsets[:-1][found]]
+    return result
+
+
+def steps_to_peak(storms, variable="vmax", method="max", timestep=6):
+    """ Number of timesteps from the first observation of each storm to its peak
+    intensity. See :func:`time_to_peak` for the arguments. The timestep is in hours and
+    defaults to 6 """
+    return time_to_peak(storms, variable, method) / timestep
+
+
+def duration_above(storms, threshold, variable="vmax"):
+    """Total time each storm spends at or above a threshold
+
+    The time between two consecutive observations is counted if the variable is at or
+    above the threshold at both of them, so a single observation above the threshold
+    gives no time.
+
+    Args:
+        storms (list): :class:`storm_assess.Storm` or :class:`xarray.Dataset` tracks
+        threshold (float): e.g. 33 m/s for hurricane strength
+        variable (str, optional): Default is "vmax"
+
+    Returns:
+        numpy.ndarray: Hours
+    """
+    storms = list(storms)
+    hours, offsets = time_axes(storms)
+    values, _ = _ragged.ragged_arrays(storms, [variable])
+    above = np.asarray(values[variable], dtype=float) >= threshold
+
+    # Intervals between consecutive observations of the same storm
+    both = above[:-1] & above[1:]
+    starts = offsets[1:-1]
+    both[starts[(starts > 0) & (starts < len(hours))] - 1] = False
+    intervals = np.where(both, np.diff(hours), 0)
+
+    result = np.zeros(len(storms))
+    nonempty = np.diff(offsets) > 1
+    if nonempty.any():
+        result[nonempty] = np.add.reduceat(
+            np.append(intervals, 0), offsets[:-1][nonempty]
+        )
+    return result
+
+
+def dates_from_hours(hours, calendar=None):
+    """Returns the dates for hours since the epoch, the inverse of
+    :func:`hours_since_epoch`. Times are rounded to the nearest second
+
+    Args:
+        hours (array_like): Hours since the epoch (:data:`UNITS`)
+        calendar (str, optional): Calendar of the dates. None (the default), "standard",
+            "gregorian" or "proleptic_gregorian" give datetime objects and any other
+            calendar (including "netcdftime" for "360_day") gives cftime objects
+
+    Returns:
+        numpy.ndarray: Object array of dates
+    """
+    seconds = np.round(np.asarray(hours, dtype=float) * 3600)
+    if calendar in (None, "", "standard", "gregorian", "proleptic_gregorian"):
+        times = np.datetime64("1970-01-01T00", "s") + seconds.astype("timedelta64[s]")
+        return times.astype("datetime64[us]").astype(object)
+
+    import cftime
+
+    if calendar == "netcdftime":
+        calendar = "360_day"
+    dates = cftime.num2date(
+        seconds, UNITS.replace("hours", "seconds"), calendar=calendar,
+        only_use_cftime_datetimes=True,
+    )
+    return np.asarray(dates, dtype=object).reshape(seconds.shape)
@@ -11,9 +11,14 @@ and 925 hPa max winds (e.g. 10m winds or precipitation) are not
 currently stored. If you want these values you need to read in 
 the data file and include the variables in the 'extras' dictionary. 
 
+Note: Longitudes are normalised to the range 0-360 when the tracks
+are loaded (see storm_assess.geodesy.normalise_longitude).
 
 """
+import contextlib
 import gzip
+import itertools
+import os
 
 import datetime
 import cftime
@@ -24,6 +29,20 @@ import xarray
 from parse import parse
 
 import storm_assess
+from storm_assess import accessors, geodesy, index, parallel, timing  # noqa: F401 (registers the accessors)
+
+#: Approximate number of bytes of a file parsed by each task when loading in parallel
+CHUNK_BYTES = 2 ** 26
+
+#: Values used for missing data in TRACK files, which the loaders replace with NaN
+MISSING_VALUES = storm_assess.MISSING_VALUES
+
+#: Value written by :func:`write` in place of missing (NaN) values, as used by TRACK
+WRITE_MISSING_VALUE = 1e25
+
+# Values of the full resolution position in the "track" layout that mean the position
+# of the T42 (or T63) vorticity maximum is used instead
+_UNAVAILABLE = (1e12, 1e25)
 
 # Use align specifications (^, <, >) to allow variable whitespace in headers
 # Left aligned (<) for "nvars" so nfields takes all whitespace between in case there is
@@ -46,6 +65,265 @@ def _parse(fmt, string, **kwargs):
     return result
 
 
+class _Selection(object):
+    """Criteria for the tracks to load. These are checked from the track header and the
+    raw text of each track's points, so that tracks that aren't needed are skipped
+    before their values are converted and stored. See :func:`load` for the arguments
+    """
+
+    def __init__(self, track_ids=None, start_time=None, track_slice=None, months=None,
+                 bbox=None, basin=None, min_points=None):
+        self.track_ids = None if track_ids is None else set(track_ids)
+        self.start_time = start_time
+        if start_time is not None:
+            self.start_time = [
+                None if time is None else index.time_number(time) for time in start_time
+            ]
+        self.track_slice = track_slice
+        self.months = None if months is None else set(months)
+        self.bbox = bbox
+        self.basin = basin
+        self.min_points = min_points
+
+        self._positions = None
+        self._count = 0
+
+    def _header_criteria(self):
+        return (self.track_ids, self.start_time, self.track_slice, self.months,
+                self.min_points)
+
+    def uses_index(self):
+        """ True if there are criteria that can be checked with the index of the file """
+        return any(value is not None for value in self._header_criteria())
+
+    def from_index(self, filename):
+        """Apply the criteria that don't need the positions of the points to the index
+        of the file. Only the tracks in the returned rows need to be read, and only the
+        spatial criteria need to be checked when they are
+
+        Returns:
+            pandas.DataFrame: The selected rows of the index
+        """
+        rows = index.select(
+            index.read_index(filename), self.track_ids, self.start_time,
+            self.track_slice, months=self.months, min_points=self.min_points,
+        )
+        self.track_ids = self.start_time = self.track_slice = None
+        self.months = self.min_points = None
+        return rows
+
+    def set_ntracks(self, ntracks):
+        """ Set the number of tracks in the file (from the TRACK_NUM header) """
+        if self.track_slice is not None:
+            self._positions = range(ntracks)[self.track_slice]
+
+    def select(self, track_id, lines):
+        """Check whether a track is selected
+
+        Args:
+            track_id (int): From the TRACK_ID header
+            lines (list of str): Lines of the track's points
+
+        Returns:
+            bool:
+        """
+        position = self._count
+        self._count += 1
+
+        if self.track_slice is not None and position not in self._positions:
+            return False
+        if self.track_ids is not None and track_id not in self.track_ids:
+            return False
+        if self.min_points is not None and len(lines) < self.min_points:
+            return False
+
+        if self.start_time is not None or self.months is not None:
+            if not lines:
+                return False
+            date = lines[0].split(None, 1)[0]
+            if len(date) != 10:
+                raise ValueError("Tracks can only be selected by time if they have dates")
+            date = int(date)
+            first, last = self.start_time or (None, None)
+            if first is not None and date < first:
+                return False
+            if last is not None and date >= last:
+                return False
+            if self.months is not None and date // 10000 % 100 not in self.months:
+                return False
+
+        if self.bbox is not None or self.basin is not None:
+            # Only convert the longitudes and latitudes. Missing positions are ignored
+            lons, lats = mask_missing(
+                [line.split(None, 3)[1:3] for line in lines]
+            ).reshape(-1, 2).T
+            if self.bbox is not None and not _in_bbox(lons, lats, self.bbox).any():
+                return False
+            if self.basin is not None and not self._in_basin(lons, lats):
+                return False
+
+        return True
+
+    def _in_basin(self, lons, lats):
+        # storm_assess.geometry imports shapely which is slow to import, so it is only
+        # imported when selecting by basin
+        from storm_assess import geometry
+
+        return geometry._tracks_intersect(
+            geometry.basin_polygon(self.basin), geodesy.normalise_longitude(lons),
+            lats, np.array([0, len(lons)]),
+        )[0]
+
+
+def _in_bbox(lons, lats, bbox):
+    """ True for each point within (west, east, south, north). The box can cross the
+    dateline, e.g. (160, -160, 0, 30) """
+    west, east, south, north = bbox
+    width = east - west
+    if width < 360:
+        width %= 360
+    return ((lons - west) % 360 <= width) & (lats >= south) & (lats <= north)
+
+
+def _open(fh, selection):
+    """Open a TRACK file for reading as text, or use fh as it is if it is already open.
+
+    If tracks are selected from an uncompressed file by criteria other than bbox or basin,
+    the index of the file is used (see :mod:`storm_assess.index`) so that only the
+    header and the selected tracks are read
+    """
+    if not isinstance(fh, str):
+        return contextlib.nullcontext(fh)
+    elif fh.split(".")[-1] == "gz":
+        return gzip.open(fh, "rt")
+    elif selection.uses_index():
+        return index.TrackLines(fh, selection.from_index(fh))
+    else:
+        return open(fh, "r")
+
+
+def _load_in_parallel(loader, filename, selection, jobs, executor, kwargs):
+    """Load the selected tracks of a file by parsing byte ranges of the file, aligned
+    with the TRACK_ID lines, in parallel
+
+    Args:
+        loader (callable): The loader used for each range
+        filename (str): An uncompressed TRACK file
+        selection (_Selection): The tracks to load
+        jobs (int): Number of workers, or None for the number of CPUs
+        executor (str): "process" or "thread". See
+            :func:`storm_assess.parallel.imap_storms`
+        kwargs (dict): Passed to the loader for each range
+
+    Returns:
+        iterator: The loaded tracks, in the order of the file
+    """
+    if not isinstance(filename, str):
+        raise ValueError("Only files given by their name can be loaded in parallel")
+
+    rows = selection.from_index(filename)
+    nchunks = max(int(rows.nbytes.sum()) // CHUNK_BYTES, 4 * (jobs or os.cpu_count() or 1))
+    kwargs = dict(kwargs, bbox=selection.bbox, basin=selection.basin)
+
+    return itertools.chain.from_iterable(parallel.imap_storms(
+        _load_byte_ranges, index.split(rows, nchunks), args=(filename, loader, kwargs),
+        executor=executor, max_workers=jobs, chunksize=1,
+    ))
+
+
+def _load_byte_ranges(rows, filename, loader, kwargs):
+    """ Load the tracks in rows of the index of a file (the task run by each worker of
+    :func:`_load_in_parallel`) """
+    with index.TrackLines(filename, rows) as lines:
+        return list(loader(lines, **kwargs))
+
+
+def mask_missing(values, missing_values=MISSING_VALUES):
+    """Returns values as a new float array with the missing values replaced by NaN
+
+    Args:
+        values (array_like): Numbers or their text
+        missing_values (tuple, optional): Default is :data:`MISSING_VALUES`. None to
+            only convert the values to floats
+
+    Returns:
+        numpy.ndarray:
+    """
+    values = np.array(values, dtype=float)
+    if missing_values:
+        values[np.isin(values, missing_values)] = np.nan
+    return values
+
+
+def _text(value):
+    """ Returns the text of a value in a TRACK file, with NaN written as
+    :data:`WRITE_MISSING_VALUE` """
+    if isinstance(value, (float, np.floating)) and np.isnan(value):
+        value = WRITE_MISSING_VALUE
+    return str(value)
+
+
+def _columns(rows, ncolumns):
+    """ Convert a list of tuples of text to a float array for each column """
+    return np.array(rows, dtype=float).reshape(-1, ncolumns).T
+
+
+def _mslp_vmax(mslp, vmax, missing_values):
+    """Returns the pressure (hPa, rounded to 0.1 hPa) and wind speed of each
+    observation, with missing values replaced by NaN, from the values in the file
+
+    The pressure is converted from Pa if it is larger than 10^4 and the two are swapped
+    where they are mixed up
+    """
+    mslp = mask_missing(mslp, missing_values)
+    vmax = mask_missing(vmax, missing_values)
+    mslp = np.where(mslp > 1.0e4, mslp / 100, mslp).round(1)
+    mixed_up = (mslp < 500) & (vmax > 500)
+    return np.where(mixed_up, vmax, mslp), np.where(mixed_up, mslp, vmax)
+
+
+def _hours(dates, calendar):
+    """ The dates of a track's points (YYYYMMDDHH text) as hours since the epoch (see
+    :mod:`storm_assess.timing`), or None if the times are timesteps rather than dates """
+    if any(len(date) != 10 for date in dates):
+        return None
+    return timing.date_number_hours(dates, calendar)
+
+
+def _variables(variables, names):
+    """Returns the set of optional variables to load
+
+    Args:
+        variables (list of str): The requested variables, or None to load all of them
+        names (list of str): The variables that can be loaded from the file
+
+    Returns:
+        set:
+    """
+    if variables is None:
+        return set(names)
+    unknown = set(variables).difference(names)
+    if unknown:
+        raise ValueError(
+            f"Unknown variables {sorted(unknown)}. The variables are {list(names)}"
+        )
+    return set(variables)
+
+
+def _maxsplit(columns):
+    """ The maxsplit for splitting each line at the "&"s so that only the columns needed
+    are separated (indices from the end need the whole line to be split) """
+    if any(column < 0 for column in columns):
+        return -1
+    return max(columns, default=0) + 1
+
+
+def _not_loaded(npoints):
+    """ A read-only array of NaN for observation fields that are not loaded, which
+    doesn't allocate memory for the values """
+    return np.broadcast_to(np.nan, npoints)
+
+
 def load_netcdf(filename):
     """Load track data from netCDF file into a list of xarray datasets
 
@@ -146,7 +424,10 @@ def save_netcdf(tracks, filename):
     new_tracks.to_netcdf(filename)
 
 
-def load_no_assumptions(filename, calendar=None, variable_names=None, output_type="xarray"):
+def load_no_assumptions(filename, calendar=None, variable_names=None, output_type="xarray",
+                        track_ids=None, start_time=None, track_slice=None, months=None,
+                        bbox=None, basin=None, min_points=None, variables=None,
+                        missing_values=MISSING_VALUES, jobs=1, executor="process"):
     """Load track data as xarray Datasets with generic names for added variables
 
     Args:
@@ -158,18 +439,33 @@ def load_no_assumptions(filename, calendar=None, variable_names=None, output_typ
         output_type (str, optional): The Object used to represent the storms in the
             returned list. Either "storm" for :class:`storm_assess.Storm` or xarray for
             :class:`xarray.Dataset`. Default is "xarray"
+        track_ids, start_time, track_slice, months, bbox, basin, min_points (optional):
+            Only load the selected tracks. See :func:`load`
+        variables (list of str, optional): Only load these variables, e.g.
+            ["vorticity", "mslp"]. They can be given by their generic names or the names
+            from variable_names. The time, longitude and latitude are always loaded. The
+            other columns of the file are not converted, and the columns after the last
+            requested variable are not split. Default is to load all variables
+        missing_values (tuple, optional): Values in the file that are replaced by NaN.
+            Default is :data:`MISSING_VALUES`. None keeps the values from the file
+        jobs (int, optional): Number of workers to parse the file with. See :func:`load`.
+            Default is 1 (no parallelism)
+        executor (str, optional): "process" or "thread". Default is "process"
 
     Returns:
         list:
     """
     output = list()
-
-    if filename.split(".")[-1] == "gz":
-        open_func = gzip.open
-    else:
-        open_func = open
-
-    with open_func(filename, "rt") as f:
+    selection = _Selection(track_ids, start_time, track_slice, months, bbox, basin, min_points)
+    if jobs != 1:
+        return list(_load_in_parallel(
+            load_no_assumptions, filename, selection, jobs, executor,
+            dict(calendar=calendar, variable_names=variable_names,
+                 output_type=output_type, variables=variables,
+                 missing_values=missing_values),
+        ))
+
+    with _open(filename, selection) as f:
         # The first lines can contain extra information bounded by two extra lines
         # Just skip to the main header line for now
         line = ""
@@ -185,6 +481,9 @@ def load_no_assumptions(filename, calendar=None, variable_names=None, output_typ
             header["var_has_coords"] = ""
 
         ntracks = header["ntracks"]
+        selection.set_ntracks(ntracks)
+        if isinstance(f, index.TrackLines):
+            ntracks = f.ntracks
         nfields = header["nfields"]
         nvars = header["nvars"]
         has_coords = [int(x) == 1 for x in header["var_has_coords"]]
@@ -202,6 +501,19 @@ def load_no_assumptions(filename, calendar=None, variable_names=None, output_typ
                 var_labels.append(f"feature_{n}_latitude")
             var_labels.append(f"feature_{n}")
 
+        # The variables to load, as generic names, and the column of each one in the
+        # lines split at the "&"s (the first column has the time, position and vorticity)
+        names = {label: label for label in var_labels[2:]}
+        if variable_names is not None:
+            names.update({
+                _new_name(label, variable_names): label for label in var_labels[3:]
+            })
+        loaded = {names[name] for name in _variables(variables, list(names))}
+        columns = {
+            label: n for n, label in enumerate(var_labels[3:], start=1) if label in loaded
+        }
+        maxsplit = _maxsplit(columns.values())
+
         # Read in each track as an xarray dataset with time as the coordinate
         for n in range(ntracks):
             # Read individual track header (two lines)
@@ -217,24 +529,36 @@ def load_no_assumptions(filename, calendar=None, variable_names=None, output_typ
             line = f.readline().strip()
             npoints = _parse(track_info_fmt, line)["npoints"]
 
-            # Generate arrays for time coordinate and variables
-            # Time is a list because it will hold datetime or cftime objects
-            # Other variables are a dictionary mapping variable name to a tuple of
-            # (time, data_array) as this is what is passed to xarray.Dataset
-            times = [None] * npoints
-            track_data = {label: ("time", np.zeros(npoints)) for label in var_labels}
+            # Read the lines of the track's points and skip it if it is not selected
+            lines = [f.readline() for m in range(npoints)]
+            if not selection.select(track_info["track_id"], lines):
+                continue
 
-            # Populate time and data line by line
-            for m in range(npoints):
-                line = f.readline().strip().split("&")
-                time, lon, lat, vorticity = line[0].split()
-                times[m] = parse_date(time, calendar=calendar)
-                track_data["longitude"][1][m] = float(lon)
-                track_data["latitude"][1][m] = float(lat)
-                track_data["vorticity"][1][m] = float(vorticity)
+            # Split the lines and convert each column that is loaded to an array
+            # The other variables are a dictionary mapping variable name to a tuple of
+            # (time, data_array) as this is what is passed to xarray.Dataset
+            split_lines = [line.strip().split("&", maxsplit) for line in lines]
+            centres = [split_line[0].split() for split_line in split_lines]
 
-                for i, label in enumerate(var_labels[3:]):
-                    track_data[label][1][m] = float(line[i+1])
+            # Time is a list because it will hold datetime or cftime objects
+            times = [parse_date(centre[0], calendar=calendar) for centre in centres]
+            hours = _hours([centre[0] for centre in centres], calendar)
+            track_data = dict(
+                longitude=("time", geodesy.normalise_longitude(
+                    mask_missing([centre[1] for centre in centres], missing_values)
+                )),
+                latitude=(
+                    "time", mask_missing([centre[2] for centre in centres], missing_values)
+                ),
+            )
+            if "vorticity" in loaded:
+                track_data["vorticity"] = (
+                    "time", mask_missing([centre[3] for centre in centres], missing_values)
+                )
+            for label, column in columns.items():
+                track_data[label] = ("time", mask_missing(
+                    [split_line[column] for split_line in split_lines], missing_values
+                ))
 
             if output_type == "xarray":
                 # Return a dataset for the individual track
@@ -248,24 +572,22 @@ def load_no_assumptions(filename, calendar=None, variable_names=None, output_typ
                 # mslp as NaN.
                 # TODO - Implement renamed_tracks for Storm objects so that vmax and
                 # mslp can be properly added to the data
-                output.append(storm_assess.Storm(
+                output.append(storm_assess.Storm.from_arrays(
                     snbr=track_info["track_id"],
-                    obs=[
-                        storm_assess.Observation(
-                            date=times[i],
-                            lat=track_data["latitude"][1][i],
-                            lon=track_data["longitude"][1][i],
-                            vort=track_data["vorticity"][1][i],
-                            vmax=np.nan,
-                            mslp=np.nan,
-                            extras={
-                                key: track_data[key][1][i] for key in track_data.keys()
-                                if key not in ["latitude", "longitude", "vorticity"]
-                            },
-                        )
-                        for i in range(npoints)
-                    ]
-
+                    fields=dict(
+                        date=times,
+                        lat=track_data["latitude"][1],
+                        lon=track_data["longitude"][1],
+                        vort=track_data["vorticity"][1] if "vorticity" in loaded
+                        else _not_loaded(npoints),
+                        vmax=np.full(npoints, np.nan),
+                        mslp=np.full(npoints, np.nan),
+                    ),
+                    obs_extras={
+                        key: track_data[key][1] for key in track_data.keys()
+                        if key not in ["latitude", "longitude", "vorticity"]
+                    },
+                    hours=hours,
                 ))
 
     if variable_names is not None:
@@ -295,25 +617,33 @@ def rename_tracks(tracks, new_names):
     # data
     # With load_no_assumptions the extra variables are listed as feature_n and if they
     # have a lat/lon association, also feature_n_latitude and feature_n_longitude
+    if not tracks:
+        return []
     to_rename = [var for var in list(tracks[0]) if "feature" in var]
 
     # Map the variables that need renaming to the new names
-    mapping = dict()
-    for var in to_rename:
-        # Split into [variable, n, "longitude"/"latitude"]
-        elements = var.split("_")
-        new_name = new_names[int(elements[1])]
-        # If longitude/latitude is in the name, include it in the new name
-        if len(elements) > 2:
-            new_name += "_" + "_".join(elements[2:])
-
-        mapping[var] = new_name
+    mapping = {var: _new_name(var, new_names) for var in to_rename}
 
     # Rename all the tracks
     return [tr.rename(mapping) for tr in tracks]
 
 
-def load(fh, ex_cols=0, calendar=None):
+def _new_name(var, new_names):
+    """ Returns the name of a feature_n variable (or its coordinates) given the names of
+    the added variables """
+    # Split into [variable, n, "longitude"/"latitude"]
+    elements = var.split("_")
+    new_name = new_names[int(elements[1])]
+    # If longitude/latitude is in the name, include it in the new name
+    if len(elements) > 2:
+        new_name += "_" + "_".join(elements[2:])
+
+    return new_name
+
+
+def load(fh, ex_cols=0, calendar=None, track_ids=None, start_time=None,
+         track_slice=None, months=None, bbox=None, basin=None, min_points=None,
+         variables=None, missing_values=MISSING_VALUES, jobs=1, executor="process"):
     """
     Reads model tropical storm tracking output from Reading Universities TRACK
     algorithm. Note: lat, lon, vorticity, maximum wind speed and minimum central
@@ -337,15 +667,53 @@ def load(fh, ex_cols=0, calendar=None):
     This funciton assumes that added fields are, in order, the full-field vorticity (7 levels),
     MSLP, 925hPa wind speed, and 10m wind speed.
 
+    To load only some of the tracks, set any of the following. Tracks that are not
+    selected are skipped without converting their values
+        * track_ids: IDs of the tracks to load
+        * start_time: The range (first, last) of start times of the tracks to load,
+          with first <= start time < last. Either can be None
+        * track_slice: A slice of the positions of the tracks in the file
+        * months: Months of the start time of the tracks to load
+        * bbox: (west, east, south, north). Only load tracks with at least one point
+          inside the box
+        * basin: Only load tracks that pass through the basin (see
+          :func:`storm_assess.geometry.storms_in_basin`)
+        * min_points: The minimum number of points of the tracks to load
+    When fh is the name of an uncompressed file, the criteria other than bbox and basin
+    are checked using the index of the file (see :mod:`storm_assess.index`), so the
+    other tracks are not read at all.
+
+    To load only some of the variables, set variables to a list of the observation
+    fields (vort, vmax, mslp) and extras (vmax_kts, and v10m, v10m_lat and v10m_lon if
+    there is a 10m wind speed) to load. The date, lat and lon are always loaded. The
+    columns of the other variables are not converted, and the lines are only split as
+    far as the last column needed. Observation fields that are not loaded are NaN (as
+    read-only arrays) and extras that are not loaded are left out.
+
+    Missing values in the file (:data:`MISSING_VALUES`, or the values given by
+    missing_values) are replaced by NaN for every variable, so the metrics of the storms
+    ignore them. Set missing_values=None to keep the values from the file. The
+    pressure is converted from Pa to hPa after the missing values are removed.
+
+    To parse a large file in parallel, set jobs to the number of workers (None for the
+    number of CPUs). The file is split into byte ranges starting at TRACK_ID lines,
+    using its index, and each range is parsed by a worker process (or thread if
+    executor="thread", which only helps if the GIL is released). The storms are still
+    returned in the order of the file. This needs fh to be the name of an uncompressed
+    file.
 
     """
-    # allow users to pass a filename instead of a file handle.
-    if isinstance(fh, str):
-        with open(fh, 'r') as fh:
-            for data in load(fh, ex_cols=ex_cols, calendar=calendar):
-                yield data
+    selection = _Selection(track_ids, start_time, track_slice, months, bbox, basin, min_points)
+    if jobs != 1:
+        yield from _load_in_parallel(
+            load, fh, selection, jobs, executor,
+            dict(ex_cols=ex_cols, calendar=calendar, variables=variables,
+                 missing_values=missing_values),
+        )
+        return
 
-    else:
+    # allow users to pass a filename instead of a file handle.
+    with _open(fh, selection) as fh:
         # for each line in the file handle
         for line in fh:
             if line.startswith('TRACK_NUM'):
@@ -360,6 +728,7 @@ def load(fh, ex_cols=0, calendar=None):
                     ex_cols = 6
                 else:
                     print('using ex_cols value ', ex_cols)
+                selection.set_ntracks(int(header_line[1]))
 
                 # if no 10m wind, then only 2 extra fields
                 if ex_cols == 3:
@@ -369,6 +738,21 @@ def load(fh, ex_cols=0, calendar=None):
                 else:
                     nlevels_t63 = number_fields - 2
 
+                names = ['vort', 'vmax', 'mslp', 'vmax_kts']
+                if ex_cols > 6:
+                    names += ['v10m', 'v10m_lat', 'v10m_lon']
+                loaded = _variables(variables, names)
+
+                # vmax and mslp are both read if either is needed to check for a mix-up
+                intensity = not loaded.isdisjoint(['vmax', 'mslp', 'vmax_kts'])
+                v10m = not loaded.isdisjoint(['v10m', 'v10m_lat', 'v10m_lon'])
+                columns = []
+                if intensity:
+                    columns += [1 + (3 * nlevels_t63) + 2, 1 + (3 * nlevels_t63) + 3 + 2]
+                if v10m:
+                    columns += [-2]
+                maxsplit = _maxsplit(columns)
+
             if line.startswith('TRACK_ID'):
                 # This is a new storm. Store the storm number.
                 try:
@@ -385,77 +769,91 @@ def load(fh, ex_cols=0, calendar=None):
                 else:
                     raise ValueError('Unexpected line in TRACK output file.')
 
-                # Create a new observations list
-                storm_obs = []
+                # Read the lines of the storm's observations and skip the storm if
+                # it is not selected
+                lines = [obs_line for _, obs_line in zip(range(n_records), fh)]
+                if not selection.select(snbr, lines):
+                    continue
+
+                # Collect the text of each value that is loaded, then convert each
+                # column to an array once all the lines have been read
+                dates, positions, vorts, intensities = [], [], [], []
+                obs_extras = {
+                    name: [] for name in ['v10m_lon', 'v10m_lat', 'v10m'] if name in loaded
+                }
 
                 """ Read in the storm's observations """
                 # For each observation record
-                for _, obs_line in zip(list(range(n_records)), fh):
+                for obs_line in lines:
 
                     # Get each observation element
-                    split_line = obs_line.strip().split('&')
+                    split_line = obs_line.strip().split('&', maxsplit)
                     storm_centre_record = split_line[0].split(' ')
 
                     # Get observation date and T42 lat lon location in case higher
                     # resolution data are not available
-                    date, tmp_lon, tmp_lat, vort = split_line[0].split()
-                    date = parse_date(date, calendar)
+                    date, tmp_lon, tmp_lat, _ = split_line[0].split()
+                    dates.append(date)
 
                     # Get storm location of maximum vorticity (full resolution field)
-                    lat = float(storm_centre_record[2])
-                    lon = float(storm_centre_record[1])
-
-                    # Get full resolution mslp (hPa)
-                    mslp = float(split_line[1+(3*nlevels_t63)+2])
-                    if mslp > 1.0e4:
-                        mslp /= 100
-                    mslp = float(round(mslp, 1))
-
-                    # Get full resolution 925hPa maximum wind speed (m/s)
-                    vmax = float(split_line[1+(3*nlevels_t63)+3+2])
-
-                    # Check for mslp-vmax mix-up
-                    if mslp < 500 and vmax > 500:
-                        mslp, vmax = vmax, mslp
-
-                    # Also store vmax in knots (1 m/s = 1.944 kts) to match observations
-                    vmax_kts = vmax * 1.944
+                    positions.append(
+                        (storm_centre_record[1], storm_centre_record[2], tmp_lon, tmp_lat)
+                    )
 
                     # Get full resolution 850 hPa maximum vorticity (s-1)
-                    vort = float(storm_centre_record[3])
+                    if 'vort' in loaded:
+                        vorts.append(storm_centre_record[3])
+
+                    # Get full resolution mslp and 925hPa maximum wind speed (m/s)
+                    if intensity:
+                        intensities.append((
+                            split_line[1+(3*nlevels_t63)+2],
+                            split_line[1+(3*nlevels_t63)+3+2],
+                        ))
 
                     # Get 10m wind speed
-                    if ex_cols > 6:
-                        v10m = float(split_line[::-1][1])
-                        v10m_lat = float(split_line[::-1][2])
-                        v10m_lon = float(split_line[::-1][3])
-
-                    # If higher resolution lat/lon data is not available then use lat
-                    # lon from T42 resolution data
-                    if lat == 1e12 or lon == 1e12 or lat == 1.0e25 or lon == 1.0e25:
-                        lat = float(tmp_lat)
-                        lon = float(tmp_lon)
-
-                    # Store observations
-                    if ex_cols > 6:
-                        storm_obs.append(storm_assess.Observation(
-                            date, lat, lon, vort, vmax, mslp, extras={
-                                'vmax_kts': vmax_kts, 'v10m_lon': v10m_lon,
-                                'v10m_lat': v10m_lat, 'v10m': v10m
-                            }
-                        ))
-                    else:
-                        storm_obs.append(storm_assess.Observation(
-                            date, lat, lon, vort, vmax, mslp, extras={
-                                'vmax_kts': vmax_kts
-                            }
-                        ))
+                    for name, column in (('v10m', 1), ('v10m_lat', 2), ('v10m_lon', 3)):
+                        if name in obs_extras:
+                            obs_extras[name].append(split_line[::-1][column])
+
+                # If higher resolution lat/lon data is not available then use lat
+                # lon from T42 resolution data
+                lon, lat, tmp_lon, tmp_lat = _columns(positions, 4)
+                unavailable = np.isin(lat, _UNAVAILABLE) | np.isin(lon, _UNAVAILABLE)
+                hours = _hours(dates, calendar)
+                storm_obs = dict(
+                    date=[parse_date(date, calendar) for date in dates],
+                    lat=mask_missing(np.where(unavailable, tmp_lat, lat), missing_values),
+                    lon=mask_missing(np.where(unavailable, tmp_lon, lon), missing_values),
+                )
+                if 'vort' in loaded:
+                    storm_obs['vort'] = mask_missing(vorts, missing_values)
+
+                extras = {}
+                if intensity:
+                    mslp, vmax = _mslp_vmax(*_columns(intensities, 2), missing_values)
+                    if 'mslp' in loaded:
+                        storm_obs['mslp'] = mslp
+                    if 'vmax' in loaded:
+                        storm_obs['vmax'] = vmax
+                    # Also store vmax in knots (1 m/s = 1.944 kts) to match observations
+                    if 'vmax_kts' in loaded:
+                        extras['vmax_kts'] = vmax * 1.944
+                for name, values in obs_extras.items():
+                    extras[name] = mask_missing(values, missing_values)
 
                 # Yield storm
-                yield storm_assess.Storm(snbr, storm_obs, extras={})
+                for name in storm_assess.OBSERVATION_FIELDS:
+                    storm_obs.setdefault(name, _not_loaded(n_records))
+                storm_obs['lon'] = geodesy.normalise_longitude(storm_obs['lon'])
+                yield storm_assess.Storm.from_arrays(
+                    snbr, storm_obs, extras, extras={}, hours=hours
+                )
 
 
-def load_hart(fh, ex_cols=0, calendar=None):
+def load_hart(fh, ex_cols=0, calendar=None, track_ids=None, start_time=None,
+              track_slice=None, months=None, bbox=None, basin=None, min_points=None,
+              variables=None, missing_values=MISSING_VALUES):
     """
     Load function to read in University of Reading TRACK algorithm output.
 
@@ -490,21 +888,36 @@ def load_hart(fh, ex_cols=0, calendar=None):
 
     Note: if using model data which uses a 12 months x 30 day calendar,
     set calendar to 'netcdftime'. Default is 'gregorian' calendar.
+
+    To load only some of the tracks, set track_ids, start_time, track_slice, months,
+    bbox, basin and/or min_points. To load only some of the variables, set variables to
+    a list of the observation fields (vort, vmax, mslp) and extras (vmax_kts, v10m,
+    v10m_lat, v10m_lon, TL, TU, B) to load. Missing values are replaced by NaN unless
+    missing_values=None. See :func:`load`.
     """
 
-    # allow users to pass a filename instead of a file handle.
-    if isinstance(fh, str):
-        with open(fh, 'r') as fh:
-            for data in load(fh, ex_cols=ex_cols, calendar=calendar):
-                yield data
+    selection = _Selection(track_ids, start_time, track_slice, months, bbox, basin, min_points)
+    loaded = _variables(
+        variables,
+        ['vort', 'vmax', 'mslp', 'vmax_kts', 'v10m', 'v10m_lat', 'v10m_lon', 'TL', 'TU', 'B'],
+    )
 
-    else:
+    # vmax and mslp are both read if either is needed to check for a mix-up
+    intensity = not loaded.isdisjoint(['vmax', 'mslp', 'vmax_kts'])
+    columns = {'v10m': 10 * 3, 'v10m_lat': (10 * 3) - 1, 'v10m_lon': (10 * 3) - 2,
+               'TL': -4, 'TU': -3, 'B': -2}
+    columns = {name: column for name, column in columns.items() if name in loaded}
+    maxsplit = _maxsplit(list(columns.values()) + ([9 * 3] if intensity else []))
+
+    # allow users to pass a filename instead of a file handle.
+    with _open(fh, selection) as fh:
         # for each line in the file handle
         for line in fh:
             if line.startswith('TRACK_NUM'):
                 split_line = line.split()
                 if split_line[2] != 'ADD_FLD':
                     raise ValueError('Unexpected line in TRACK output file.')
+                selection.set_ntracks(int(split_line[1]))
 
             # read storms
             if line.startswith('TRACK_ID'):
@@ -522,66 +935,79 @@ def load_hart(fh, ex_cols=0, calendar=None):
                 else:
                     raise ValueError('Unexpected line in TRACK output file.')
 
-                # create a new observations list
-                storm_obs = []
+                # Read the lines of the storm's observations and skip the storm if
+                # it is not selected
+                lines = [obs_line for _, obs_line in zip(range(n_records), fh)]
+                if not selection.select(snbr, lines):
+                    continue
+
+                # Collect the text of each value that is loaded, then convert each
+                # column to an array once all the lines have been read
+                dates, positions, vorts, intensities = [], [], [], []
+                obs_extras = {name: [] for name in columns}
 
                 """ Read in the storm's observations """
                 # For each observation record
-                for _, obs_line in zip(list(range(n_records)), fh):
+                for obs_line in lines:
 
                     # get each observation element
-                    split_line = obs_line.strip().split('&')
+                    split_line = obs_line.strip().split('&', maxsplit)
 
                     # get observation date, T63 lat & lon, and vort
                     # (in case higher resolution data are not available)
                     date, lon, lat, vort = split_line[0].split()
-                    date = parse_date(date, calendar)
-
-                    # get full resolution 850 hPa maximum vorticity (s-1)
-                    vort = float(vort)
+                    dates.append(date)
 
                     # get storm location of maximum vorticity (full resolution field)
-                    lat = float(lat)
-                    lon = float(lon)
-
-                    # get full resolution mslp
-                    mslp = float(split_line[8 * 3])
-                    if mslp > 1.0e4:
-                        mslp /= 100
-                    mslp = float(round(mslp, 1))
-
-                    # get full resolution 925 hPa maximum wind speed (m/s)
-                    vmax = float(split_line[9 * 3])
-
-                    # check for mslp-vmax mix-up
-                    if mslp < 500. and vmax > 500.:
-                        mslp, vmax = vmax, mslp
+                    positions.append((lon, lat))
 
+                    # get full resolution 850 hPa maximum vorticity (s-1)
+                    if 'vort' in loaded:
+                        vorts.append(vort)
+
+                    # get full resolution mslp and 925 hPa maximum wind speed (m/s)
+                    if intensity:
+                        intensities.append((split_line[8 * 3], split_line[9 * 3]))
+
+                    # get 10m wind speed and Hart parameters
+                    for name, column in columns.items():
+                        obs_extras[name].append(split_line[column])
+
+                lon, lat = _columns(positions, 2)
+                hours = _hours(dates, calendar)
+                storm_obs = dict(
+                    date=[parse_date(date, calendar) for date in dates],
+                    lat=mask_missing(lat, missing_values),
+                    lon=mask_missing(lon, missing_values),
+                )
+                if 'vort' in loaded:
+                    storm_obs['vort'] = mask_missing(vorts, missing_values)
+
+                extras = {}
+                if intensity:
+                    mslp, vmax = _mslp_vmax(*_columns(intensities, 2), missing_values)
+                    if 'mslp' in loaded:
+                        storm_obs['mslp'] = mslp
+                    if 'vmax' in loaded:
+                        storm_obs['vmax'] = vmax
                     # store vmax in knots (1 m/s = 1.944 kts) to match observations
-                    vmax_kts = vmax * 1.944
-
-                    # get 10m wind speed
-                    v10m = float(split_line[10 * 3])
-                    v10m_lat = float(split_line[(10 * 3) - 1])
-                    v10m_lon = float(split_line[(10 * 3) - 2])
-
-                    # Hart parameters
-                    TL = float(split_line[::-1][3])
-                    TU = float(split_line[::-1][2])
-                    B = float(split_line[::-1][1])
-
-                    # store observations
-                    storm_obs.append(storm_assess.Observation(
-                        date, lat, lon, vort, vmax, mslp, extras={
-                            'vmax_kts': vmax_kts, 'v10m': v10m, 'v10m_lat': v10m_lat,
-                            'v10m_lon': v10m_lon, 'TL': TL, 'TU': TU, 'B': B
-                        }))
+                    if 'vmax_kts' in loaded:
+                        extras['vmax_kts'] = vmax * 1.944
+                for name, values in obs_extras.items():
+                    extras[name] = mask_missing(values, missing_values)
 
                 # Yield storm
-                yield storm_assess.Storm(snbr, storm_obs, extras={})
+                for name in storm_assess.OBSERVATION_FIELDS:
+                    storm_obs.setdefault(name, _not_loaded(n_records))
+                storm_obs['lon'] = geodesy.normalise_longitude(storm_obs['lon'])
+                yield storm_assess.Storm.from_arrays(
+                    snbr, storm_obs, extras, extras={}, hours=hours
+                )
 
 
-def load_hurdat2(fh, ex_cols=0, calendar=None):
+def load_hurdat2(fh, ex_cols=0, calendar=None, track_ids=None, start_time=None,
+                 track_slice=None, months=None, bbox=None, basin=None, min_points=None,
+                 variables=None, missing_values=MISSING_VALUES):
     """
     ADAPTED TO READ REFORMATTED HURDAT2 TRACKS.
 
@@ -597,20 +1023,25 @@ def load_hurdat2(fh, ex_cols=0, calendar=None):
     currently stored. If you want these values you need to read in
     the data file and include the variables in the 'extras' dictionary.
 
-    """
-    # allow users to pass a filename instead of a file handle.
-    if isinstance(fh, str):
-        with open(fh, 'r') as fh:
-            for data in load(fh, ex_cols=ex_cols, calendar=calendar):
-                yield data
+    To load only some of the tracks, set track_ids, start_time, track_slice, months,
+    bbox, basin and/or min_points. To load only some of the variables, set variables to
+    a list of the observation fields (vort, vmax, mslp) and extras (vmax_kts, v10m) to
+    load. Missing values are replaced by NaN unless missing_values=None. See
+    :func:`load`.
 
-    else:
+    """
+    selection = _Selection(track_ids, start_time, track_slice, months, bbox, basin, min_points)
+    loaded = _variables(variables, ['vort', 'vmax', 'mslp', 'vmax_kts', 'v10m'])
+    # vmax and mslp are both read if either is needed to check for a mix-up
+    intensity = not loaded.isdisjoint(['vmax', 'mslp', 'vmax_kts'])
+    with _open(fh, selection) as fh:
         # for each line in the file handle
         for line in fh:
             if line.startswith('TRACK_NUM'):
                 split_line = line.split()
                 if split_line[2] != 'ADD_FLD':
                     raise ValueError('Unexpected line in TRACK output file.')
+                selection.set_ntracks(int(split_line[1]))
 
             if line.startswith('TRACK_ID'):
                 # This is a new storm. Store the storm number.
@@ -628,12 +1059,19 @@ def load_hurdat2(fh, ex_cols=0, calendar=None):
                 else:
                     raise ValueError('Unexpected line in TRACK output file.')
 
-                # Create a new observations list
-                storm_obs = []
+                # Read the lines of the storm's observations and skip the storm if
+                # it is not selected
+                lines = [obs_line for _, obs_line in zip(range(n_records), fh)]
+                if not selection.select(snbr, lines):
+                    continue
+
+                # Collect the text of each value that is loaded, then convert each
+                # column to an array once all the lines have been read
+                dates, positions, intensities, v10m = [], [], [], []
 
                 """ Read in the storm's observations """
                 # For each observation record
-                for _, obs_line in zip(list(range(n_records)), fh):
+                for obs_line in lines:
 
                     # Get each observation element
                     split_line = obs_line.strip().split('&')
@@ -641,53 +1079,78 @@ def load_hurdat2(fh, ex_cols=0, calendar=None):
                     # Get observation date and T42 lat lon location in case higher
                     # resolution data are not available
                     date, tmp_lon, tmp_lat, _ = split_line[0].split()
+                    dates.append(date)
 
-                    date = parse_date(date, calendar)
-
-                    # Get full resolution mslp
-                    mslp = split_line[::-1][4 + ex_cols]
-                    mslp = float(mslp)
-                    if mslp > 1.0e4:
-                        mslp /= 100
-                    mslp = float(round(mslp, 1))
-
-                    # Get full resolution 925hPa maximum wind speed (m/s)
-                    vmax = float(split_line[::-1][7 + ex_cols])
-
-                    # Also store vmax in knots (1 m/s = 1.944 kts) to match observations
-                    vmax_kts = vmax * 1.944
-
-                    # Get full resolution 850 hPa maximum vorticity (s-1)
-                    vort = 0.
+                    # Get full resolution mslp and 925hPa maximum wind speed (m/s)
+                    if intensity:
+                        intensities.append(
+                            (split_line[::-1][4 + ex_cols], split_line[::-1][7 + ex_cols])
+                        )
 
                     # Get storm location of maximum vorticity (full resolution field)
                     storm_centre_record = split_line[0].split(' ')
-                    lat = float(storm_centre_record[2])
-                    lon = float(storm_centre_record[1])
+                    positions.append((storm_centre_record[1], storm_centre_record[2]))
 
                     # Get 10m wind speed
-                    v10m = float(split_line[::-1][7 + ex_cols])
+                    if 'v10m' in loaded:
+                        v10m.append(split_line[::-1][7 + ex_cols])
+
+                lon, lat = _columns(positions, 2)
+                hours = _hours(dates, calendar)
+                storm_obs = dict(
+                    date=[parse_date(date, calendar) for date in dates],
+                    lat=mask_missing(lat, missing_values),
+                    lon=mask_missing(lon, missing_values),
+                )
 
-                    # Store observations
-                    storm_obs.append(storm_assess.Observation(
-                        date, lat, lon, vort, vmax, mslp, extras={
-                            'vmax_kts': vmax_kts, 'v10m': v10m
-                        }
-                    ))
+                # Full resolution 850 hPa maximum vorticity is not available
+                if 'vort' in loaded:
+                    storm_obs['vort'] = np.zeros(n_records)
+
+                extras = {}
+                if intensity:
+                    mslp, vmax = _mslp_vmax(*_columns(intensities, 2), missing_values)
+                    if 'mslp' in loaded:
+                        storm_obs['mslp'] = mslp
+                    if 'vmax' in loaded:
+                        storm_obs['vmax'] = vmax
+                    # Also store vmax in knots (1 m/s = 1.944 kts) to match observations
+                    if 'vmax_kts' in loaded:
+                        extras['vmax_kts'] = vmax * 1.944
+                if 'v10m' in loaded:
+                    extras['v10m'] = mask_missing(v10m, missing_values)
 
                 # Yield storm
-                yield storm_assess.Storm(snbr, storm_obs, extras={})
+                for name in storm_assess.OBSERVATION_FIELDS:
+                    storm_obs.setdefault(name, _not_loaded(n_records))
+                storm_obs['lon'] = geodesy.normalise_longitude(storm_obs['lon'])
+                yield storm_assess.Storm.from_arrays(
+                    snbr, storm_obs, extras, extras={}, hours=hours
+                )
 
 
 def write(storms, file_name):
     """Write the storms to a text file using the TRACK layout
 
     Args:
-        storms (list of storm_assess.Storm): Storm objects as loaded in by :func:`load`
+        storms (iterable of storm_assess.Storm): Storm objects as loaded in by
+            :func:`load`. Can be a generator, in which case each storm is written as it
+            is produced and the number of tracks is filled in at the end. Missing
+            (NaN) values are written as :data:`WRITE_MISSING_VALUE`
         file_name (str):
     """
-    tr_count = len(storms)
-    extras = storms[-1].obs[0].extras.keys()
+    if isinstance(storms, (list, tuple)):
+        tr_count = str(len(storms))
+        extras = storms[-1].obs[0].extras.keys() if storms else []
+        storms = iter(storms)
+    else:
+        # Leave space to fill in the number of tracks once they have all been written
+        tr_count = " " * 12
+        storms = iter(storms)
+        first = next(storms, None)
+        extras = first.obs[0].extras.keys() if first is not None else []
+        if first is not None:
+            storms = itertools.chain([first], storms)
     number_fields = 2 + len(extras)
     with open(file_name, "w") as file_object:
         # Write the file header
@@ -696,8 +1159,10 @@ def write(storms, file_name):
         # so I'm adding in the names of variables
         file_object.write(f"ADDED_FIELDS: vmax MSLP {' '.join(extras)}\n")
         file_object.write("0 0\n")
+        header_position = file_object.tell()
         file_object.write(f"TRACK_NUM {tr_count} ADD_FLD {number_fields} {number_fields} &{'0' * number_fields}\n")
-        for i, storm in enumerate(storms):
+        count = 0
+        for count, storm in enumerate(storms, start=1):
             # Write the storm header
             date = storm.genesis_date().strftime("%Y%m%d%H")
             num = storm.nrecords()
@@ -706,12 +1171,48 @@ def write(storms, file_name):
             # Write each line of observations for the storm
             for ob in storm.obs:
                 date = ob.date.strftime("%Y%m%d%H")
-                line_to_write = f"{date} {ob.lon} {ob.lat} {ob.vort} & {ob.vmax} & {ob.mslp} & "
+                line_to_write = (
+                    f"{date} {_text(ob.lon)} {_text(ob.lat)} {_text(ob.vort)} & "
+                    f"{_text(ob.vmax)} & {_text(ob.mslp)} & "
+                )
                 if number_fields > 2:
-                    line_to_write += " &".join([str(ob.extras[key]) for key in extras])
+                    line_to_write += " &".join([_text(ob.extras[key]) for key in extras])
                     line_to_write += " & "
                 file_object.write(line_to_write + "\n")
 
+        if tr_count.isspace():
+            file_object.seek(header_position)
+            file_object.write(f"TRACK_NUM {count:<12d}")
+
+
+def to_xarray(storm):
+    """Convert a :class:`storm_assess.Storm` to an xarray Dataset in the same layout as
+    the tracks returned by :func:`load_no_assumptions`
+
+    Args:
+        storm (storm_assess.Storm):
+
+    Returns:
+        xarray.Dataset:
+            A dataset with time as the coordinate, the observation fields and extras as
+            variables and the storm number and any scalar storm extras as attributes
+    """
+    names = dict(lat="latitude", lon="longitude", vort="vorticity")
+    data_vars = {
+        names.get(name, name): ("time", storm.column(name))
+        for name in storm_assess.OBSERVATION_FIELDS[1:]
+    }
+    for name in storm.obs[0].extras if len(storm) else []:
+        data_vars[name] = ("time", storm.column(name))
+
+    attrs = dict(track_id=storm.snbr)
+    attrs.update({
+        key: value for key, value in storm.extras.items()
+        if np.isscalar(value) and not isinstance(value, (datetime.datetime, cftime.datetime))
+    })
+
+    return xarray.Dataset(data_vars, coords=dict(time=list(storm.column("date"))), attrs=attrs)
+
 
 def parse_date(date, calendar=None):
     if len(date) == 10:  # i.e., YYYYMMDDHH
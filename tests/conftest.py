@@ -1,5 +1,9 @@
+import datetime
+
+import numpy as np
 import pytest
 
+import storm_assess
 from storm_assess import SAMPLE_TRACK_DATA, track
 
 # Names of added variables in test data for loading with no assumptions
@@ -35,3 +39,29 @@ def storms_xarray_datetime64():
     # Loading with calendar="netcdftime" forces the time variable to remain as a cftime
     # object, but time is otherwise converted to the distinctly inferior datetime64
     return track.load_no_assumptions(SAMPLE_TRACK_DATA, variable_names=_variable_names)
+
+
+@pytest.fixture(scope="session")
+def example_storms():
+    # A small set of storms that does not depend on the sample data. Each storm moves
+    # north-west from a different longitude, intensifying and then decaying
+    rng = np.random.default_rng(0)
+    storms = []
+    for n in range(20):
+        npoints = 10 + n
+        vmax = 10 + 30 * np.sin(np.linspace(0, np.pi, npoints))
+        storms.append(storm_assess.Storm.from_arrays(
+            n + 1,
+            dict(
+                date=[datetime.datetime(2000 + n % 3, 5 + n % 6, 1) +
+                      datetime.timedelta(hours=6 * i) for i in range(npoints)],
+                lat=np.linspace(10, 40, npoints) + rng.normal(0, 0.1, npoints),
+                lon=(300 - 15 * n + np.linspace(0, -20, npoints)) % 360,
+                vort=vmax / 5,
+                vmax=vmax,
+                mslp=1010 - vmax,
+            ),
+            obs_extras=dict(vmax_kts=vmax * 1.944),
+            extras=dict(member=n % 4),
+        ))
+    return storms
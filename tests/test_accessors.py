@@ -0,0 +1,139 @@
+import numpy as np
+import pytest
+import xarray
+
+from storm_assess import synthetic, track
+from storm_assess.functions import xarray_functions
+
+_variable_names = ["vorticity_%d" % n for n in range(synthetic.NLEVELS)] + ["mslp", "vmax"]
+
+
+@pytest.fixture(scope="module")
+def synthetic_file(tmp_path_factory):
+    filename = str(tmp_path_factory.mktemp("accessors") / "tracks.txt")
+    synthetic.write_tracks(filename, ntracks=30, npoints=(3, 20), seed=0)
+    return filename
+
+
+@pytest.fixture(scope="module")
+def storms(synthetic_file):
+    return list(track.load(synthetic_file))
+
+
+@pytest.fixture(scope="module")
+def tracks(synthetic_file):
+    return track.load_no_assumptions(synthetic_file, variable_names=_variable_names)
+
+
+@pytest.fixture(scope="module")
+def ragged_file(tracks, tmp_path_factory):
+    filename = str(tmp_path_factory.mktemp("accessors") / "tracks.nc")
+    track.save_netcdf(tracks, filename)
+    return filename
+
+
+def test_storm_accessor(storms, tracks):
+    for storm, tr in zip(storms, tracks):
+        assert float(tr.storm.vmax()) == storm.column("vmax").max()
+        assert float(tr.storm.mslp_min()) / 100 == pytest.approx(
+            storm.column("mslp").min(), abs=0.05
+        )
+        assert round(float(tr.storm.ace()), 2) == storm.ace_index()
+        assert tr.storm.lifetime().values == np.timedelta64(
+            storm.obs[-1].date - storm.obs[0].date
+        )
+
+        assert float(tr.storm.genesis().latitude) == storm.obs_at_genesis().lat
+        assert float(tr.storm.lysis().longitude) == storm.obs_at_lysis().lon
+        peak = tr.storm.obs_at_vmax()
+        assert float(peak.latitude) == storm.obs_at_vmax().lat
+        assert float(peak.longitude) == storm.obs_at_vmax().lon
+        assert float(tr.storm.obs_at_min_mslp().latitude) == storm.obs_at_min_mslp().lat
+
+
+@pytest.mark.parametrize("chunks", [None, {"record": 50}])
+def test_storms_accessor(storms, tracks, ragged_file, chunks):
+    with xarray.open_dataset(ragged_file, chunks=chunks) as ds:
+        vmax = ds.storms.vmax()
+        assert vmax.dims == ("tracks",)
+        if chunks is not None:
+            # Reductions stay lazy for dask-backed data
+            assert not isinstance(vmax.data, np.ndarray)
+
+        np.testing.assert_array_equal(
+            vmax.values, [storm.column("vmax").max() for storm in storms]
+        )
+        np.testing.assert_allclose(
+            ds.storms.mslp_min().values,
+            [tr.storm.mslp_min() for tr in tracks],
+        )
+        np.testing.assert_allclose(
+            ds.storms.ace().values, [tr.storm.ace() for tr in tracks]
+        )
+        np.testing.assert_array_equal(
+            ds.storms.lifetime().values, [tr.storm.lifetime().values for tr in tracks]
+        )
+
+        for method in ["genesis", "lysis", "obs_at_vmax", "obs_at_min_mslp"]:
+            points = getattr(ds.storms, method)()
+            expected = [getattr(tr.storm, method)() for tr in tracks]
+            np.testing.assert_array_equal(
+                points.latitude.values, [float(p.latitude) for p in expected]
+            )
+            np.testing.assert_array_equal(
+                points.time.values, [p.time.values for p in expected]
+            )
+
+
+def test_storms_accessor_empty_track(tracks, tmp_path):
+    filename = str(tmp_path / "tracks.nc")
+    track.save_netcdf(tracks[:3], filename)
+    with xarray.open_dataset(filename) as ds:
+        ds = ds.load()
+    first = ds.FIRST_PT.values.copy()
+    ds["NUM_PTS"][1] = 0
+    ds["FIRST_PT"][2] = first[1]
+    ds = ds.isel(record=np.r_[0:first[1], first[2]:ds.sizes["record"]])
+
+    vmax = ds.storms.vmax()
+    assert float(vmax[0]) == float(tracks[0].storm.vmax())
+    assert np.isnan(vmax[1])
+    assert float(vmax[2]) == float(tracks[2].storm.vmax())
+    assert float(ds.storms.ace()[1]) == 0
+
+
+def test_accessors_missing_intensity(storms, tmp_path):
+    # Storm.obs_at_vmax uses the first point if all the values are missing
+    tracks = [track.to_xarray(storm).copy(deep=True) for storm in storms[:3]]
+    tracks[0]["vmax"][:] = np.nan
+    tracks[0]["mslp"][:] = np.nan
+    tracks[1]["vmax"][1] = np.nan
+    tracks[1]["mslp"][0] = np.nan
+
+    filename = str(tmp_path / "tracks.nc")
+    track.save_netcdf(tracks, filename)
+    with xarray.open_dataset(filename) as ds:
+        for method in ["obs_at_vmax", "obs_at_min_mslp"]:
+            points = getattr(ds.storms, method)()
+            single = [getattr(tr.storm, method)() for tr in tracks]
+            np.testing.assert_array_equal(
+                points.time.values, [point.time.values for point in single]
+            )
+
+    assert tracks[0].storm.obs_at_vmax().time == tracks[0].time[0]
+    assert tracks[0].storm.obs_at_min_mslp().time == tracks[0].time[0]
+    vmax = tracks[1].vmax.values
+    assert tracks[1].storm.obs_at_vmax().time == tracks[1].time[np.nanargmax(vmax)]
+
+
+def test_storm_lats_lons_max_intensity(tracks):
+    lats, lons, count = xarray_functions.storm_lats_lons(
+        tracks, [2000], list(range(1, 13)), None, max_intensity=True
+    )
+    expected = [
+        tr.storm.obs_at_vmax() for tr in tracks
+        if tr.time.dt.year[0] == 2000
+    ]
+    assert count == len(expected)
+    np.testing.assert_allclose(lats, [float(p.latitude) for p in expected])
+    np.testing.assert_allclose(lons, [float(p.longitude) for p in expected])
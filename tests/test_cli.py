@@ -0,0 +1,67 @@
+import csv
+
+import pytest
+import xarray
+
+from storm_assess import cli, track
+
+
+@pytest.fixture()
+def track_files(example_storms, tmp_path):
+    # Two "ensemble members" written in the TRACK layout
+    filenames = []
+    for n in range(2):
+        filename = str(tmp_path / f"member_{n}.txt")
+        track.write(example_storms[n::2], filename)
+        filenames.append(filename)
+    return filenames
+
+
+def test_convert(track_files, tmp_path):
+    output = str(tmp_path / "tracks.nc")
+    cli.main(["convert", *track_files, "-o", output, "--format", "no_assumptions"])
+
+    tracks = track.load_netcdf(output)
+    assert len(tracks) == 20
+    assert tracks[0].attrs["member"] == 0
+    assert tracks[-1].attrs["member"] == 1
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_filter(track_files, example_storms, tmp_path, jobs):
+    output = str(tmp_path / "filtered.txt")
+    cli.main([
+        "filter", *track_files, "-o", output, "--format", "no_assumptions",
+        "--years", "2000-2001", "--months", "5,6,7", "--members", "1", "-j", str(jobs),
+    ])
+
+    storms = track.load_no_assumptions(output, output_type="storm")
+    expected = [
+        storm for storm in example_storms[1::2]
+        if storm.genesis_date().year in [2000, 2001] and storm.genesis_date().month in [5, 6, 7]
+    ]
+    assert [storm.snbr for storm in storms] == [storm.snbr for storm in expected]
+
+
+def test_summary(track_files, tmp_path):
+    output = str(tmp_path / "summary.csv")
+    cli.main(["summary", *track_files, "-o", output, "--format", "no_assumptions", "-j", "2"])
+
+    with open(output) as f:
+        rows = list(csv.DictReader(f))
+    assert len(rows) == 20
+    assert rows[0]["file"] == track_files[0]
+    assert [int(row["snbr"]) for row in rows[:3]] == [1, 3, 5]
+    assert float(rows[0]["lifetime"]) == 54
+
+
+def test_density(track_files, example_storms, tmp_path):
+    output = str(tmp_path / "density.nc")
+    cli.main([
+        "density", *track_files, "-o", output, "--format", "no_assumptions",
+        "--points", "genesis", "--resolution", "10",
+    ])
+
+    result = xarray.open_dataarray(output)
+    assert result.shape == (18, 36)
+    assert result.sum() == 20
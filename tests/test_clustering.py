@@ -0,0 +1,129 @@
+import datetime
+
+import numpy as np
+import pytest
+
+import storm_assess
+from storm_assess import clustering, geodesy, track
+
+
+def _storm(snbr, lon, lat, npoints, step=6):
+    start = datetime.datetime(2000, 8, 1)
+    return storm_assess.Storm.from_arrays(snbr, dict(
+        date=[start + datetime.timedelta(hours=step * k) for k in range(npoints)],
+        lon=lon % 360, lat=lat, vort=np.zeros(npoints), vmax=np.zeros(npoints),
+        mslp=np.zeros(npoints),
+    ))
+
+
+@pytest.fixture(scope="module")
+def storms():
+    # Three groups of tracks with different directions and lengths, one of them
+    # crossing the dateline
+    rng = np.random.default_rng(0)
+    storms = []
+    for n in range(60):
+        group = n % 3
+        npoints = rng.integers(8, 30)
+        path = np.linspace(0, 1, npoints)
+        noise = rng.normal(0, 0.5, (2, npoints))
+        if group == 0:
+            lon, lat = 175 + 10 * path, 15 + 0 * path
+        elif group == 1:
+            lon, lat = 300 - 30 * path, 15 + 25 * path
+        else:
+            lon, lat = 120 + 0 * path, 10 + 30 * path
+        storms.append(_storm(n, lon + noise[0], lat + noise[1], npoints, step=3 + 3 * group))
+    return storms
+
+
+def _same_partition(labels, expected):
+    return all(len(set(labels[expected == group])) == 1 for group in set(expected)) and \
+        len(set(labels)) == len(set(expected))
+
+
+def test_features(storms):
+    lons, lats = clustering.features(storms, npoints=5)
+    assert lons.shape == lats.shape == (60, 5)
+    for storm, lon, lat in zip(storms, lons, lats):
+        assert lon[0] == storm.column("lon")[0] and lat[-1] == storm.column("lat")[-1]
+
+    tracks = [track.to_xarray(storm) for storm in storms]
+    np.testing.assert_array_equal(clustering.features(tracks, npoints=5)[0], lons)
+
+
+@pytest.mark.parametrize("metric", clustering.METRICS)
+def test_pairwise_distances(metric):
+    rng = np.random.default_rng(1)
+    lons, lats = rng.uniform(0, 360, (2, 25, 6))
+    lats = lats / 4 - 45
+
+    distances = clustering.pairwise_distances(lons, lats, metric=metric)
+    assert distances.shape == (25, 25)
+    np.testing.assert_allclose(distances, distances.T)
+    np.testing.assert_array_equal(np.diag(distances), 0)
+
+    for kwargs in [dict(block_size=1), dict(block_size=7, executor="process")]:
+        np.testing.assert_allclose(
+            clustering.pairwise_distances(lons, lats, metric=metric, **kwargs), distances
+        )
+
+    out = np.zeros((25, 25), dtype=np.float32)
+    result = clustering.pairwise_distances(
+        lons, lats, metric=metric, dtype=np.float32, out=out, block_size=4
+    )
+    assert result is out
+    np.testing.assert_allclose(out, distances, rtol=1e-4, atol=1e-2)
+
+
+def test_pairwise_distances_metrics():
+    # A track and the same track at half the speed, with the points doubled up
+    lons = np.array([[0., 1, 2, 3], [0, 0, 1, 1]])
+    lats = np.zeros((2, 4))
+    step = geodesy.distance(0, 0, 1, 0)
+
+    mean, frechet, dtw = (
+        clustering.pairwise_distances(lons, lats, metric=metric)[0, 1]
+        for metric in clustering.METRICS
+    )
+    np.testing.assert_allclose(mean, step)
+    np.testing.assert_allclose(frechet, 2 * step)
+    np.testing.assert_allclose(dtw, 3 * step)
+
+    with pytest.raises(ValueError):
+        clustering.pairwise_distances(lons, lats, metric="hausdorff")
+
+
+@pytest.mark.parametrize("method", ["kmeans", "mixture"])
+def test_cluster_tracks(storms, method):
+    expected = np.arange(60) % 3
+    labels, centres = clustering.cluster_tracks(storms, 3, method=method, seed=2)
+    assert _same_partition(labels, expected)
+
+    # The centre of the dateline crossing group is continuous
+    centre = centres[labels[0]]
+    assert centre.shape == (clustering.NPOINTS, 2)
+    np.testing.assert_allclose(centre[[0, -1], 0], [175, 185], atol=1)
+
+
+def test_kmedoids(storms):
+    lons, lats = clustering.features(storms)
+    distances = clustering.pairwise_distances(lons, lats, metric="frechet")
+    labels, medoids = clustering.kmedoids(distances, 3, seed=3)
+    assert _same_partition(labels, np.arange(60) % 3)
+    np.testing.assert_array_equal(labels[medoids], np.arange(3))
+
+    with pytest.raises(ValueError):
+        clustering.kmedoids(distances, 61)
+
+
+def test_kmeans():
+    x = np.array([[0., 0], [0, 1], [10, 10], [10, 11], [0, 0.5]])
+    labels, centres = clustering.kmeans(x, 2, seed=0)
+    assert _same_partition(labels, np.array([0, 0, 1, 1, 0]))
+    np.testing.assert_allclose(centres[labels[0]], [0, 0.5])
+    np.testing.assert_allclose(centres[labels[2]], [10, 10.5])
+
+    labels, probability = clustering.gaussian_mixture(x, 2, seed=0)
+    assert _same_partition(labels, np.array([0, 0, 1, 1, 0]))
+    np.testing.assert_allclose(probability.sum(axis=1), 1)
@@ -0,0 +1,58 @@
+import datetime
+
+import numpy as np
+import pandas as pd
+
+import storm_assess
+from storm_assess import cps
+
+
+def _hart_storm(b, tl, tu=None):
+    npoints = len(b)
+    if tu is None:
+        tu = tl
+    return storm_assess.Storm.from_arrays(
+        1,
+        dict(
+            date=[datetime.datetime(2000, 9, 1) + datetime.timedelta(hours=6 * n)
+                  for n in range(npoints)],
+            lat=np.linspace(20, 50, npoints), lon=np.linspace(280, 340, npoints),
+            vort=np.ones(npoints), vmax=np.ones(npoints), mslp=np.ones(npoints),
+        ),
+        obs_extras=dict(B=b, TL=tl, TU=tu),
+    )
+
+
+def test_classify():
+    storm = _hart_storm(b=[0, 20, 0, 20, 1e12], tl=[50, 50, -50, -50, 10])
+    phase = cps.classify([storm, storm])
+
+    assert len(phase) == 2
+    assert (phase[1] == [
+        cps.SYMMETRIC_WARM_CORE,
+        cps.ASYMMETRIC_WARM_CORE,
+        cps.SYMMETRIC_COLD_CORE,
+        cps.ASYMMETRIC_COLD_CORE,
+        cps.MISSING,
+    ]).all()
+
+
+def test_extratropical_transition():
+    storms = [
+        # Tropical -> onset at 2 -> completion at 4
+        _hart_storm(b=[0, 5, 15, 20, 30], tl=[80, 60, 20, 10, -40]),
+        # Onset but no completion
+        _hart_storm(b=[0, 5, 15], tl=[80, 60, 20]),
+        # Never tropical so no transition
+        _hart_storm(b=[30, 30, 30], tl=[-10, -10, -10]),
+    ]
+    summary = cps.extratropical_transition(storms)
+
+    assert list(summary.onset_index) == [2, 2, -1]
+    assert list(summary.completion_index) == [4, -1, -1]
+    assert list(summary.transitioned) == [True, False, False]
+    assert summary.onset_time[0] == datetime.datetime(2000, 9, 1, 12)
+    assert pd.isnull(summary.completion_time[1])
+    assert summary.fraction_symmetric_warm_core[0] == 0.4
+    assert list(summary.max_B) == [30, 15, 30]
+    assert list(summary.min_TL) == [-40, 20, -10]
@@ -0,0 +1,96 @@
+import datetime
+
+import numpy as np
+import pytest
+
+import storm_assess
+from storm_assess import density, geodesy, track
+
+
+def _storm(lons, lats, member):
+    start = datetime.datetime(2000, 9, 1)
+    n = len(lons)
+    return storm_assess.Storm.from_arrays(1, dict(
+        date=[start + datetime.timedelta(hours=6 * k) for k in range(n)],
+        lon=np.array(lons, dtype=float), lat=np.array(lats, dtype=float),
+        vort=np.zeros(n), vmax=np.zeros(n), mslp=np.zeros(n),
+    ), extras=dict(member=member))
+
+
+@pytest.fixture(scope="module")
+def storms():
+    rng = np.random.default_rng(0)
+    storms = [
+        _storm([178, 181, 184], [10, 12, 15], 0),
+        _storm([10, 60, 130], [80, 85, 82], 0),
+        _storm([300], [20], 1),
+        _storm([300, np.nan, 305], [20, 21, np.nan], 1),
+        _storm([1, 359], [0, 1], 2),
+    ]
+    for n in range(20):
+        npoints = rng.integers(1, 8)
+        lons = rng.uniform(0, 360) + np.cumsum(rng.normal(0, 3, npoints))
+        lats = np.clip(rng.uniform(-70, 70) + np.cumsum(rng.normal(0, 3, npoints)), -89, 89)
+        storms.append(_storm(lons % 360, lats, n % 3))
+    return storms
+
+
+def _expected_counts(storms, radius, resolution):
+    """ Distance from every grid cell to every segment """
+    lat_edges, lon_edges = density.grid(resolution)
+    lats, lons = np.meshgrid(
+        0.5 * (lat_edges[1:] + lat_edges[:-1]), 0.5 * (lon_edges[1:] + lon_edges[:-1]),
+        indexing="ij",
+    )
+    counts = np.zeros(lats.shape, dtype=int)
+    for storm in storms:
+        lon, lat = storm.column("lon"), storm.column("lat")
+        near = np.zeros(lats.shape, dtype=bool)
+        for a, b in [(n, n + 1) for n in range(len(storm) - 1)] or [(0, 0)]:
+            if np.isfinite([lon[a], lat[a], lon[b], lat[b]]).all():
+                near |= geodesy.distance_to_segment(
+                    lons, lats, lon[a], lat[a], lon[b], lat[b]
+                ) <= radius
+        counts += near
+    return counts
+
+
+@pytest.mark.parametrize("max_pairs", [density.MAX_PAIRS, 37])
+def test_footprint_counts(storms, monkeypatch, max_pairs):
+    monkeypatch.setattr(density, "MAX_PAIRS", max_pairs)
+    counts = density.footprint_counts(storms, radius=300, resolution=2)
+    assert counts.shape == (90, 180)
+    np.testing.assert_array_equal(counts, _expected_counts(storms, 300, 2))
+
+    tracks = [track.to_xarray(storm) for storm in storms]
+    np.testing.assert_array_equal(
+        density.footprint_counts(tracks, radius=300, resolution=2), counts
+    )
+
+
+@pytest.mark.parametrize("executor", ["serial", "process"])
+def test_strike_probability(storms, executor):
+    members = [0, 1, 2, 3]
+    counts = density.member_footprint_counts(
+        storms, radius=300, resolution=2, members=members, executor=executor
+    )
+    assert counts.dims == ("member", "latitude", "longitude")
+    for member in members:
+        expected = _expected_counts(
+            [storm for storm in storms if storm.extras["member"] == member], 300, 2
+        )
+        np.testing.assert_array_equal(counts.sel(member=member), expected)
+
+    probability = density.strike_probability(
+        storms, radius=300, resolution=2, members=members, executor=executor
+    )
+    np.testing.assert_allclose(probability, (counts > 0).sum("member") / 4)
+    assert probability.max() <= 0.75
+
+    mean = density.ensemble_track_density(
+        storms, radius=300, resolution=2, members=members, executor=executor
+    )
+    np.testing.assert_allclose(mean, counts.sum("member") / 4)
+
+    # The members default to those of the storms
+    assert list(density.member_footprint_counts(storms, resolution=4).member) == [0, 1, 2]
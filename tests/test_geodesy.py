@@ -0,0 +1,153 @@
+import math
+
+import numpy as np
+import pytest
+from haversine import Unit, haversine, haversine_vector
+
+import storm_assess
+from storm_assess import geodesy
+
+lyon = (45.7597, 4.8422)
+paris = (48.8567, 2.3508)
+
+
+@pytest.mark.parametrize("units", list(geodesy.UNITS))
+def test_distance_matches_haversine(units):
+    rng = np.random.default_rng(1)
+    lats1, lats2 = rng.uniform(-90, 90, (2, 100))
+    lons1, lons2 = rng.uniform(-180, 180, (2, 100))
+
+    result = geodesy.distance(lons1, lats1, lons2, lats2, units=units)
+    expected = haversine_vector(
+        np.array([lats1, lons1]).T, np.array([lats2, lons2]).T, unit=Unit(units)
+    )
+    np.testing.assert_allclose(result, expected, rtol=1e-12)
+
+    # Scalars give the same result as haversine
+    assert geodesy.distance(lyon[1], lyon[0], paris[1], paris[0], units=units) == \
+        haversine(lyon, paris, unit=units)
+
+
+def test_distance_broadcast_and_out():
+    lons = np.array([0., 90., 180.])
+    lats = np.zeros(3)
+    out = np.empty((3, 3))
+    result = geodesy.distance(
+        lons[:, np.newaxis], lats[:, np.newaxis], lons, lats, out=out
+    )
+    assert result is out
+    quarter = 0.5 * np.pi * geodesy.EARTH_RADIUS
+    np.testing.assert_allclose(out, [
+        [0, quarter, 2 * quarter],
+        [quarter, 0, quarter],
+        [2 * quarter, quarter, 0],
+    ])
+
+
+def test_float32():
+    lons = np.array([0, 10, 20], dtype=np.float32)
+    lats = np.array([0, 5, 10], dtype=np.float32)
+    assert geodesy.distance(lons[:-1], lats[:-1], lons[1:], lats[1:]).dtype == np.float32
+    assert geodesy.bearing(lons[:-1], lats[:-1], lons[1:], lats[1:]).dtype == np.float32
+    assert geodesy.along_track_distance(lons, lats).dtype == np.float32
+
+    # Mixing with float64 uses float64
+    assert geodesy.distance(lons, lats, 0., 0.).dtype == np.float64
+
+
+def test_normalise_longitude():
+    result = geodesy.normalise_longitude([-180, -0.5, 0, 359.5, 360, 725, 1e12])
+    assert result.tolist() == [180, 359.5, 0, 359.5, 0, 5, 1e12]
+
+
+def test_bearing():
+    result = geodesy.bearing(0, 0, [0, 10, 0, -10, 10], [10, 0, -10, 0, 10])
+    np.testing.assert_allclose(result[:4], [0, 90, 180, 270])
+    assert 0 < result[4] < 90
+
+    # Matches the original scalar calculation
+    assert storm_assess.lon_lat_to_azimuth(lyon[::-1], paris[::-1]) == pytest.approx(
+        geodesy.bearing(lyon[1], lyon[0], paris[1], paris[0])
+    )
+
+
+def test_destination():
+    rng = np.random.default_rng(2)
+    lons, lats = rng.uniform(0, 360, 50), rng.uniform(-80, 80, 50)
+    bearings, distances = rng.uniform(0, 360, 50), rng.uniform(0, 3000, 50)
+
+    lon2, lat2 = geodesy.destination(lons, lats, bearings, distances)
+    assert ((lon2 >= 0) & (lon2 < 360)).all()
+    np.testing.assert_allclose(geodesy.distance(lons, lats, lon2, lat2), distances)
+    bearing_error = (geodesy.bearing(lons, lats, lon2, lat2) - bearings + 180) % 360 - 180
+    np.testing.assert_allclose(bearing_error, 0, atol=1e-8)
+
+    lon2, lat2 = geodesy.destination(10, 0, 90, 0.25 * np.pi * geodesy.EARTH_RADIUS)
+    assert lon2 == pytest.approx(55)
+    assert lat2 == pytest.approx(0)
+
+
+def test_along_track_distance():
+    lons = np.array([0, 1, 2, 350, 351, 10])
+    lats = np.zeros(6)
+    offsets = np.array([0, 3, 3, 5, 6])
+    result = geodesy.along_track_distance(lons, lats, offsets, units="m")
+
+    degree = np.pi / 180 * geodesy.EARTH_RADIUS * 1000
+    np.testing.assert_allclose(result, [0, degree, 2 * degree, 0, degree, 0])
+
+
+def test_distance_to_segment():
+    degree = np.pi / 180 * geodesy.EARTH_RADIUS
+    # Beside the middle of the segment, beyond either end, on it and from a segment of
+    # zero length. The second segment crosses the dateline
+    lons = np.array([5., -3, 182, 175, 1])
+    lats = np.array([1., 0, 0, 0, 1])
+    result = geodesy.distance_to_segment(
+        lons, lats, [0, 0, 178, 178, 0], [0, 0, 0, 0, 0], [10, 10, -176, -176, 0],
+        [0, 0, 0, 0, 0],
+    )
+    np.testing.assert_allclose(
+        result, [degree, 3 * degree, 0, 3 * degree, geodesy.distance(1, 1, 0, 0)],
+        atol=1e-6,
+    )
+
+    # The closest point sampled along the great circle
+    rng = np.random.default_rng(2)
+    lon1, lat1 = rng.uniform(0, 360, 50), rng.uniform(-60, 60, 50)
+    lon2, lat2 = lon1 + rng.uniform(-10, 10, 50), lat1 + rng.uniform(-10, 10, 50)
+    lon, lat = lon1 + rng.uniform(-15, 15, 50), lat1 + rng.uniform(-15, 15, 50)
+    length = geodesy.distance(lon1, lat1, lon2, lat2)
+    points = geodesy.destination(
+        lon1, lat1, geodesy.bearing(lon1, lat1, lon2, lat2),
+        np.linspace(0, 1, 10001)[:, np.newaxis] * length,
+    )
+    np.testing.assert_allclose(
+        geodesy.distance_to_segment(lon, lat, lon1, lat1, lon2, lat2),
+        geodesy.distance(*points, lon, lat).min(axis=0), atol=1e-3,
+    )
+
+
+def test_storm_speed_azimuth(example_storms):
+    storm = example_storms[0]
+    speeds = storm_assess._storm_speed(storm)
+    azimuth = storm_assess._storm_azimuth(storm)
+    assert len(speeds) == len(azimuth) == len(storm)
+    assert np.isnan(speeds[-1]) and np.isnan(azimuth[-1])
+
+    for n in range(len(storm) - 1):
+        lon1, lat1 = storm.obs[n].lon, storm.obs[n].lat
+        lon2, lat2 = storm.obs[n + 1].lon, storm.obs[n + 1].lat
+        distance = haversine(
+            (lat1, lon1), (lat2, lon2), unit=Unit.METERS, normalize=True
+        )
+        assert speeds[n] == pytest.approx(distance / (6 * 3600))
+
+        # Initial bearing calculated directly
+        phi1, phi2 = math.radians(lat1), math.radians(lat2)
+        dlon = math.radians(lon2 - lon1)
+        expected = math.degrees(math.atan2(
+            math.sin(dlon) * math.cos(phi2),
+            math.cos(phi1) * math.sin(phi2) - math.sin(phi1) * math.cos(phi2) * math.cos(dlon),
+        )) % 360
+        assert azimuth[n] == pytest.approx(expected)
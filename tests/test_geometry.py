@@ -0,0 +1,243 @@
+import datetime
+
+import numpy as np
+import pytest
+import shapely
+
+import storm_assess
+from storm_assess import geometry
+
+
+def _storm(lons, lats, hours=6):
+    npoints = len(lons)
+    return storm_assess.Storm.from_arrays(1, dict(
+        date=[datetime.datetime(2000, 8, 1) + datetime.timedelta(hours=hours * n)
+              for n in range(npoints)],
+        lat=lats, lon=lons, vort=np.ones(npoints), vmax=np.ones(npoints),
+        mslp=np.ones(npoints),
+    ))
+
+
+def test_boundary_crossings():
+    storms = [
+        # Northwards across 30N at 70W, given as 0-360 longitudes
+        _storm([290, 290, 290], [20, 25, 35]),
+        # Never reaches 30N
+        _storm([290, 295], [20, 25]),
+        # Southwards
+        _storm([-50, -50], [40, 20]),
+    ]
+    result = geometry.boundary_crossings(storms, "south_midlat_na").loc["south_midlat_na"]
+
+    assert list(result.crossed) == [True, False, True]
+    assert list(result["index"]) == [1, -1, 0]
+    assert list(result.direction) == [1, 0, -1]
+    assert result.lat[0] == pytest.approx(30)
+    assert result.lon[0] == pytest.approx(-70)
+    assert result.time[0] == datetime.datetime(2000, 8, 1, 9)
+    assert result.time[2] == datetime.datetime(2000, 8, 1, 3)
+
+
+def test_boundary_crossings_dateline():
+    storm = _storm([178, 182], [5, 5])
+    result = geometry.boundary_crossings(
+        [storm], dict(dateline=([-180, -180], [0, 10]), greenwich=([0, 0], [0, 10]))
+    )
+
+    assert result.loc[("dateline", 0), "crossed"]
+    assert result.loc[("dateline", 0), "lon"] % 360 == pytest.approx(180)
+    assert not result.loc[("greenwich", 0), "crossed"]
+
+
+def test_boundary_crossings_matches_shapely(example_storms):
+    # Only compare tracks that don't cross the edge of the range of longitudes used, as
+    # the shapely tracks would jump 360 degrees
+    storms = [
+        storm for storm in example_storms
+        if (np.abs(np.diff(geometry.wrap_longitude(storm.column("lon"), -46))) < 180).all()
+    ]
+    result = geometry.boundary_crossings(storms)
+
+    for name, (blons, blats) in geometry.BOUNDARIES.items():
+        boundary = shapely.LineString(list(zip(blons, blats)))
+        expected = []
+        for storm in storms:
+            lons = geometry.wrap_longitude(storm.column("lon"), -46)
+            expected.append(
+                shapely.LineString(list(zip(lons, storm.column("lat")))).intersects(boundary)
+            )
+        assert list(result.loc[name].crossed) == expected
+        assert any(expected)
+        assert storm_assess._storm_cross_boundary(storms[0], name) == expected[0]
+
+
+@pytest.mark.parametrize("basin", ["na", "ep", "wp", "si", "nh", "sh"])
+def test_basin_masks(example_storms, basin):
+    from storm_assess.functions import _basin_polygon
+
+    result = geometry.basin_masks(example_storms, [basin, None])
+
+    # Compare with checking each point against the cartopy-projected polygon, which
+    # has longitudes in the range -180 to 180. Points at exactly 180 are skipped as the
+    # projected polygons are cut slightly short of the dateline
+    rbox = _basin_polygon(basin)
+    for storm, mask, mask_global in zip(example_storms, result[basin], result[None]):
+        lons = geometry.wrap_longitude(storm.column("lon"))
+        lats = storm.column("lat")
+        check = lons != -180
+        expected = [rbox.intersects(shapely.Point(x, y)) for x, y in zip(lons, lats)]
+        assert mask[check].tolist() == np.array(expected)[check].tolist()
+        assert mask_global.all()
+
+
+def test_obs_in_basin_dateline():
+    storm = _storm([150, 180, 200, 250, -170], [40, 40, 40, 40, 40])
+    assert geometry.obs_in_basin([storm], "midlat_np")[0].tolist() == [
+        True, True, True, False, True
+    ]
+    assert storm_assess._obs_in_basin(storm, "midlat_np") == [True, True, True, False, True]
+
+
+def test_unwrap_longitude():
+    lons = np.array([170, 175, 185, -170, 10, 20, 350, 5, 15, 100])
+    offsets = np.array([0, 4, 6, 6, 9, 10])
+    result = geometry.unwrap_longitude(lons, offsets)
+    assert result.tolist() == [170, 175, 185, 190, 10, 20, 350, 365, 375, 100]
+
+
+def test_unwrap_longitude_missing():
+    lons = np.array([170, np.nan, 185, -170, 10])
+    offsets = np.array([0, 4, 5])
+    result = geometry.unwrap_longitude(lons, offsets)
+    np.testing.assert_array_equal(result, [170, np.nan, 185, 190, 10])
+
+
+def test_split_at_antimeridian():
+    lons = np.array([170, 175, 185, 190, 10, 20, 350, 5, 15])
+    lats = np.arange(9.)
+    offsets = np.array([0, 4, 6, 6, 9])
+
+    out_lons, out_lats, piece_offsets, track = geometry.split_at_antimeridian(
+        lons, lats, offsets
+    )
+    assert out_lons.tolist() == [170, 175, 180, -180, -175, -170, 10, 20, -10, 5, 15]
+    assert out_lats.tolist() == [0, 1, 1.5, 1.5, 2, 3, 4, 5, 6, 7, 8]
+    assert piece_offsets.tolist() == [0, 3, 6, 8, 11]
+    assert track.tolist() == [0, 0, 1, 3]
+
+    # Centred on the dateline, the last track crosses the edge instead
+    out_lons, out_lats, piece_offsets, track = geometry.split_at_antimeridian(
+        lons, lats, offsets, centre=180
+    )
+    assert out_lons.tolist() == [170, 175, 185, 190, 10, 20, 350, 360, 0, 5, 15]
+    assert out_lats[7] == pytest.approx(6 + 2 / 3)
+    assert piece_offsets.tolist() == [0, 4, 6, 8, 11]
+    assert track.tolist() == [0, 1, 3, 3]
+
+
+def test_storms_in_basin(example_storms):
+    import cartopy.crs as ccrs
+    from storm_assess.functions import _basin_polygon
+
+    for basin in ["na", "ep", "wp", "nh", "sh"]:
+        result = geometry.storms_in_basin(example_storms, basin)
+
+        # Compare with the cartopy-projected track and basin, which only differ in
+        # whether tracks follow great circles so only compare tracks that are well
+        # inside or outside the basin
+        rbox = _basin_polygon(basin)
+        for storm, in_basin in zip(example_storms, result):
+            track = shapely.LineString(zip(storm.column("lon"), storm.column("lat")))
+            track = ccrs.PlateCarree().project_geometry(track, ccrs.Geodetic())
+            if rbox.distance(track) > 1 or rbox.intersection(track).length > 1:
+                assert in_basin == rbox.intersects(track)
+            assert storm_assess.functions._storm_in_basin(storm, basin) == in_basin
+
+
+def test_storms_in_basin_dateline():
+    storms = [
+        # Crosses into the west Pacific from the east
+        _storm([225, 200, 185, 175, 170], [10, 11, 12, 14, 16]),
+        # Stays in the east Pacific, defined with negative longitudes
+        _storm([-130, -140, -150], [10, 12, 14]),
+        # Single point
+        _storm([140], [10]),
+        _storm([-220], [10]),
+    ]
+    assert geometry.storms_in_basin(storms, "wp").tolist() == [True, False, True, True]
+    assert geometry.storms_in_basin(storms, "ep").tolist() == [True, True, False, False]
+
+    # A region defined in the range -180 to 180
+    region = shapely.box(-175, 0, -165, 20)
+    assert geometry.tracks_intersect(storms, region).tolist() == [True, False, False, False]
+
+
+def test_storms_in_basin_missing_positions():
+    nan = np.nan
+    storms = [
+        # Inside the north Atlantic apart from the missing position
+        _storm([300, nan, 310, 320], [20, nan, 25, 30]),
+        _storm([300, 305], [20, 22]),
+        # Only one valid position, or none
+        _storm([nan, 300], [nan, 20]),
+        _storm([nan, nan], [nan, nan]),
+        # Outside, with a missing position before crossing the dateline
+        _storm([170, nan, 190], [10, nan, 12]),
+    ]
+    assert geometry.storms_in_basin(storms, "na").tolist() == [
+        True, True, True, False, False
+    ]
+    assert geometry.storms_in_basin(storms, "wp").tolist() == [
+        False, False, False, False, True
+    ]
+
+
+def test_storm_vmax_genesis_in_basin():
+    storm = _storm([300, 250, 190], [20, 20, 20])
+    storm = storm_assess.Storm.from_arrays(1, dict(
+        (name, storm.column(name)) for name in storm_assess.OBSERVATION_FIELDS
+    ) | dict(vmax=np.array([1., 3., 2.])))
+    assert storm_assess._storm_genesis_in_basin(storm, "na")
+    assert not storm_assess._storm_genesis_in_basin(storm, "ep")
+    assert storm_assess._storm_vmax_in_basin(storm, "ep")
+    assert not storm_assess._storm_vmax_in_basin(storm, "na")
+
+
+def test_track_linestrings(example_storms):
+    storms = example_storms + [_storm([10], [20]), _storm([], [])]
+    lines = geometry.track_linestrings(storms)
+
+    for storm, line in zip(example_storms, lines):
+        expected = shapely.LineString(zip(storm.column("lon"), storm.column("lat")))
+        assert line.equals_exact(expected, tolerance=0)
+    assert lines[-2].equals(shapely.Point(10, 20))
+    assert lines[-1] is None
+
+
+def test_track_geometry_cache(example_storms, monkeypatch):
+    import cartopy.crs as ccrs
+
+    geometry.clear_geometry_cache()
+    storm = example_storms[0]
+    line = geometry.track_geometry(storm)
+    assert geometry.track_geometry(storm) is line
+
+    # Projected tracks are cached separately for each projection
+    projected = geometry.track_geometry(storm, ccrs.Robinson())
+    expected = ccrs.Robinson().project_geometry(line, ccrs.Geodetic())
+    assert projected.equals(expected)
+    assert geometry.track_geometry(storm, ccrs.Robinson()) is projected
+    assert storm_assess.functions.get_projected_track(storm, ccrs.Robinson()) is projected
+
+    # Only the most recently used geometries are kept
+    monkeypatch.setattr(geometry, "GEOMETRY_CACHE_SIZE", 5)
+    geometry.track_geometries(example_storms[1:])
+    assert len(geometry._geometry_cache) == 5
+    assert geometry.track_geometry(storm) is not line
+
+    # Changing the observations of a storm invalidates its geometry
+    new_storm = _storm([10, 20], [20, 20])
+    geometry.track_geometry(new_storm)
+    new_storm.obs = _storm([30, 40], [20, 20]).obs
+    assert geometry.track_geometry(new_storm).equals(shapely.LineString([(30, 20), (40, 20)]))
+    geometry.clear_geometry_cache()
@@ -0,0 +1,158 @@
+import datetime
+import os
+
+import numpy as np
+import pytest
+
+from storm_assess import index, synthetic, track
+
+
+@pytest.fixture(params=["new", "old"])
+def synthetic_file(tmp_path, request):
+    filename = str(tmp_path / "tracks.txt")
+    synthetic.write_tracks(
+        filename, ntracks=40, npoints=(1, 12), v10m=True, header=request.param, seed=0
+    )
+    return filename
+
+
+def test_build_index(synthetic_file):
+    result = index.build_index(synthetic_file)
+    storms = list(track.load(synthetic_file, ex_cols=3))
+
+    assert list(result.columns) == list(index.COLUMNS)
+    np.testing.assert_array_equal(result.track_id, [storm.snbr for storm in storms])
+    np.testing.assert_array_equal(result.npoints, [len(storm) for storm in storms])
+    np.testing.assert_array_equal(
+        result.start_time, [index.time_number(storm.genesis_date()) for storm in storms]
+    )
+
+    # Each block starts with the track header and the blocks cover the rest of the file
+    with open(synthetic_file, "rb") as f:
+        data = f.read()
+    for offset, nbytes in zip(result.offset, result.nbytes):
+        assert data[offset:offset + nbytes].startswith(b"TRACK_ID")
+    assert result.offset.iloc[-1] + result.nbytes.iloc[-1] == len(data)
+    np.testing.assert_array_equal(result.offset.iloc[1:], (result.offset + result.nbytes).iloc[:-1])
+
+
+def test_read_index(synthetic_file):
+    sidecar = index.index_filename(synthetic_file)
+    assert not os.path.exists(sidecar)
+
+    expected = index.build_index(synthetic_file)
+    assert index.read_index(synthetic_file).equals(expected)
+    assert os.path.exists(sidecar)
+    assert index.read_index(synthetic_file).equals(expected)
+
+    # The saved index is rebuilt if the file changes
+    synthetic.write_tracks(synthetic_file, ntracks=5, seed=1)
+    os.utime(synthetic_file, ns=(0, 0))
+    assert len(index.read_index(synthetic_file)) == 5
+
+
+@pytest.mark.parametrize("contents", [b"", b"PK\x03\x04truncated"])
+def test_read_index_corrupt(synthetic_file, contents):
+    expected = index.read_index(synthetic_file)
+    sidecar = index.index_filename(synthetic_file)
+    with open(sidecar, "wb") as f:
+        f.write(contents)
+
+    assert index.read_index(synthetic_file).equals(expected)
+    # The saved index is replaced, without leaving any temporary files
+    assert index.read_index(synthetic_file, save=False).equals(expected)
+    with np.load(sidecar) as saved:
+        assert "state" in saved
+    assert set(os.listdir(os.path.dirname(sidecar))) == {
+        os.path.basename(synthetic_file), os.path.basename(sidecar)
+    }
+
+
+def test_select():
+    # Track n starts on day n of 2000
+    rows = index.select(
+        index._to_dataframe([(n, 10, 2000010000 + 100 * n, 100 * n) for n in range(1, 11)], 1100),
+        track_ids=[2, 3, 4, 5, 9], start_time=(datetime.datetime(2000, 1, 4), 2000010900),
+        track_slice=slice(0, 6),
+    )
+    assert list(rows.track_id) == [4, 5]
+
+
+@pytest.mark.parametrize("selection", [
+    dict(track_ids=[3, 17, 40]),
+    dict(track_slice=slice(10, 20, 3)),
+    dict(start_time=(datetime.datetime(2000, 3, 1), datetime.datetime(2000, 6, 1))),
+    dict(start_time=(None, 2000070100), track_ids=range(1, 21)),
+])
+def test_load_selected(synthetic_file, selection):
+    storms = list(track.load(synthetic_file, ex_cols=3))
+    rows = index.select(index.build_index(synthetic_file), **selection)
+    expected = [storms[n] for n in rows.index]
+    assert len(expected) > 0
+
+    result = list(track.load(synthetic_file, ex_cols=3, **selection))
+    assert [storm.snbr for storm in result] == [storm.snbr for storm in expected]
+    for storm, expected_storm in zip(result, expected):
+        assert list(storm.column("date")) == list(expected_storm.column("date"))
+        np.testing.assert_array_equal(storm.column("lat"), expected_storm.column("lat"))
+
+    tracks = track.load_no_assumptions(synthetic_file, **selection)
+    assert [tr.attrs["track_id"] for tr in tracks] == [storm.snbr for storm in expected]
+    for tr, storm in zip(tracks, expected):
+        np.testing.assert_array_equal(tr.latitude, storm.column("lat"))
+
+
+def test_load_hart_selected(tmp_path):
+    filename = str(tmp_path / "tracks.txt")
+    synthetic.write_tracks(filename, ntracks=10, layout="hart", seed=2)
+    storms = list(track.load_hart(filename, track_ids=[4, 7]))
+    assert [storm.snbr for storm in storms] == [4, 7]
+
+
+def test_select_file_handle(synthetic_file):
+    # Without a filename the tracks are selected while reading the file
+    expected = list(track.load(synthetic_file, ex_cols=3, track_slice=slice(-10, None, 2)))
+    with open(synthetic_file) as f:
+        result = list(track.load(f, ex_cols=3, track_slice=slice(-10, None, 2)))
+    assert [storm.snbr for storm in result] == [storm.snbr for storm in expected]
+
+    with pytest.raises(ValueError):
+        index.build_index(synthetic_file + ".gz")
+
+
+@pytest.mark.parametrize("nchunks", [1, 3, 7, 1000])
+def test_split(synthetic_file, nchunks):
+    rows = index.read_index(synthetic_file, save=False)
+    chunks = index.split(rows, nchunks)
+
+    assert 0 < len(chunks) <= min(nchunks, len(rows))
+    assert all(len(chunk) > 0 for chunk in chunks)
+    np.testing.assert_array_equal(
+        np.concatenate([chunk.offset for chunk in chunks]), rows.offset
+    )
+    assert index.split(rows.iloc[:0], nchunks) == []
+
+
+@pytest.mark.parametrize("executor", ["thread", "process"])
+@pytest.mark.parametrize("selection", [
+    dict(), dict(track_slice=slice(5, 40, 3)), dict(bbox=(100, 180, 0, 30)),
+])
+def test_load_parallel(synthetic_file, executor, selection):
+    expected = list(track.load(synthetic_file, **selection))
+    storms = list(track.load(synthetic_file, jobs=2, executor=executor, **selection))
+    assert [storm.snbr for storm in storms] == [storm.snbr for storm in expected]
+    for storm, storm_expected in zip(storms, expected):
+        np.testing.assert_array_equal(storm.column("vmax"), storm_expected.column("vmax"))
+
+    expected = track.load_no_assumptions(synthetic_file, **selection)
+    tracks = track.load_no_assumptions(
+        synthetic_file, jobs=2, executor=executor, **selection
+    )
+    assert len(tracks) == len(expected)
+    for tr, tr_expected in zip(tracks, expected):
+        assert tr.identical(tr_expected)
+
+
+def test_load_parallel_needs_filename(synthetic_file):
+    with open(synthetic_file) as f, pytest.raises(ValueError):
+        list(track.load(f, jobs=2))
@@ -0,0 +1,109 @@
+import cartopy.crs as ccrs
+import numpy as np
+import pytest
+
+import storm_assess
+from storm_assess.plot import maps
+
+
+def _storm(lons, lats, vmax):
+    return storm_assess.Storm.from_arrays(1, dict(
+        date=np.arange(len(lons)), lon=np.array(lons, dtype=float),
+        lat=np.array(lats, dtype=float), vort=np.zeros(len(lons)),
+        vmax=np.array(vmax, dtype=float), mslp=np.zeros(len(lons)),
+    ))
+
+
+def test_track_segments():
+    # The second storm crosses the edge of a map centred on 0 between 170 and 190
+    storms = [
+        _storm([10, 20, 30], [0, 10, 20], [10, 20, 30]),
+        _storm([170, 190], [0, 10], [20, 40]),
+    ]
+    segments, colour = maps.track_segments(storms, central_longitude=0)
+
+    np.testing.assert_allclose(segments, [
+        [[10, 0], [20, 10]],
+        [[20, 10], [30, 20]],
+        [[170, 0], [180, 5]],
+        [[-180, 5], [-170, 10]],
+    ])
+    np.testing.assert_allclose(colour, [15, 25, 25, 35])
+
+    segments, colour = maps.track_segments(storms, color_by=None, central_longitude=180)
+    assert colour is None
+    assert len(segments) == 3
+    np.testing.assert_allclose(segments[2], [[-10, 0], [10, 10]])
+
+
+def test_track_collection_projection(example_storms):
+    projection = ccrs.Robinson(central_longitude=150)
+    collection = maps.track_collection(example_storms, projection=projection)
+
+    segments, colour = maps.track_segments(example_storms, central_longitude=150)
+    expected = projection.transform_points(
+        ccrs.PlateCarree(central_longitude=150),
+        segments[..., 0].ravel(), segments[..., 1].ravel(),
+    )[:, :2]
+    np.testing.assert_allclose(
+        np.concatenate([path.vertices for path in collection.get_paths()]), expected
+    )
+    np.testing.assert_array_equal(collection.get_array(), colour)
+
+
+def test_render(example_storms, tmp_path):
+    maps.clear_base_maps()
+    fig, ax = maps.base_map("na", coastlines=False)
+    position = ax.get_position(original=True).bounds
+    ncollections = len(ax.collections)
+
+    filename = str(tmp_path / "tracks.png")
+    assert maps.render(
+        filename, example_storms, basin="na", title="Tracks", coastlines=False
+    ) == filename
+    assert (tmp_path / "tracks.png").read_bytes()[:8] == b"\x89PNG\r\n\x1a\n"
+
+    # The base map is reused and left as it was
+    assert maps.base_map("na", coastlines=False) == (fig, ax)
+    assert len(ax.collections) == ncollections
+    assert fig.axes == [ax]
+    assert ax.get_title() == ""
+    assert ax.get_position(original=True).bounds == position
+    maps.clear_base_maps()
+
+
+def test_render_density(example_storms, tmp_path):
+    from storm_assess import density
+
+    grid = density.point_density(example_storms, resolution=10)
+    maps.render(str(tmp_path / "density.png"), density=grid, coastlines=False)
+    assert (tmp_path / "density.png").exists()
+
+
+@pytest.mark.parametrize("executor", ["serial", "process"])
+def test_render_many(example_storms, tmp_path, executor):
+    groups = maps.group_storms(example_storms, by="member")
+    figures = {str(tmp_path / f"member_{member}.png"): group
+               for member, group in groups.items()}
+
+    result = maps.render_many(
+        figures, executor=executor, max_workers=2, coastlines=False
+    )
+    assert result == list(figures)
+    assert all((tmp_path / f"member_{member}.png").exists() for member in groups)
+
+
+def test_group_storms(example_storms):
+    by_year = maps.group_storms(example_storms, by="year")
+    assert list(by_year) == [2000, 2001, 2002]
+    assert all(
+        storm.genesis_date().year == year
+        for year, storms in by_year.items() for storm in storms
+    )
+
+    by_member = maps.group_storms(example_storms, by="member")
+    assert list(by_member) == [0, 1, 2, 3]
+    assert sum(len(storms) for storms in by_member.values()) == len(example_storms)
+
+    with pytest.raises(ValueError):
+        maps.group_storms(example_storms, by="basin")
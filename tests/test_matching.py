@@ -0,0 +1,138 @@
+import datetime
+
+import numpy as np
+import pytest
+from haversine import haversine
+
+import storm_assess
+from storm_assess import matching, track
+
+
+def _shifted(storm, snbr, dlat=0., dlon=0., hours=0, points=slice(None)):
+    fields = {
+        name: storm.column(name)[points] for name in storm_assess.OBSERVATION_FIELDS
+    }
+    fields["date"] = [date + datetime.timedelta(hours=hours) for date in fields["date"]]
+    fields["lat"] = fields["lat"] + dlat
+    fields["lon"] = fields["lon"] + dlon
+    return storm_assess.Storm.from_arrays(snbr, fields)
+
+
+def _moves_off(storm, snbr, nsteps):
+    fields = {name: storm.column(name) for name in storm_assess.OBSERVATION_FIELDS}
+    fields["lat"] = fields["lat"] + np.where(np.arange(len(storm)) < nsteps, 0, 10)
+    return storm_assess.Storm.from_arrays(snbr, fields)
+
+
+@pytest.fixture(scope="module")
+def model_storms(example_storms):
+    observed = example_storms[:5]
+    return [
+        # Close to observed storm 0
+        _shifted(observed[0], 101, dlat=1),
+        # Close to observed storm 1 for part of its lifetime only
+        _shifted(observed[1], 102, dlon=-2, points=slice(3, 7)),
+        # Same track but at different times
+        _shifted(observed[2], 103, hours=3),
+        # Too far away
+        _shifted(observed[3], 104, dlat=5),
+        # Close to storm 4, but moves off after 3 steps
+        _moves_off(observed[4], 105, nsteps=3),
+    ]
+
+
+def test_match_tracks(example_storms, model_storms):
+    observed = example_storms[:5]
+    matches = matching.match_tracks(
+        model_storms, observed, max_distance=300, min_overlap=4
+    )
+
+    assert matches.columns.tolist() == matching.MATCH_COLUMNS
+    assert matches.model.tolist() == [0, 1]
+    assert matches.observed.tolist() == [0, 1]
+    assert matches.model_id.tolist() == [101, 102]
+    assert matches.observed_id.tolist() == [1, 2]
+    assert matches.n_matched.tolist() == [len(observed[0]), 4]
+    assert matches.n_overlap.tolist() == [len(observed[0]), 4]
+    assert matches.start_time.tolist() == [
+        observed[0].genesis_date(), observed[1].obs[3].date
+    ]
+    assert matches.end_time.tolist() == [
+        observed[0].lysis_date(), observed[1].obs[6].date
+    ]
+
+    expected = [
+        haversine((ob.lat, ob.lon), (ob.lat + 1, ob.lon), normalize=True)
+        for ob in observed[0].obs
+    ]
+    assert matches.mean_separation[0] == pytest.approx(np.mean(expected))
+    assert matches.min_separation[0] == pytest.approx(np.min(expected))
+
+    # Storm 105 matches for 3 time steps only
+    matches = matching.match_tracks(model_storms, observed, min_overlap=3)
+    assert matches.model.tolist() == [0, 1, 4]
+
+
+def test_match_tracks_brute_force(example_storms):
+    # Compare against checking every pair of points in every pair of tracks
+    model = [
+        _shifted(storm, n, dlat=n % 5, dlon=-(n % 3), hours=6 * (n % 2))
+        for n, storm in enumerate(example_storms)
+    ]
+    observed = example_storms[::-1]
+    matches = matching.match_tracks(model, observed, max_distance=400, min_overlap=2)
+
+    expected = []
+    for i, m in enumerate(model):
+        for j, o in enumerate(observed):
+            close = [
+                haversine((a.lat, a.lon), (b.lat, b.lon), normalize=True)
+                for a in m.obs for b in o.obs if a.date == b.date
+            ]
+            overlap = len(close)
+            close = [d for d in close if d <= 400]
+            if len(close) >= 2:
+                expected.append((i, j, len(close), overlap, np.mean(close)))
+
+    assert len(expected) > 10
+    columns = ["model", "observed", "n_matched", "n_overlap"]
+    assert [tuple(row) for row in matches[columns].values] == [
+        row[:4] for row in expected
+    ]
+    assert matches.mean_separation.tolist() == pytest.approx([row[4] for row in expected])
+
+
+def test_match_tracks_bands_and_missing(example_storms):
+    # Points either side of the edge of a latitude band and a missing position
+    storm = example_storms[0]
+    band_width = np.degrees(300 / 6371.0088)
+    observed = _shifted(storm, 1, dlat=band_width * 3 - storm.column("lat")[0] - 0.1)
+    model = _shifted(observed, 2, dlat=0.2)
+    model.column("lat")[1] = np.nan
+
+    matches = matching.match_tracks([model], [observed], max_distance=300, min_overlap=2)
+    assert matches.n_overlap.tolist() == [len(storm)]
+    assert matches.n_matched.tolist() == [len(storm) - 1]
+
+
+def test_match_tracks_xarray(example_storms):
+    # Times as datetime64 in the xarray tracks can be matched against datetimes
+    observed = [track.to_xarray(storm) for storm in example_storms[:3]]
+    matches = matching.match_tracks(example_storms[:3], observed)
+    assert matches.model.tolist() == [0, 1, 2]
+    assert matches.observed_id.tolist() == [1, 2, 3]
+    assert (matches.mean_separation == 0).all()
+
+
+def test_best_matches(example_storms):
+    model = [_shifted(example_storms[0], 1, dlat=0.5)]
+    observed = [
+        _shifted(example_storms[0], 11, dlat=2),
+        _shifted(example_storms[0], 12),
+        _shifted(example_storms[0], 13, points=slice(0, 5)),
+    ]
+    matches = matching.match_tracks(model, observed)
+    assert len(matches) == 3
+
+    best = matching.best_matches(matches)
+    assert best.observed_id.tolist() == [12]
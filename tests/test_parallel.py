@@ -0,0 +1,40 @@
+import pytest
+
+import storm_assess
+from storm_assess import functions, parallel
+
+
+def _first_lat(storm, offset=0):
+    return storm.obs[0].lat + offset
+
+
+@pytest.mark.parametrize("executor", ["serial", "thread", "process"])
+def test_map_storms(example_storms, executor):
+    result = parallel.map_storms(
+        _first_lat, example_storms, kwargs=dict(offset=1), executor=executor,
+        max_workers=2, chunksize=3,
+    )
+    assert result == [storm.obs[0].lat + 1 for storm in example_storms]
+
+
+def test_map_storms_generator(example_storms):
+    result = parallel.map_storms(
+        functions._storm_in_basin, (storm for storm in example_storms), args=("na",),
+        max_workers=2, chunksize=4,
+    )
+    assert result == [functions._storm_in_basin(storm, "na") for storm in example_storms]
+
+
+def test_reduce_storms(example_storms):
+    result = parallel.reduce_storms(
+        storm_assess.Storm.ace_index, example_storms, executor="process", max_workers=2
+    )
+    assert result == pytest.approx(sum(storm.ace_index() for storm in example_storms))
+
+    result = parallel.reduce_storms(len, example_storms, reducer=max, initial=0)
+    assert result == max(len(storm) for storm in example_storms)
+
+
+def test_invalid_executor(example_storms):
+    with pytest.raises(ValueError):
+        parallel.map_storms(len, example_storms, executor="gpu")
@@ -0,0 +1,122 @@
+import datetime
+
+import numpy as np
+import pytest
+import xarray
+
+import storm_assess
+from storm_assess import geodesy, resample, synthetic, timing, track
+
+
+@pytest.fixture(scope="module")
+def storms(tmp_path_factory):
+    filename = str(tmp_path_factory.mktemp("resample") / "tracks.txt")
+    synthetic.write_tracks(filename, ntracks=20, seed=1, calendar="netcdftime")
+    return list(track.load(filename, ex_cols=3, calendar="netcdftime"))
+
+
+def test_target_times():
+    hours = np.array([3., 9, 15, 20, 0, 7, 12, 13])
+    offsets = np.array([0, 4, 4, 7, 8])
+
+    new_hours, new_offsets = resample.target_times(hours, offsets, frequency=6)
+    np.testing.assert_array_equal(new_hours, [6, 12, 18, 0, 6, 12])
+    np.testing.assert_array_equal(new_offsets, [0, 3, 3, 6, 6])
+
+    new_hours, new_offsets = resample.target_times(hours, offsets, npoints=3)
+    np.testing.assert_array_equal(new_hours, [3, 11.5, 20, 0, 6, 12, 13, 13, 13])
+    np.testing.assert_array_equal(new_offsets, [0, 3, 3, 6, 9])
+
+    with pytest.raises(ValueError):
+        resample.target_times(hours, offsets)
+    with pytest.raises(ValueError):
+        resample.target_times(hours, offsets, frequency=6, npoints=3)
+
+
+def test_interpolate():
+    hours = np.array([0., 6, 12, 0, 6])
+    values = np.array([1., 2, np.nan, 10, 20])
+    offsets = np.array([0, 3, 5])
+
+    result = resample.interpolate(
+        hours, values, offsets, np.array([3., 6, 9, 12, -1, 1.5, 7]), np.array([0, 4, 7])
+    )
+    np.testing.assert_array_equal(result, [1.5, 2, np.nan, np.nan, np.nan, 12.5, np.nan])
+
+
+def test_interpolate_positions_across_dateline():
+    hours = np.array([0., 12])
+    offsets = np.array([0, 2])
+    lons, lats = resample.interpolate_positions(
+        hours, np.array([179., -179]), np.array([10., 10]), offsets,
+        np.array([0., 6, 12]), np.array([0, 3]),
+    )
+    np.testing.assert_allclose(lons, [179, 180, 181])
+
+    # The midpoint is half way along the great circle
+    distance = geodesy.distance(lons[:-1], lats[:-1], lons[1:], lats[1:])
+    np.testing.assert_allclose(distance[0], distance[1])
+
+
+def test_resample_storms(storms):
+    three_hourly = resample.resample(storms, frequency=3)
+    assert len(three_hourly) == len(storms)
+    for storm, new in zip(storms, three_hourly):
+        assert new.snbr == storm.snbr
+        assert len(new) == 2 * len(storm) - 1
+        assert list(new.column("date")[::2]) == list(storm.column("date"))
+        np.testing.assert_array_equal(new.hours(), timing.hours_since_epoch(new.column("date")))
+        for name in ["lat", "vmax", "mslp", "vmax_kts"]:
+            np.testing.assert_array_equal(new.column(name)[::2], storm.column(name))
+        np.testing.assert_allclose(new.column("lon")[::2], storm.column("lon"))
+
+    # Resampling back to 6-hourly gives the original storms
+    six_hourly = resample.resample(three_hourly, frequency=6)
+    for storm, new in zip(storms, six_hourly):
+        np.testing.assert_allclose(new.column("lon"), storm.column("lon"))
+        np.testing.assert_allclose(new.column("vort"), storm.column("vort"))
+        assert new.ace_index() == storm.ace_index()
+
+
+def test_resample_npoints(storms):
+    tracks = [track.to_xarray(storm) for storm in storms]
+    resampled = resample.resample(tracks, npoints=10)
+    resampled_storms = resample.resample(storms, npoints=10)
+
+    for tr, new, storm in zip(tracks, resampled, resampled_storms):
+        assert isinstance(new, xarray.Dataset)
+        assert len(new.time) == 10
+        assert new.attrs["track_id"] == tr.attrs["track_id"]
+        assert new.time[0] == tr.time[0] and new.time[-1] == tr.time[-1]
+        np.testing.assert_array_equal(new.longitude, storm.column("lon"))
+        np.testing.assert_array_equal(new.vmax_kts, storm.column("vmax_kts"))
+
+
+def test_resample_mixed_frequencies():
+    start = datetime.datetime(2000, 9, 1, 3)
+
+    def _storm(snbr, step):
+        n = 24 // step + 1
+        return storm_assess.Storm.from_arrays(snbr, dict(
+            date=[start + datetime.timedelta(hours=step * k) for k in range(n)],
+            lat=np.linspace(15, 20, n), lon=np.linspace(300, 290, n),
+            vort=np.zeros(n), vmax=np.linspace(20, 40, n), mslp=np.zeros(n),
+        ), obs_extras=dict(vmax_kts=np.linspace(20, 40, n) * 1.944))
+
+    storms = resample.resample([_storm(1, 3), _storm(2, 1)], frequency=6)
+    assert [date.hour for date in storms[0].column("date")] == [6, 12, 18, 0]
+    np.testing.assert_allclose(storms[0].column("vmax"), storms[1].column("vmax"))
+    assert storms[0].ace_index() == storms[1].ace_index() > 0
+
+
+def test_dates_from_hours():
+    for calendar in ["360_day", "noleap", None]:
+        if calendar is None:
+            dates = [datetime.datetime(1965, 3, 1, 6), datetime.datetime(2000, 2, 29, 18)]
+        else:
+            import cftime
+
+            dates = [cftime.datetime(1965, 3, 1, 6, calendar=calendar),
+                     cftime.datetime(2000, 2, 28, 18, calendar=calendar)]
+        new = timing.dates_from_hours(timing.hours_since_epoch(dates), calendar)
+        assert list(new) == dates
@@ -0,0 +1,150 @@
+import datetime
+
+import cftime
+import numpy as np
+import pytest
+
+import storm_assess
+from storm_assess import stats, synthetic, track
+from storm_assess.functions import xarray_functions
+
+
+@pytest.fixture(scope="module")
+def table(example_storms):
+    return stats.genesis_table(
+        example_storms, basins=["na", "ep"], season_months=[11, 12, 1, 2, 3, 4]
+    )
+
+
+@pytest.mark.parametrize("times", [
+    [datetime.datetime(2000, 1, 30, 18), datetime.datetime(2001, 12, 1, 6, 30, 15)],
+    [cftime.Datetime360Day(2000, 1, 30, 18), cftime.Datetime360Day(2001, 12, 1, 6, 30, 15)],
+    np.array(["2000-01-30T18", "2001-12-01T06:30:15"], dtype="datetime64[s]"),
+])
+def test_time_components(times):
+    names = ["year", "month", "day", "hour", "minute", "second"]
+    result = stats.time_components(np.array(times), names=names)
+    expected = dict(
+        year=[2000, 2001], month=[1, 12], day=[30, 1], hour=[18, 6], minute=[0, 30],
+        second=[0, 15],
+    )
+    assert {name: result[name].tolist() for name in names} == expected
+
+
+def test_in_season():
+    years = np.array([2000, 2000, 2000, 2001, 2001])
+    months = np.array([4, 5, 11, 2, 8])
+
+    inside, season = stats.in_season(years, months, [11, 12, 1, 2, 3, 4])
+    assert inside.tolist() == [True, False, True, True, False]
+    assert season.tolist() == [1999, -1, 2000, 2000, -1]
+
+    inside, season = stats.in_season(years, months, [6, 7, 8, 9, 10])
+    assert inside.tolist() == [False, False, False, False, True]
+    assert season.tolist() == [-1, -1, -1, -1, 2001]
+
+    inside, season = stats.in_season(years, months, list(range(7, 13)) + list(range(1, 7)))
+    assert inside.all()
+    assert season.tolist() == [1999, 1999, 2000, 2000, 2001]
+
+
+def test_genesis_table(example_storms, table):
+    assert len(table) == len(example_storms)
+    for storm, row in zip(example_storms, table.itertuples()):
+        assert row.year == storm.genesis_date().year
+        assert row.month == storm.genesis_date().month
+        assert row.member == storm.extras["member"]
+        assert row.intensity == storm.vmax
+        assert round(row.ace, 2) == storm.ace_index()
+        assert row.na == storm_assess.functions._storm_in_basin(storm, "na")
+        assert row.ep == storm_assess.functions._storm_in_basin(storm, "ep")
+
+        if row.month in (11, 12):
+            assert row.season == row.year
+        elif row.month <= 4:
+            assert row.season == row.year - 1
+        else:
+            assert row.season == -1
+
+
+def test_storm_counts(example_storms, table):
+    counts = stats.storm_counts(table, by=["year", "month"])
+    assert counts.sum() == len(example_storms)
+    for (year, month), count in counts.items():
+        assert count == sum(
+            storm.genesis_date().year == year and storm.genesis_date().month == month
+            for storm in example_storms
+        )
+
+    counts = stats.storm_counts(table, by="basin")
+    assert counts.to_dict() == dict(ep=table.ep.sum(), na=table.na.sum())
+
+    counts = stats.storm_counts(table, by="member", basin="na")
+    assert counts.sum() == table.na.sum()
+
+
+def test_ace(example_storms, table):
+    result = stats.ace(table, by=["member", "basin"])
+    for (member, basin), total in result.items():
+        expected = sum(
+            storm.ace_index() for storm in example_storms
+            if storm.extras["member"] == member and
+            storm_assess.functions._storm_in_basin(storm, basin)
+        )
+        assert total == pytest.approx(expected, abs=0.01 * len(example_storms))
+
+
+def test_intensity_histogram(example_storms, table):
+    bins = [0, 20, 30, 40, 50]
+    result = stats.intensity_histogram(table, bins, by="year")
+    assert result.columns.tolist() == bins[:-1]
+
+    for year, row in result.iterrows():
+        vmax = [storm.vmax for storm in example_storms if storm.genesis_date().year == year]
+        assert row.tolist() == np.histogram(vmax, bins)[0].tolist()
+
+
+def test_monthly_storm_count(example_storms):
+    years, months = [2000, 2001], list(range(1, 13))
+    result = storm_assess.functions._get_monthly_storm_count(
+        example_storms, years, months, "na"
+    )
+    genesis_months = [
+        storm.genesis_date().month for storm in example_storms
+        if storm.genesis_date().year in years and
+        storm_assess.functions._storm_in_basin(storm, "na")
+    ]
+    assert result == [genesis_months.count(month) for month in months]
+    assert sum(result) > 0
+
+    # xarray tracks give the same result
+    tracks = [track.to_xarray(storm) for storm in example_storms]
+    assert xarray_functions._get_monthly_storm_count(tracks, years, months, "na") == result
+
+
+def test_monthly_storm_count_no_intensity(tmp_path):
+    # Tracks loaded with no assumptions have no "vmax" variable
+    filename = str(tmp_path / "tracks.txt")
+    synthetic.write_tracks(filename, ntracks=20, layout="no_assumptions", seed=0)
+    tracks = track.load_no_assumptions(filename)
+    storms = track.load_no_assumptions(filename, output_type="storm")
+    assert "vmax" not in tracks[0]
+
+    years = range(1900, 2100)
+    result = xarray_functions._get_monthly_storm_count(tracks, years, range(1, 13), "na")
+    genesis_months = [
+        storm.genesis_date().month for storm in storms
+        if storm_assess.functions._storm_in_basin(storm, "na")
+    ]
+    assert result == [genesis_months.count(month) for month in range(1, 13)]
+
+    table = stats.genesis_table(tracks, intensity=None)
+    assert table.columns.tolist() == ["year", "month", "season", "member"]
+
+def test_xarray_storms_in_time_range(example_storms):
+    tracks = [track.to_xarray(storm) for storm in example_storms]
+    months = [11, 12, 1, 2, 3, 4, 5, 6]
+    result = list(xarray_functions._storms_in_time_range(tracks, 2000, months))
+    expected = list(storm_assess.functions._storms_in_time_range(example_storms, 2000, months))
+    assert [tr.attrs["track_id"] for tr in result] == [storm.snbr for storm in expected]
+    assert len(expected) > 0
@@ -1,5 +1,16 @@
+import datetime
+import pickle
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
 import storm_assess
 
+# Maximum time (s) allowed for importing the package
+IMPORT_TIME_BUDGET = 1.0
+
 
 def test_lon_lat_to_distance():
     # Example taken from https://pypi.org/project/haversine/
@@ -7,3 +18,145 @@ def test_lon_lat_to_distance():
     paris = [48.8567, 2.3508]
     distance = storm_assess.lon_lat_to_distance(lyon[::-1], paris[::-1])
     assert distance == 392217.2595594006
+
+
+@pytest.mark.parametrize("units", ["km", "m", "mi", "nmi", "ft", "in", "rad", "deg"])
+def test_lon_lat_to_distance_units(units):
+    from haversine import haversine
+
+    lyon = [45.7597, 4.8422]
+    paris = [48.8567, 2.3508]
+    distance = storm_assess.lon_lat_to_distance(lyon[::-1], paris[::-1], units=units)
+    assert distance == pytest.approx(haversine(lyon, paris, unit=units), rel=1e-12)
+
+
+def _example_storm():
+    obs = [
+        storm_assess.Observation(
+            datetime.datetime(2000, 1, 1, 6 * n), 10.0 + n, 300.0 + n, 1.0 + n, 10.0 * n,
+            1000.0 - n, extras={"vmax_kts": 19.44 * n},
+        )
+        for n in range(4)
+    ]
+    return storm_assess.Storm(1, obs)
+
+
+def test_storm_columns():
+    storm = _example_storm()
+
+    assert len(storm) == 4
+    assert storm.column("lat").dtype == np.float64
+    assert (storm.column("lon") == [300, 301, 302, 303]).all()
+    assert storm.column("vmax_kts")[-1] == pytest.approx(19.44 * 3)
+    assert storm.vmax == 30.0
+    assert storm.mslp_min == 997.0
+    assert storm.obs_at_lysis().date == datetime.datetime(2000, 1, 1, 18)
+
+
+def test_observation_view():
+    storm = _example_storm()
+    ob = storm.obs[1]
+
+    assert not hasattr(ob, "__dict__")
+    assert ob.lat == 11.0
+    assert ob.extras == {"vmax_kts": pytest.approx(19.44)}
+    assert ob == storm_assess.Observation(*ob)
+    assert [o.lat for o in storm.obs] == [10.0, 11.0, 12.0, 13.0]
+    assert storm.obs[-1].lon == 303.0
+
+    date, lat, lon, vort, vmax, mslp, extras = ob
+    assert (lat, lon, vort, vmax, mslp) == (11.0, 301.0, 2.0, 10.0, 999.0)
+
+    ob = pickle.loads(pickle.dumps(ob))
+    assert ob.lat == 11.0
+
+
+def test_storm_from_arrays():
+    dates = [datetime.datetime(2000, 1, 1, 3 * n) for n in range(4)]
+    storm = storm_assess.Storm.from_arrays(
+        2,
+        dict(
+            date=dates, lat=[10, 11, 12, 13], lon=[300, 301, 302, 303],
+            vort=[1, 2, 3, 4], vmax=[10, 20, 30, 20], mslp=[1000, 990, 980, 990],
+        ),
+        obs_extras={"vmax_kts": np.array([100, 200, 300, 200])},
+    )
+
+    # Only the 00Z and 06Z records are used
+    assert storm.ace_index() == 10.0
+    assert storm.obs[2].extras["vmax_kts"] == 300
+    assert dict(storm.obs[2].extras) == {"vmax_kts": 300}
+    with pytest.raises(TypeError):
+        storm.obs[2].extras["vmax_kts"] = 0
+
+    with pytest.raises(ValueError):
+        storm_assess.Storm.from_arrays(
+            2, dict(date=dates, lat=[10], lon=[300], vort=[1], vmax=[10], mslp=[1000])
+        )
+
+
+def test_storm_missing_values():
+    dates = [datetime.datetime(2000, 1, 1, 6 * n) for n in range(4)]
+    nan = np.nan
+    storm = storm_assess.Storm.from_arrays(
+        3,
+        dict(
+            date=dates, lat=[10, 11, 12, 13], lon=[300, 301, 302, 303],
+            vort=[nan, 2, 3, nan], vmax=[nan, 20, nan, 10],
+            mslp=[nan, 990, nan, 995],
+        ),
+        obs_extras={"vmax_kts": np.array([nan, 100, nan, 200])},
+    )
+
+    assert storm.vmax == 20
+    assert storm.mslp_min == 990
+    assert storm.vort_max == 3
+    assert storm.time_of_min_mslp() == dates[1]
+    assert storm.ace_index() == 5.0
+
+    storm = storm_assess.Storm.from_arrays(
+        4,
+        dict(
+            date=dates[:2], lat=[10, 11], lon=[300, 301], vort=[1, 2],
+            vmax=[nan, nan], mslp=[nan, nan],
+        ),
+    )
+    assert np.isnan(storm.vmax)
+    assert storm.mslp_min == -999
+
+    # Storms built directly or loaded with missing_values=None can still contain the
+    # TRACK missing values
+    storm = storm_assess.Storm.from_arrays(
+        5,
+        dict(
+            date=dates, lat=[10, 11, 12, 13], lon=[300, 301, 302, 303],
+            vort=[1, 2, 3, 4], vmax=[10, 20, 30, 20], mslp=[-999, 990, 1e12, 1e25],
+        ),
+    )
+    assert storm.mslp_min == 990
+    storm.obs = [ob._replace(mslp=-999.) for ob in storm.obs]
+    assert storm.mslp_min == -999
+
+
+def test_import_time():
+    # Importing the package should not import the slow mapping/plotting libraries
+    code = (
+        "import sys, time; t = time.perf_counter();"
+        "import storm_assess, storm_assess.functions, storm_assess.regions, storm_assess.plot;"
+        "print(time.perf_counter() - t); print(' '.join(sys.modules))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    elapsed, modules = result.stdout.splitlines()
+
+    heavy = {"cartopy", "iris", "geopandas", "matplotlib", "shapely", "netCDF4", "haversine"}
+    assert not heavy.intersection(modules.split())
+    assert float(elapsed) < IMPORT_TIME_BUDGET
+
+    # The loaders only import shapely when selecting tracks by basin
+    result = subprocess.run(
+        [sys.executable, "-c", "import sys, storm_assess.track; print(' '.join(sys.modules))"],
+        capture_output=True, text=True, check=True,
+    )
+    assert not heavy.intersection(result.stdout.split())
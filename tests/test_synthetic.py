@@ -0,0 +1,92 @@
+import datetime
+
+import numpy as np
+import pytest
+
+from storm_assess import synthetic, track
+
+
+@pytest.mark.parametrize("calendar", [None, "netcdftime"])
+@pytest.mark.parametrize("header", ["new", "old"])
+def test_write_tracks_load(tmp_path, calendar, header):
+    filename = tmp_path / "tracks.txt"
+    synthetic.write_tracks(
+        filename, ntracks=25, npoints=(4, 12), v10m=True, calendar=calendar,
+        header=header, seed=0,
+    )
+
+    storms = list(track.load(str(filename), ex_cols=3, calendar=calendar))
+    assert len(storms) == 25
+    assert [storm.snbr for storm in storms] == list(range(1, 26))
+    for storm in storms:
+        assert 4 <= len(storm) <= 12
+        assert storm.genesis_date().year in (2000, 2001)
+        lons = storm.column("lon")
+        assert ((lons >= 0) & (lons < 360)).all()
+        assert (np.abs(storm.column("lat")) < 90).all()
+        assert (storm.column("vmax") >= 10).all()
+        assert (storm.column("mslp") <= 1010).all()
+
+        # Consecutive 6-hourly times
+        dates = list(storm.column("date"))
+        assert all(
+            later - earlier == datetime.timedelta(hours=6)
+            for earlier, later in zip(dates[:-1], dates[1:])
+        )
+
+
+def test_write_tracks_hart(tmp_path):
+    filename = tmp_path / "tracks.txt"
+    synthetic.write_tracks(filename, ntracks=10, layout="hart", seed=1)
+
+    storms = list(track.load_hart(str(filename)))
+    assert len(storms) == 10
+    for storm in storms:
+        assert np.isfinite(storm.column("TL")).all()
+        assert np.isfinite(storm.column("B")).all()
+
+
+def test_write_tracks_hurdat2(tmp_path):
+    filename = tmp_path / "tracks.txt"
+    synthetic.write_tracks(filename, ntracks=10, layout="hurdat2", seed=2)
+
+    with open(filename) as f:
+        storms = list(track.load_hurdat2(f))
+    assert len(storms) == 10
+    assert all((storm.column("vmax") >= 10).all() for storm in storms)
+
+
+def test_write_tracks_no_assumptions(tmp_path):
+    filename = tmp_path / "tracks.txt"
+    synthetic.write_tracks(
+        filename, ntracks=5, layout="no_assumptions", has_coords=[True, False], seed=3,
+        missing_fraction=0.5,
+    )
+
+    tracks = track.load_no_assumptions(str(filename))
+    assert len(tracks) == 5
+    assert set(tracks[0].data_vars) >= {"feature_0", "feature_1"}
+    assert np.isnan(tracks[0].feature_1.values).any()
+
+    tracks = track.load_no_assumptions(str(filename), missing_values=None)
+    assert (tracks[0].feature_1.values == synthetic.MISSING).any()
+
+
+def test_write_tracks_deterministic(tmp_path):
+    kwargs = dict(ntracks=30, npoints=(2, 5), seed=4, chunksize=7)
+    synthetic.write_tracks(tmp_path / "serial.txt", **kwargs)
+    synthetic.write_tracks(tmp_path / "again.txt", **kwargs)
+    synthetic.write_tracks(tmp_path / "parallel.txt", jobs=2, **kwargs)
+
+    text = (tmp_path / "serial.txt").read_text()
+    assert (tmp_path / "again.txt").read_text() == text
+    assert (tmp_path / "parallel.txt").read_text() == text
+
+
+def test_write_tracks_invalid(tmp_path):
+    with pytest.raises(ValueError):
+        synthetic.write_tracks(tmp_path / "tracks.txt", layout="ibtracs")
+    with pytest.raises(ValueError):
+        synthetic.write_tracks(tmp_path / "tracks.txt", has_coords=[True])
+    with pytest.raises(ValueError):
+        synthetic.write_tracks(tmp_path / "tracks.txt", header="newest")
@@ -0,0 +1,92 @@
+import datetime
+
+import cftime
+import numpy as np
+import pytest
+
+import storm_assess
+from storm_assess import synthetic, timing, track
+
+
+@pytest.mark.parametrize("calendar", ["standard", "360_day", "noleap", "julian"])
+def test_hours_since_epoch(calendar):
+    times = [
+        cftime.datetime(2000, 2, 28, 6, calendar=calendar),
+        cftime.datetime(1969, 12, 1, 18, 30, calendar=calendar),
+        cftime.datetime(2011, 11, 21, 6, calendar=calendar),
+    ]
+    expected = cftime.date2num(times, timing.UNITS, calendar=calendar)
+    np.testing.assert_allclose(timing.hours_since_epoch(times), expected)
+
+
+def test_hours_since_epoch_datetime():
+    times = [datetime.datetime(2000, 3, 1, 6), datetime.datetime(1969, 12, 31, 18, 30)]
+    expected = cftime.date2num(times, timing.UNITS, calendar="standard")
+    np.testing.assert_allclose(timing.hours_since_epoch(times), expected)
+    np.testing.assert_allclose(
+        timing.hours_since_epoch(np.array(times, dtype="datetime64[ns]")), expected
+    )
+    assert len(timing.hours_since_epoch([])) == 0
+
+
+@pytest.mark.parametrize("calendar", [None, "netcdftime"])
+def test_loaded_hours(tmp_path, calendar):
+    filename = str(tmp_path / "tracks.txt")
+    synthetic.write_tracks(
+        filename, ntracks=10, calendar=calendar, seed=1,
+        start=datetime.datetime(1965, 1, 1),
+    )
+
+    for storm in track.load(filename, calendar=calendar):
+        np.testing.assert_array_equal(
+            storm.hours(), timing.hours_since_epoch(storm.column("date"))
+        )
+
+    storms = track.load_no_assumptions(filename, calendar=calendar, output_type="storm")
+    tracks = track.load_no_assumptions(filename, calendar=calendar)
+    np.testing.assert_array_equal(timing.time_axes(storms)[0], timing.time_axes(tracks)[0])
+
+
+def _storm(snbr, hours, vmax, mslp):
+    dates = [cftime.datetime(2000, 1, 1, calendar="360_day") + datetime.timedelta(hours=h)
+             for h in hours]
+    n = len(hours)
+    return storm_assess.Storm.from_arrays(snbr, dict(
+        date=dates, lat=np.zeros(n), lon=np.zeros(n), vort=vmax, vmax=vmax, mslp=mslp,
+    ))
+
+
+@pytest.fixture
+def storms():
+    nan = np.nan
+    return [
+        _storm(1, [0, 6, 12, 18, 24], [10, 35, 40, 30, 36], [1000, 980, 970, 990, 980]),
+        _storm(2, [0, 6], [nan, nan], [nan, nan]),
+        _storm(3, [0], [50], [950]),
+        _storm(4, [0, 12, 18], [33, 20, 34], [nan, 1000, 999]),
+    ]
+
+
+def test_collection_metrics(storms):
+    np.testing.assert_array_equal(timing.lifetimes(storms), [24, 6, 0, 18])
+    np.testing.assert_array_equal(timing.time_to_peak(storms), [12, np.nan, 0, 18])
+    np.testing.assert_array_equal(
+        timing.time_to_peak(storms, "mslp", method="min"), [12, np.nan, 0, 18]
+    )
+    np.testing.assert_array_equal(timing.steps_to_peak(storms), [2, np.nan, 0, 3])
+    np.testing.assert_array_equal(timing.duration_above(storms, 33), [6, 0, 0, 0])
+    np.testing.assert_array_equal(timing.duration_above(storms, 0), [24, 0, 0, 18])
+
+    tracks = [track.to_xarray(storm) for storm in storms]
+    np.testing.assert_array_equal(timing.lifetimes(tracks), timing.lifetimes(storms))
+    with pytest.raises(ValueError):
+        timing.time_to_peak(storms, method="mean")
+
+
+def test_storm_methods(storms):
+    storm = storms[0]
+    assert storm.lifetime() == 24
+    assert storm.time_to_max() == 12
+    assert storm.step_of_min_mslp() == 2
+    assert storm.step_of_max_vort() == 2
+    assert storms[3].step_of_min_mslp() == 3
@@ -1,16 +1,18 @@
+import datetime
 import pathlib
 
 import cftime
+import numpy as np
 import pytest
+import xarray
 
 import storm_assess
 from storm_assess import track
 
 
-@pytest.mark.parametrize("load_function", [track.load, track.load_hurdat2])
-def test_load(load_function):
+def test_load():
     storms = list(
-        load_function(storm_assess.SAMPLE_TRACK_DATA, ex_cols=3, calendar="netcdftime")
+        track.load(storm_assess.SAMPLE_TRACK_DATA, ex_cols=3, calendar="netcdftime")
     )
 
     assert len(storms) == 540
@@ -29,10 +31,48 @@ def test_load(load_function):
     assert storms[-1].obs[-1].lon == 276.124756
     assert storms[-1].obs[-1].lat == 12.903164
     assert storms[-1].obs[-1].vort == 3.415816e00
-    assert storms[-1].obs[-1].vmax == 1.000000e+12
+    assert np.isnan(storms[-1].obs[-1].vmax)
     assert storms[-1].obs[-1].mslp == float(round(1.008229e05 / 100, 1))
 
 
+def test_load_hurdat2(storms):
+    # The sample data are not in the HURDAT2 layout, so only the dates and positions
+    # match those from load, and there is no vorticity
+    hurdat2 = list(
+        track.load_hurdat2(storm_assess.SAMPLE_TRACK_DATA, ex_cols=3, calendar="netcdftime")
+    )
+    assert [len(storm) for storm in hurdat2] == [len(storm) for storm in storms]
+    for name in ["date", "lon", "lat"]:
+        assert (hurdat2[0].column(name) == storms[0].column(name)).all()
+        assert (hurdat2[-1].column(name) == storms[-1].column(name)).all()
+    assert (hurdat2[0].column("vort") == 0).all()
+
+    # A filename is read the same way as an open file
+    with open(storm_assess.SAMPLE_TRACK_DATA) as fh:
+        from_handle = list(track.load_hurdat2(fh, ex_cols=3, calendar="netcdftime"))
+    for storm, storm_fh in zip(hurdat2, from_handle, strict=True):
+        for name in storm_assess.OBSERVATION_FIELDS[1:]:
+            np.testing.assert_array_equal(storm.column(name), storm_fh.column(name))
+
+
+def test_load_hurdat2_layout(tmp_path):
+    from storm_assess import synthetic
+
+    filename = str(tmp_path / "tracks.txt")
+    synthetic.write_tracks(filename, ntracks=5, layout="hurdat2", seed=0)
+    storms = list(track.load_hurdat2(filename))
+    with open(filename) as fh:
+        from_handle = list(track.load_hurdat2(fh))
+
+    # The 925 hPa wind speed comes before the MSLP in the HURDAT2 layout
+    tracks = track.load_no_assumptions(filename)
+    for storm, storm_fh, tr in zip(storms, from_handle, tracks, strict=True):
+        for name in storm_assess.OBSERVATION_FIELDS[1:]:
+            np.testing.assert_array_equal(storm.column(name), storm_fh.column(name))
+        np.testing.assert_allclose(storm.column("vmax"), tr.feature_7)
+        np.testing.assert_allclose(storm.column("mslp"), (tr.feature_8 / 100).round(1))
+
+
 def test_load_no_assumptions(storms_xarray):
     assert len(storms_xarray) == 540
 
@@ -57,7 +97,7 @@ def test_load_no_assumptions(storms_xarray):
     assert storms_xarray[-1].vorticity[-1] == 3.415816e00
     assert storms_xarray[-1].vmax[-1] == 8.001409e+00
     assert storms_xarray[-1].mslp[-1] == 1.008229e+05
-    assert storms_xarray[-1].v10m[-1] == 1.000000e+12
+    assert np.isnan(storms_xarray[-1].v10m[-1])
 
 
 def test_load_no_assumptions_storm():
@@ -93,3 +133,185 @@ def test_save_netcdf(storms_xarray):
             assert (storms_xarray[n][var].data == storms_copy[n][var].data).all()
 
     pathlib.Path("test.nc").unlink()
+
+
+@pytest.fixture(scope="module")
+def synthetic_file(tmp_path_factory):
+    from storm_assess import synthetic
+
+    filename = str(tmp_path_factory.mktemp("track") / "tracks.txt")
+    synthetic.write_tracks(filename, ntracks=60, npoints=(1, 30), v10m=True, seed=3)
+    return filename
+
+
+@pytest.mark.parametrize("selection,selected", [
+    (dict(months=[8, 9]), lambda storm: storm.genesis_date().month in [8, 9]),
+    (dict(min_points=20), lambda storm: len(storm) >= 20),
+    (
+        dict(bbox=(300, 20, 10, 30)),
+        lambda storm: any(
+            (lon >= 300 or lon <= 20) and 10 <= lat <= 30
+            for lon, lat in zip(storm.column("lon"), storm.column("lat"))
+        ),
+    ),
+    (dict(basin="na"), lambda storm: storm_assess._storm_in_basin(storm, "na")),
+    (
+        dict(months=[6, 7, 8, 9, 10, 11], basin="wp", min_points=5),
+        lambda storm: storm.genesis_date().month in range(6, 12) and len(storm) >= 5
+        and storm_assess._storm_in_basin(storm, "wp"),
+    ),
+])
+@pytest.mark.parametrize("from_file", [True, False])
+def test_load_filters(synthetic_file, selection, selected, from_file):
+    expected = [
+        storm.snbr for storm in track.load(synthetic_file, ex_cols=3) if selected(storm)
+    ]
+    assert 0 < len(expected) < 60
+
+    if from_file:
+        storms = track.load(synthetic_file, ex_cols=3, **selection)
+    else:
+        storms = track.load(open(synthetic_file), ex_cols=3, **selection)
+    assert [storm.snbr for storm in storms] == expected
+
+    tracks = track.load_no_assumptions(synthetic_file, **selection)
+    assert [tr.attrs["track_id"] for tr in tracks] == expected
+
+
+@pytest.mark.parametrize("layout,loader,kwargs,variables", [
+    ("track", track.load, dict(ex_cols=3), ["mslp", "vort"]),
+    ("track", track.load, dict(ex_cols=3), ["vmax_kts"]),
+    ("hart", track.load_hart, dict(), ["vort", "B"]),
+    ("hart", track.load_hart, dict(), ["vmax", "v10m_lat", "TU"]),
+    ("hurdat2", track.load_hurdat2, dict(), ["mslp"]),
+])
+def test_load_variables(tmp_path, layout, loader, kwargs, variables):
+    from storm_assess import synthetic
+
+    filename = str(tmp_path / "tracks.txt")
+    synthetic.write_tracks(
+        filename, ntracks=5, layout=layout, v10m=layout == "track", seed=1
+    )
+    # load_hurdat2 reads filenames with load, so use a file handle
+    with open(filename) as f:
+        expected = list(loader(f, **kwargs))
+    with open(filename) as f:
+        storms = list(loader(f, variables=variables, **kwargs))
+
+    assert len(storms) == len(expected)
+    for storm, full in zip(storms, expected):
+        assert list(storm.obs[0].extras) == [
+            key for key in full.obs[0].extras if key in variables
+        ]
+        for name in storm_assess.OBSERVATION_FIELDS + tuple(storm.obs[0].extras):
+            if name in ("date", "lat", "lon") or name in variables:
+                np.testing.assert_array_equal(storm.column(name), full.column(name))
+            else:
+                assert np.isnan(storm.column(name)).all()
+
+
+def test_load_variables_unknown(tmp_path):
+    from storm_assess import synthetic
+
+    filename = str(tmp_path / "tracks.txt")
+    synthetic.write_tracks(filename, ntracks=2, seed=1)
+    with pytest.raises(ValueError, match="v10m"):
+        list(track.load(filename, variables=["v10m"]))
+
+
+def test_load_no_assumptions_variables(tmp_path):
+    from storm_assess import synthetic
+
+    filename = str(tmp_path / "tracks.txt")
+    synthetic.write_tracks(
+        filename, ntracks=5, layout="no_assumptions", has_coords=[True, False, True],
+        seed=1,
+    )
+    names = ["a", "b", "c"]
+    expected = track.load_no_assumptions(filename, variable_names=names)
+    tracks = track.load_no_assumptions(
+        filename, variable_names=names, variables=["feature_0_latitude", "b"]
+    )
+
+    for tr, full in zip(tracks, expected, strict=True):
+        assert sorted(tr) == ["a_latitude", "b", "latitude", "longitude"]
+        xarray.testing.assert_identical(tr, full[list(tr)])
+
+    storms = track.load_no_assumptions(
+        filename, variables=["feature_2"], output_type="storm"
+    )
+    assert list(storms[0].obs[0].extras) == ["feature_2"]
+    assert np.isnan(storms[0].column("vort")).all()
+
+
+def test_load_missing_values(tmp_path):
+    from storm_assess import synthetic
+
+    filename = str(tmp_path / "tracks.txt")
+    synthetic.write_tracks(
+        filename, ntracks=10, layout="hart", missing_fraction=0.3, seed=2
+    )
+    storms = list(track.load_hart(filename))
+    raw = list(track.load_hart(filename, missing_values=None))
+
+    for storm, storm_raw in zip(storms, raw, strict=True):
+        for name in ["vmax", "v10m", "TL", "B"]:
+            values, values_raw = storm.column(name), storm_raw.column(name)
+            missing = values_raw == synthetic.MISSING
+            assert np.isnan(values[missing]).all()
+            np.testing.assert_array_equal(values[~missing], values_raw[~missing])
+
+        # The pressure is converted to hPa after removing the missing values
+        mslp = storm.column("mslp")
+        assert (np.isnan(mslp) | (mslp < 1100)).all()
+        assert np.isnan(mslp).any() or not (storm_raw.column("mslp") > 1e20).any()
+        if not np.isnan(storm.column("vmax")).all():
+            assert storm.vmax == np.nanmax(storm.column("vmax"))
+        assert not np.isnan(storm.ace_index())
+
+
+def test_write_missing_values(tmp_path):
+    from storm_assess import synthetic
+
+    filename = str(tmp_path / "tracks.txt")
+    synthetic.write_tracks(filename, ntracks=5, missing_fraction=0.3, seed=4)
+    storms = list(track.load(filename))
+    storms[0].column("lat")[1] = np.nan
+    storms[0].column("lon")[1] = np.nan
+    assert np.isnan(storms[0].column("vmax")).any()
+
+    # Missing values are written as the TRACK missing value rather than "nan"
+    written = str(tmp_path / "written.txt")
+    track.write(storms, written)
+    with open(written) as f:
+        assert "nan" not in f.read()
+
+    reloaded = track.load_no_assumptions(written, variable_names=["vmax", "mslp", "vmax_kts"])
+    for storm, tr in zip(storms, reloaded, strict=True):
+        np.testing.assert_allclose(tr.latitude, storm.column("lat"))
+        np.testing.assert_allclose(tr.longitude, storm.column("lon"))
+        np.testing.assert_allclose(tr.vmax, storm.column("vmax"))
+        np.testing.assert_allclose(tr.mslp, storm.column("mslp"))
+
+
+def test_load_filters_missing_positions(tmp_path):
+    # Missing positions (written as 1e25) are ignored when selecting by region
+    dates = [datetime.datetime(2000, 8, 1, 6 * n) for n in range(3)]
+    storms = [
+        storm_assess.Storm.from_arrays(snbr, dict(
+            date=dates, lat=lats, lon=lons, vort=[1, 2, 3], vmax=[10, 20, 30],
+            mslp=[1000, 990, 980],
+        ))
+        for snbr, lons, lats in [
+            (1, [300, np.nan, 305], [20, np.nan, 25]),
+            (2, [np.nan, 150, 155], [np.nan, 20, 25]),
+            (3, [np.nan, np.nan, np.nan], [np.nan, np.nan, np.nan]),
+        ]
+    ]
+    filename = str(tmp_path / "tracks.txt")
+    track.write(storms, filename)
+
+    tracks = track.load_no_assumptions(filename, basin="na")
+    assert [tr.attrs["track_id"] for tr in tracks] == [1]
+    tracks = track.load_no_assumptions(filename, bbox=(140, 160, 0, 30))
+    assert [tr.attrs["track_id"] for tr in tracks] == [2]